@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# scientometry-benchmark.py -- Benchmark of the scientometric data processing
+# script.
+#
+# Copyright (C) 2016, 2017  Juraj Szász <juraj.szasz3@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Benchmark of the scientometric data processing script.
+
+usage: scientometry-benchmark.py [-h] [-d WORK_DIR] [-r ROWS [ROWS ...]]
+                                 [-s SEED] [-o RESULTS_FILE] [-g]
+                                 [--script SCRIPT]
+                                 [SECTION ...]
+
+Generate synthetic Scopus/WoS exports, journal catalogs and Publish or Perish
+results files of the given sizes and measure time and memory usage of
+processing each SECTION of the generated configuration file by
+scientometry-data-proc.py (all sections as default).
+
+positional arguments:
+  SECTION               section of the generated configuration file
+
+options:
+  -h, --help            show this help message and exit
+  -d WORK_DIR           directory of the generated data (default: 'benchmark-
+                        data')
+  -r ROWS [ROWS ...], --rows ROWS [ROWS ...]
+                        numbers of generated publications (default: 10000)
+  -s SEED, --seed SEED  seed of the random generator (default: 1)
+  -o RESULTS_FILE       write JSON results into RESULTS_FILE (default:
+                        'benchmark-results.json')
+  -g, --generate-only   only generate the data
+  --script SCRIPT       benchmarked script (default: scientometry-data-
+                        proc.py in the parent directory of this script)
+
+Every set of generated data is stored in its own subdirectory of WORK_DIR
+('rows-{ROWS}') and reused by following runs with the same seed.  Time and
+memory usage are taken from the profile report of scientometry-data-proc.py
+(see its --profile option).
+
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+
+__version__ = "0.5"
+
+
+class SyntheticDataGenerator(object):
+
+    """Generator of the synthetic scientometric data.
+
+    Generates the same set of files as the citation registers and Publish or
+    Perish export: Scopus and WoS exports in the 19-column layout, merged
+    Scopus+WoS data, journal catalog and results data file, as well as the
+    configuration file with one section per output data class.  Every
+    publication is exported by Scopus, WoS or both (with uppercase source
+    titles, missing DOIs and differently cased titles in WoS exports), so that
+    the exports overlap as the real ones do.  A small share of the titles
+    contains quotes, commas and line breaks, so that quoted multi-line fields
+    are present, and the exports start with the UTF-8 BOM.  The same seed
+    always generates the same data.
+
+    Attributes:
+    data_dir -- directory of the generated data
+    row_count -- number of generated publications
+    random -- random.Random object
+
+    """
+
+    export_fieldnames = ['Cites', 'Authors', 'Title', 'Year', 'Source', 'Publisher', 'ArticleURL',
+                         'CitesURL', 'GSRank', 'QueryDate', 'Type', 'DOI', 'ISSN', 'CitationURL',
+                         'Volume', 'Issue', 'StartPage', 'EndPage', 'ECC']
+    merged_fieldnames = ['Source', 'ISSN', 'Year', 'Type', 'Authors', 'Title']
+    catalog_fieldnames = ['Source title', 'Abbreviated Source Title', 'ISSN', 'ISI JIF', 'SJR',
+                          'Scimago h-index', 'Notes', 'CiteScore', 'SNIP']
+    results_fieldnames = ['Query', 'Papers', 'Citations', 'Papers_Author', 'Cites_Paper', 'h_index',
+                          'g_index', 'hc_index', 'hI_index', 'hI_norm', 'AWCR', 'AW_index', 'AWCRpA',
+                          'e_index', 'hm_index']
+    words = ("analysis synthesis structure properties determination characterization enzymes "
+             "copper complexes crystal wheat starch biosorption cadmium wine chemometric "
+             "spectroscopy magnetic nitrites polyphenols distance learning grid computing "
+             "interpolation fermentation ethanol moss heavy metals degradation oxidation "
+             "zinc cobalt sorption biochar kinetics ligands derivatives chromatography "
+             "evaluation model simulation detection optimization antioxidant activity").split()
+    first_names = ("Anna Peter Jana Miroslav Martin Lucia Juraj Marek Eva Vladimir Zuzana Tomas "
+                   "Ladislav Maria Jozef Katarina Michal Daniela Roman Ivana").split()
+    last_names = ("Novak Horvath Kovac Varga Toth Nagy Balaz Molnar Szabo Simon Kuna Huraj "
+                  "Hornik Pipiska Mocak Boca Siladi Olvecky Chmelova Ondrejovic Sunovska "
+                  "Jurinova Remenarova Augustin Janiga Garaj Kozik Tabunshchyk").split()
+    types = ['Article', 'Article', 'Article', 'Review', 'Conference Paper', 'Book Chapter']
+    dataset_list = ['Scopus', 'WoS', 'GS']
+    group_list = ['KB', 'KBt', 'KCh', 'KER', 'KAIM']
+    query_date = "2017-01-05"
+
+    def __init__(self, data_dir, row_count, seed=1):
+        """Initialize SyntheticDataGenerator object.
+
+        Positional arguments:
+        data_dir -- directory of the generated data
+        row_count -- number of generated publications
+
+        Keyword arguments:
+        seed -- seed of the random generator (default: 1)
+
+        """
+        self.data_dir = data_dir
+        self.row_count = row_count
+        self.random = random.Random(seed)
+        journal_count = max(50, min(20000, row_count // 50))
+        self.journal_list = [self.journal(i) for i in range(journal_count)]
+        author_count = max(100, min(200000, row_count // 5))
+        self.author_list = [self.random.choice(self.first_names)[0] + ". " + self.random.choice(self.last_names) +
+                            ("-" + str(i) if i >= len(self.last_names) else "") for i in range(author_count)]
+
+    def journal(self, number):
+        """Return (title, abbreviated title, ISSN) tuple of a synthetic journal."""
+        title = " ".join(self.random.choice(self.words).capitalize() for _ in range(3)) + " " + str(number)
+        issn_digits = "%07d" % (1000000 + number)
+        check_sum = sum((8 - i) * int(x) for i, x in enumerate(issn_digits)) % 11
+        check_digit = "0" if check_sum == 0 else ("X" if check_sum == 1 else str(11 - check_sum))
+        return title, title[:12] + ".", issn_digits[:4] + "-" + issn_digits[4:] + check_digit
+
+    def title(self):
+        """Return title of a synthetic publication."""
+        title = " ".join(self.random.choice(self.words) for _ in range(self.random.randint(5, 14)))
+        title = title[0].upper() + title[1:]
+        chance = self.random.random()
+        if chance < 0.01:
+            title += ":\nPart " + str(self.random.randint(1, 5))
+        elif chance < 0.03:
+            title = 'The "' + title + '" study, revisited'
+        elif chance < 0.06:
+            title += ", a review"
+        return title
+
+    def publications(self):
+        """Generate synthetic publications.
+
+        Yields tuples (publication row, exported by Scopus, exported by WoS).
+
+        """
+        rand = self.random
+        for number in range(self.row_count):
+            journal_title, journal_abbreviation, issn = rand.choice(self.journal_list)
+            year = str(min(2016, 1995 + int(rand.betavariate(4, 1.5) * 22)))
+            age = 2017 - int(year)
+            doi = "10.%d/synthetic.%d" % (1000 + number % 9000, number) if rand.random() < 0.8 else ""
+            row = {
+                'Cites': str(int(rand.expovariate(1.0 / (1 + 1.5 * age)))),
+                'Authors': ", ".join(rand.sample(self.author_list, rand.randint(1, 8))),
+                'Title': self.title(),
+                'Year': year,
+                'Source': journal_title,
+                'Publisher': "",
+                'ArticleURL': "https://www.scopus.com/inward/record.uri?eid=2-s2.0-%011d&partnerID=40&md5=%032x" %
+                              (number, rand.getrandbits(128)),
+                'CitesURL': "",
+                'GSRank': str(number % 200 + 1),
+                'QueryDate': self.query_date,
+                'Type': rand.choice(self.types),
+                'DOI': doi,
+                'ISSN': issn if rand.random() < 0.9 else "",
+                'CitationURL': "",
+                'Volume': str(rand.randint(1, 120)),
+                'Issue': str(rand.randint(1, 12)),
+                'StartPage': str(rand.randint(1, 3000)),
+                'EndPage': "",
+                'ECC': "",
+            }
+            row['EndPage'] = str(int(row['StartPage']) + rand.randint(1, 30))
+            row['ECC'] = row['Cites']
+            chance = rand.random()
+            yield row, chance < 0.85, chance > 0.25
+
+    def wos_row(self, row):
+        """Return WoS variant of the publication row."""
+        wos_row = dict(row)
+        wos_row['Source'] = row['Source'].upper()
+        wos_row['Type'] = "Journal article"
+        wos_row['ArticleURL'] = ""
+        wos_row['Cites'] = str(max(0, int(row['Cites']) - self.random.randint(0, 3)))
+        wos_row['ECC'] = wos_row['Cites']
+        chance = self.random.random()
+        if chance < 0.3:
+            wos_row['DOI'] = ""
+        if chance < 0.1:
+            wos_row['Title'] = row['Title'].upper()
+        return wos_row
+
+    def file_name(self, prefix):
+        """Return name of the generated file."""
+        return os.path.join(self.data_dir, prefix + "-" + self.query_date + ".csv")
+
+    @staticmethod
+    def open_writer(data_file, fieldnames, bom=False):
+        """Open CSV file and return tuple (file, csv.DictWriter)."""
+        csv_file = open(data_file, 'w', encoding="utf-8-sig" if bom else "utf-8", newline="")
+        csv_dict_writer = csv.DictWriter(csv_file, fieldnames=fieldnames, lineterminator="\r\n")
+        csv_dict_writer.writeheader()
+        return csv_file, csv_dict_writer
+
+    def generate(self):
+        """Generate all data files and the configuration file.
+
+        Returns name of the configuration file.
+
+        """
+        if not os.path.isdir(self.data_dir):
+            os.makedirs(self.data_dir)
+
+        scopus_file, scopus_writer = self.open_writer(self.file_name("all-scopus"), self.export_fieldnames, bom=True)
+        wos_file, wos_writer = self.open_writer(self.file_name("all-wos"), self.export_fieldnames, bom=True)
+        merged_file, merged_writer = self.open_writer(self.file_name("all-merged"), self.merged_fieldnames)
+        try:
+            for row, in_scopus, in_wos in self.publications():
+                if in_scopus:
+                    scopus_writer.writerow(row)
+                if in_wos:
+                    wos_writer.writerow(self.wos_row(row))
+                merged_writer.writerow({k: row[k] for k in self.merged_fieldnames})
+        finally:
+            scopus_file.close()
+            wos_file.close()
+            merged_file.close()
+
+        catalog_file, catalog_writer = self.open_writer(self.file_name("journal-catalog"), self.catalog_fieldnames)
+        try:
+            for title, abbreviation, issn in self.journal_list:
+                catalog_writer.writerow({
+                    'Source title': title,
+                    'Abbreviated Source Title': abbreviation,
+                    'ISSN': issn,
+                    'ISI JIF': "%.3f" % self.random.uniform(0.1, 8),
+                    'SJR': "%.3f" % self.random.uniform(0.1, 3),
+                    'Scimago h-index': str(self.random.randint(5, 250)),
+                    'Notes': "",
+                    'CiteScore': "%.2f" % self.random.uniform(0.1, 6),
+                    'SNIP': "%.3f" % self.random.uniform(0.1, 3),
+                })
+        finally:
+            catalog_file.close()
+
+        results_file, results_writer = self.open_writer(self.file_name("results-all"), self.results_fieldnames)
+        try:
+            for group in self.group_list:
+                for dataset in self.dataset_list:
+                    row = {k: "%.3f" % self.random.uniform(0, 100) for k in self.results_fieldnames}
+                    row['Query'] = group + "-" + dataset
+                    results_writer.writerow(row)
+        finally:
+            results_file.close()
+
+        config_file = os.path.join(self.data_dir, "config.yaml")
+        with open(config_file, 'w') as yaml_file:
+            yaml_file.write(self.config_text())
+
+        return config_file
+
+    @staticmethod
+    def config_text():
+        """Return text of the configuration file."""
+        return """defaults:
+  output-dir: out
+
+publications-data:
+  class: PublicationsData
+  source:
+    Scopus: all-scopus-{date}.csv
+    WoS: all-wos-{date}.csv
+  years: 1995-2016
+
+citations-data:
+  class: CitationsData
+  source:
+    Scopus: all-scopus-{date}.csv
+    WoS: all-wos-{date}.csv
+  years: 1995-2016
+
+journals-data:
+  class: JournalsData
+  source: all-merged-{date}.csv
+  journal-catalog: journal-catalog-{date}.csv
+
+results-data:
+  class: ResultsData
+  source: results-all-{date}.csv
+
+indicators-data:
+  class: IndicatorsData
+  source:
+    All-Scopus: all-scopus-{date}.csv
+    All-WoS: all-wos-{date}.csv
+  years: 1995-2016
+
+authors-data:
+  class: AuthorsData
+  source:
+    Scopus: all-scopus-{date}.csv
+  years: 1995-2016
+
+merged-data:
+  class: MergedData
+  source:
+    Scopus: all-scopus-{date}.csv
+    WoS: all-wos-{date}.csv
+  priority: [ WoS, Scopus ]
+
+sql-data:
+  class: SqlData
+  source: all-merged-{date}.csv
+  journal-catalog: journal-catalog-{date}.csv
+  query: >
+    SELECT j."Source title", COUNT(*) AS Papers FROM source s
+    JOIN journals j ON j.issn_key = s.issn_key
+    GROUP BY j."Source title" ORDER BY Papers DESC
+"""
+
+
+def run_section(script, data_dir, section):
+    """Process a single section and return its profile record.
+
+    The section is processed by a separate process, so that the peak memory
+    usage of each section is measured separately.
+
+    Positional arguments:
+    script -- benchmarked script
+    data_dir -- directory of the generated data
+    section -- name of the section
+
+    Returns profile record of the section (see StageProfiler in the
+    benchmarked script) extended by the run record items.
+
+    """
+    report_file = os.path.join(data_dir, "profile-" + section + ".json")
+    with open(os.devnull, 'w') as null_file:
+        subprocess.check_call([sys.executable, os.path.abspath(script), "--force", "--profile",
+                               os.path.basename(report_file), section], cwd=data_dir, stdout=null_file)
+    with open(report_file, 'r') as json_file:
+        report = json.load(json_file)
+
+    record = dict(report['sections'][0])
+    record['run_wall'] = report['wall']
+    record['run_peak_rss_kb'] = report['peak_rss_kb']
+    return record
+
+
+def main():
+    """Run initial code when this module is executed as a script.
+
+    1. Parse command line arguments using argparse.ArgumentParser object.
+    2. Generate the data for each requested number of publications (unless
+       the data have been generated already).
+    3. Process each section by the benchmarked script and print its time and
+       memory usage.
+    4. Write the results into the JSON file.
+
+    """
+    description = "Generate synthetic Scopus/WoS exports, journal catalogs " + \
+                  "and Publish or Perish results files of the given sizes " + \
+                  "and measure time and memory usage of processing each " + \
+                  "SECTION of the generated configuration file by " + \
+                  "scientometry-data-proc.py (all sections as default)."
+    epilog = "Every set of generated data is stored in its own " + \
+             "subdirectory of WORK_DIR ('rows-{ROWS}') and reused by " + \
+             "following runs with the same seed.  Time and memory usage are " + \
+             "taken from the profile report of scientometry-data-proc.py " + \
+             "(see its --profile option)."
+    default_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "scientometry-data-proc.py")
+    arg_parser = argparse.ArgumentParser(description=description, epilog=epilog)
+    arg_parser.add_argument("-d", metavar="WORK_DIR", dest='work_dir', default="benchmark-data",
+                            help="directory of the generated data (default: 'benchmark-data')")
+    arg_parser.add_argument("-r", "--rows", metavar="ROWS", type=int, nargs='+', default=[10000],
+                            help="numbers of generated publications (default: 10000)")
+    arg_parser.add_argument("-s", "--seed", type=int, default=1,
+                            help="seed of the random generator (default: 1)")
+    arg_parser.add_argument("-o", metavar="RESULTS_FILE", dest='results_file', default="benchmark-results.json",
+                            help="write JSON results into RESULTS_FILE (default: 'benchmark-results.json')")
+    arg_parser.add_argument("-g", "--generate-only", action='store_true',
+                            help="only generate the data")
+    arg_parser.add_argument("--script", default=default_script,
+                            help="benchmarked script (default: scientometry-data-proc.py in the parent "
+                                 "directory of this script)")
+    arg_parser.add_argument("sections", metavar="SECTION", nargs='*',
+                            help="section of the generated configuration file")
+    args = arg_parser.parse_args()
+
+    result_list = []
+    for row_count in args.rows:
+        data_dir = os.path.join(args.work_dir, "rows-" + str(row_count))
+        seed_file = os.path.join(data_dir, "seed")
+        seed = None
+        if os.path.exists(seed_file):
+            with open(seed_file) as text_file:
+                seed = text_file.read()
+        if seed != str(args.seed):
+            print("Generating", row_count, "publications into", data_dir, "...")
+            SyntheticDataGenerator(data_dir, row_count, args.seed).generate()
+            with open(seed_file, 'w') as text_file:
+                text_file.write(str(args.seed))
+        if args.generate_only:
+            continue
+
+        section_list = args.sections
+        if not section_list:
+            section_list = [x.split(":")[0] for x in SyntheticDataGenerator.config_text().splitlines()
+                            if x and not x[0].isspace() and x != "defaults:"]
+        for section in section_list:
+            record = run_section(args.script, data_dir, section)
+            record['rows'] = row_count
+            # Sections that don't read any rows (e.g. reused database) have no
+            # throughput
+            if record['rows_read'] and record['wall']:
+                record['rows_per_second'] = round(record['rows_read'] / record['wall'])
+                throughput = "%10d" % record['rows_per_second']
+            else:
+                record['rows_per_second'] = None
+                throughput = "%10s" % "n/a"
+            result_list.append(record)
+            print("%10d  %-20s %10.3f s %10.3f s CPU %s rows/s %10d KiB" %
+                  (row_count, section, record['wall'], record['cpu'], throughput, record['peak_rss_kb']))
+
+    if result_list:
+        with open(args.results_file, 'w') as json_file:
+            json.dump({'version': __version__, 'seed': args.seed, 'results': result_list}, json_file,
+                      indent=2, separators=(',', ': '), sort_keys=True)
+            json_file.write("\n")
+
+
+if __name__ == "__main__":
+    # This code is executed only when scientometry-benchmark is being run
+    # directly as a script.  Since local variables are allocated much faster
+    # than global variables, it is a good practice to encapsulate whole initial
+    # code into the main() function.
+    main()
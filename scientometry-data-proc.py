@@ -1,4 +1,4 @@
-#!/usr/bin/env python2.7
+#!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 #
 # scientometry-data-proc.py -- A scientometric data processing script.
@@ -21,36 +21,478 @@
 
 """A scientometric data processing script.
 
-usage: scientometry-data-proc.py [-h] [-c CONFIG_FILE] [SECTION [SECTION ...]]
+usage: scientometry-data-proc.py [-h] [-v] [-c CONFIG_FILE] [-f] [-n] [-j N]
+                                 [-p N] [--cache-dir CACHE_DIR]
+                                 [--cache-size MB] [--database DATABASE_FILE]
+                                 [--profile REPORT_FILE]
+                                 [--profile-dir PROFILE_DIR] [-w]
+                                 [--watch-interval SECONDS]
+                                 [--serve [HOST:]PORT] [--serve-cache N]
+                                 [SECTION ...]
 
 Process set of scientometric data defined in CONFIG_FILE ('config.yaml' as
 default). If no SECTION is specified, all sections defined in CONFIG_FILE will
 be processed.
 
 positional arguments:
-  SECTION         section defined in CONFIG_FILE
-
-optional arguments:
-  -h, --help      show this help message and exit
-  -c CONFIG_FILE  load configuration from CONFIG_FILE
-
-Data for each individual section are loaded from the set of files in CSV format
-defined by 'source' key in the CONFIG_FILE. Actual data processing procedure
-depends on defined output data class that is defined by 'class' key in the
-CONFIG_FILE. The name of the section defines prefix for the output data
-files. See project documentation for more details on CONFIG_FILE syntax.
+  SECTION               section defined in CONFIG_FILE
+
+options:
+  -h, --help            show this help message and exit
+  -v, --version         show program's version number and exit
+  -c CONFIG_FILE        load configuration from CONFIG_FILE
+  -f, --force           rebuild all selected sections even if they are up to
+                        date
+  -n, --dry-run         only list the sections that would be rebuilt
+  -j N, --jobs N        process sections in N parallel processes (default: 1)
+  -p N, --parse-jobs N  parse each streamed source file in N chunks processed
+                        in parallel (default: 1)
+  --cache-dir CACHE_DIR
+                        cache parsed source files in CACHE_DIR
+  --cache-size MB       maximum size of CACHE_DIR in MiB (default: 1024)
+  --database DATABASE_FILE
+                        load source files of the 'sqlite' storage engine into
+                        DATABASE_FILE instead of an in-memory database
+  --profile REPORT_FILE
+                        write JSON report of time and memory usage of each
+                        processing stage into REPORT_FILE ('-' for standard
+                        output)
+  --profile-dir PROFILE_DIR
+                        dump cProfile statistics of each section into
+                        PROFILE_DIR (implies --profile)
+  -w, --watch           keep running and rebuild the sections whenever their
+                        input files change (the parsed data are kept in
+                        memory, sections are processed serially)
+  --watch-interval SECONDS
+                        polling interval of --watch and the time the input
+                        files have to stay unchanged before the rebuild
+                        (default: 2)
+  --serve [HOST:]PORT   serve output data of the sections as JSON over HTTP on
+                        PORT (of HOST, default: localhost) instead of writing
+                        the output files
+  --serve-cache N       number of responses kept in the LRU cache of --serve
+                        (default: 128)
+
+Data for each individual section are loaded from the set of files in CSV
+format defined by 'source' key in the CONFIG_FILE. Actual data processing
+procedure depends on defined output data class that is defined by 'class' key
+in the CONFIG_FILE. The name of the section defines prefix for the output data
+files. Sections whose source files, journal catalog and configuration haven't
+changed since the last run (according to the build manifest stored in the
+output directory) are skipped. See project documentation for more details on
+CONFIG_FILE syntax.
 
 """
 
-from __future__ import unicode_literals
 import argparse
-import unicodecsv
-import yaml
+import cProfile
+import collections
+import collections.abc
+import concurrent.futures
+import contextlib
+import csv
+import ctypes
+import ctypes.util
+import datetime
+import decimal
+import errno
 import glob
+import hashlib
+import http.server
+import io
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
 import os
+import re
+import resource
+import select
+import sqlite3
+import struct
+import sys
+import time
+import traceback
+import unicodedata
+import urllib.parse
+from array import array
+from difflib import SequenceMatcher
 from operator import itemgetter
 
-__version__ = "0.4"
+import yaml
+
+__version__ = "0.5"
+
+
+class StageProfiler(object):
+
+    """Collector of the resource usage of the processing stages.
+
+    Measures wall-clock time, CPU time and peak resident set size of the
+    stages (see stage()) and sections (see section()) of the processing.
+    Additional information of the stage (e.g. number of rows read or
+    written) can be stored into the yielded record.  Stages are collected
+    into the record of the section they are executed in.  If the profiler is
+    not enabled, nothing is measured.  A single module-level instance
+    ('stage_profiler') is used, so that the stages can be measured anywhere
+    in the code.  If the profile directory is set, each section is also
+    profiled by cProfile and the statistics are dumped into the
+    '{section_name}.prof' file in this directory.
+
+    Attributes:
+    enabled -- True if the stages are measured
+    profile_dir -- directory of the cProfile dumps (None = no dumps)
+    stage_list -- list of the records of the stages measured outside of any
+                  section
+    section_list -- list of the records of the measured sections
+
+    """
+
+    def __init__(self):
+        """Initialize disabled StageProfiler object."""
+        self.configure()
+
+    def configure(self, enabled=False, profile_dir=None):
+        """Enable or disable the profiler and clear all records.
+
+        Keyword arguments:
+        enabled -- True if the stages are measured (default: False)
+        profile_dir -- directory of the cProfile dumps (default: None)
+
+        """
+        self.enabled = enabled
+        self.profile_dir = profile_dir
+        self.stage_list = []
+        self.section_list = []
+
+    @staticmethod
+    def usage():
+        """Return tuple (wall-clock time, CPU time, peak RSS in KiB)."""
+        cpu_times = os.times()
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return time.time(), cpu_times[0] + cpu_times[1], peak_rss
+
+    @contextlib.contextmanager
+    def measure(self, record):
+        """Measure the resource usage of the enclosed code into the record."""
+        start_wall, start_cpu, start_rss = self.usage()
+        try:
+            yield record
+        finally:
+            end_wall, end_cpu, end_rss = self.usage()
+            record['wall'] = round(end_wall - start_wall, 6)
+            record['cpu'] = round(end_cpu - start_cpu, 6)
+            record['peak_rss_kb'] = end_rss
+
+    @contextlib.contextmanager
+    def stage(self, stage_name, **info):
+        """Measure a processing stage.
+
+        Positional arguments:
+        stage_name -- name of the stage
+
+        Keyword arguments are stored into the record of the stage.
+
+        Yields the record of the stage (dict).
+
+        """
+        if not self.enabled:
+            yield {}
+            return
+
+        record = dict(info, stage=stage_name)
+        stage_list = self.stage_list
+        with self.measure(record):
+            yield record
+        stage_list.append(record)
+
+    @contextlib.contextmanager
+    def section(self, section_name):
+        """Measure processing of a section.
+
+        Positional arguments:
+        section_name -- name of the section
+
+        Yields the record of the section (dict).
+
+        """
+        if not self.enabled:
+            yield {}
+            return
+
+        record = {'section': section_name, 'stages': []}
+        outer_stage_list, self.stage_list = self.stage_list, record['stages']
+        profile = cProfile.Profile() if self.profile_dir else None
+        try:
+            with self.measure(record):
+                if profile:
+                    profile.enable()
+                try:
+                    yield record
+                finally:
+                    if profile:
+                        profile.disable()
+        finally:
+            self.stage_list = outer_stage_list
+            for key in ['rows_read', 'rows_written']:
+                record[key] = sum(x.get(key, 0) for x in record['stages'])
+            self.section_list.append(record)
+            if profile:
+                make_directory(self.profile_dir)
+                profile.dump_stats(os.path.join(self.profile_dir, section_name + ".prof"))
+
+    def report(self, run_record):
+        """Return the profile report.
+
+        Positional arguments:
+        run_record -- record of the whole run (dict)
+
+        Returns dict containing the run record, the records of the stages
+        measured outside of any section ('stages') and the records of the
+        sections ('sections').
+
+        """
+        report = dict(run_record)
+        report['version'] = __version__
+        report['stages'] = self.stage_list
+        report['sections'] = self.section_list
+
+        return report
+
+
+stage_profiler = StageProfiler()
+
+
+class DirectoryIndex(object):
+
+    """Index of the directory listings used to resolve filename patterns.
+
+    Lists each directory only once and resolves all filename patterns against
+    the listings, so that many patterns pointing into the same directory
+    don't have to scan it again and again.  The only meta variable of the
+    filename patterns is '{date}' that stands for an arbitrary string--
+    preferably a date.  If more files match the pattern, the one with the
+    latest date is selected (see parse_date()), files with the same date or
+    without any date are ordered alphabetically.  Patterns with the meta
+    variable in the directory part are resolved by glob.  The index reflects
+    the directories at the time they were listed, a new index has to be
+    created to notice new files.
+
+    Attributes:
+    listing_dict -- dict of lists of file names associated by directory
+    match_dict -- dict of sorted lists of the matching files associated by
+                  pattern
+
+    """
+
+    # Date formats recognised at the beginning of the '{date}' string, tuples
+    # contain positions of year, month and day within the matched groups
+    date_format_list = [
+        (re.compile(r"(\d{4})-?(\d{2})-?(\d{2})(?!\d)"), (1, 2, 3)),
+        (re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})(?!\d)"), (3, 2, 1)),
+        (re.compile(r"(\d{4})-(\d{2})(?!\d)"), (1, 2, None)),
+        (re.compile(r"(\d{4})(?!\d)"), (1, None, None)),
+    ]
+
+    def __init__(self):
+        """Initialize empty DirectoryIndex object."""
+        self.listing_dict = {}
+        self.match_dict = {}
+
+    @staticmethod
+    def parse_date(text):
+        """Parse date at the beginning of given string.
+
+        Recognises YYYY-MM-DD, YYYYMMDD, DD.MM.YYYY, YYYY-MM and YYYY formats
+        (missing month and day default to 1).
+
+        Positional arguments:
+        text -- parsed string
+
+        Returns datetime.date object or None if the string doesn't start with
+        a valid date.
+
+        """
+        for pattern, position_list in DirectoryIndex.date_format_list:
+            match = pattern.match(text)
+            if not match:
+                continue
+            try:
+                return datetime.date(*[int(match.group(x)) if x else 1 for x in position_list])
+            except ValueError:
+                continue
+
+        return None
+
+    def listing(self, directory):
+        """Return list of file names in given directory ('' = current
+        directory), the directory is listed only once."""
+        if directory not in self.listing_dict:
+            try:
+                self.listing_dict[directory] = os.listdir(directory or ".")
+            except OSError:
+                self.listing_dict[directory] = []
+
+        return self.listing_dict[directory]
+
+    def matches(self, filename_pattern, data_root=None):
+        """Return all files matching filename pattern.
+
+        Positional arguments:
+        filename_pattern -- filename pattern, relative patterns are anchored
+                            to the data root directory (if it is given)
+
+        Keyword arguments:
+        data_root -- data root directory (default: None = current directory)
+
+        Returns list of (date string, file name) tuples sorted from the oldest
+        to the latest file, the date string is the part of the file name
+        matched by the '{date}' meta variable.  If the pattern doesn't contain
+        the meta variable, the pattern itself is returned with an empty date
+        string.
+
+        """
+        path = os.path.join(data_root, filename_pattern) if data_root else filename_pattern
+        if "{date}" not in path:
+            return [("", path)]
+        if path in self.match_dict:
+            return self.match_dict[path]
+
+        directory, basename = os.path.split(path)
+        if "{date}" in directory:
+            match_pattern = re.compile("^" + "([^/]*)".join(re.escape(x) for x in path.split("{date}")) + "$")
+            file_list = glob.glob(path.replace("{date}", "*"))
+        else:
+            match_pattern = re.compile("^" + "(.*)".join(re.escape(x) for x in basename.split("{date}")) + "$")
+            # Hidden files are not matched unless explicitly requested
+            file_list = [os.path.join(directory, x) for x in self.listing(directory)
+                         if match_pattern.match(x) and (basename.startswith(".") or not x.startswith("."))]
+
+        candidate_list = []
+        for data_file in file_list:
+            date_string = match_pattern.match(data_file if "{date}" in directory else os.path.basename(data_file)).group(1)
+            date = DirectoryIndex.parse_date(date_string)
+            candidate_list.append((date is not None, date, data_file, date_string))
+        candidate_list.sort()
+        self.match_dict[path] = [(x[3], x[2]) for x in candidate_list]
+
+        return self.match_dict[path]
+
+    def resolve(self, filename_pattern, data_root=None):
+        """Resolve filename pattern.
+
+        Positional arguments:
+        filename_pattern -- filename pattern, relative patterns are anchored
+                            to the data root directory (if it is given)
+
+        Keyword arguments:
+        data_root -- data root directory (default: None = current directory)
+
+        Returns the name of the file with the latest date that matches the
+        pattern, the pattern itself if it doesn't contain the '{date}' meta
+        variable, or None if no file matches the pattern.
+
+        """
+        match_list = self.matches(filename_pattern, data_root)
+        return match_list[-1][1] if match_list else None
+
+
+class RowFilter(object):
+
+    """Row predicate of the source data.
+
+    Combines conditions on the values of the source data columns given by the
+    'filter' parameter of the section configuration.  The condition of each
+    column is either a single value or a list of allowed values (compared as
+    strings), or a dict with 'min' and/or 'max' keys defining a range of
+    integer values (values that are not integers don't match the range).  All
+    conditions have to be met.  The predicate is compiled against the header
+    of the source data file (see compile()) and evaluated on the records
+    (lists of values) returned by csv.reader, so that the rejected rows are
+    dropped before any row dicts are built for them.
+
+    Attributes:
+    condition_list -- list of (column, set of values, minimum, maximum)
+                      tuples (unused parts of the condition are None)
+    columns -- frozenset of columns used by the conditions
+    signature -- canonical string form of the conditions (equal filters have
+                 equal signatures)
+
+    """
+
+    def __init__(self, filter_dict):
+        """Initialize RowFilter object.
+
+        Positional arguments:
+        filter_dict -- dict of conditions associated by column name
+
+        Raises ValueError if any of the conditions is not valid.
+
+        """
+        if type(filter_dict) is not dict or not filter_dict:
+            raise ValueError("Filter has to be a non-empty dict of conditions")
+
+        condition_list = []
+        signature_dict = {}
+        for col, condition in sorted(filter_dict.items()):
+            if type(condition) is dict:
+                if not condition or not set(condition) <= set(['min', 'max']):
+                    raise ValueError("Range condition of column '" + col + "' has to contain 'min' and/or 'max'")
+                try:
+                    minimum = int(condition['min']) if condition.get('min') is not None else None
+                    maximum = int(condition['max']) if condition.get('max') is not None else None
+                except (TypeError, ValueError):
+                    raise ValueError("Range condition of column '" + col + "' has to contain integers")
+                condition_list.append((col, None, minimum, maximum))
+                signature_dict[col] = {'min': minimum, 'max': maximum}
+            else:
+                values = condition if type(condition) is list else [condition]
+                values = sorted(set("" if x is None else str(x) for x in values))
+                condition_list.append((col, frozenset(values), None, None))
+                signature_dict[col] = values
+        self.condition_list = condition_list
+        self.columns = frozenset(x[0] for x in condition_list)
+        self.signature = json.dumps(signature_dict, sort_keys=True)
+
+    def compile(self, fieldnames):
+        """Compile the predicate for given header of the source data file.
+
+        Positional arguments:
+        fieldnames -- list of field names of the source data file
+
+        Returns function accepting a CSV record (list of values) and returning
+        True if the record meets all conditions.  Missing values of short
+        records are treated as empty strings.
+
+        Raises ValueError if any of the filtered columns is missing.
+
+        """
+        test_list = []
+        for col, values, minimum, maximum in self.condition_list:
+            if col not in fieldnames:
+                raise ValueError("Filtered column '" + col + "' not found in the source data")
+            # The last of the duplicate columns wins as in csv.DictReader
+            index = len(fieldnames) - 1 - fieldnames[::-1].index(col)
+            test_list.append((index, values, minimum, maximum))
+
+        def test(record):
+            length = len(record)
+            for index, values, minimum, maximum in test_list:
+                value = record[index] if index < length else ""
+                if values is not None:
+                    if value not in values:
+                        return False
+                    continue
+                try:
+                    number = int(value)
+                except ValueError:
+                    return False
+                if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+                    return False
+            return True
+
+        return test
 
 
 class SectionConfig(object):
@@ -61,20 +503,47 @@ class SectionConfig(object):
     that can be directly distributed among all the other objects.
 
     Attributes:
+    section_name -- name of the section
+    config_dict -- configuration dict of the section (merged with defaults)
+    directory_index -- DirectoryIndex object resolving the filename patterns
+    data_root -- directory the relative filename patterns are anchored to
     output_data_class -- output data class of the current section
     source_data_file -- source data file  or a dict of source data files
+    source_snapshot_files -- list of (date string, file name) tuples of all
+                             files matching the source data file pattern, or a
+                             dict of such lists (for the output data classes
+                             that process all snapshots, None otherwise)
     year_list -- list of the processed years
     group_list -- list of the processed groups
+    group_col -- column defining the groups (for IndicatorsData class)
+    group_separator -- separator of multiple groups in 'group_col' column
+    priority_list -- list of datasets in the order of precedence (for
+                     MergedData class)
     source_data_files -- dict of source data files for each citation register
     journal_catalog_file -- journal catalog file name
+    alias_file -- author alias file name (for AuthorsData class)
     extract_cols -- list of extracted input columns (for ResultsData class)
     select_cols -- list of selected columns output columns
+    row_key -- column defining the rows of the output matrices (for PivotData
+               class)
+    column_key -- column defining the columns of the output matrices (for
+                  PivotData class)
+    measure_list -- list of (name, aggregation, column) tuples of the computed
+                    measures (for PivotData class)
+    storage -- storage engine of the source data ('rows', 'columnar',
+               'streaming', 'sqlite' or None for automatic selection)
+    row_filter -- RowFilter object selecting the processed rows of the source
+                  data (None = all rows)
+    query -- SQL query (for SqlData class)
+    output_format -- format of the output file(s) ('csv' or 'columnar')
     output_directory -- directory for output file(s)
     output_data_file -- output data file for the current section
 
     """
 
-    def __init__(self, section_name, section_config):
+    measure_pattern = re.compile(r"^(count|sum|mean|distinct)\s*(?:\(\s*(.*?)\s*\))?$")
+
+    def __init__(self, section_name, section_config, directory_index=None):
         """Initialize SectionConfig object.
 
         Encapsulates section configuration loaded by ConfigFileParser into a
@@ -84,7 +553,7 @@ class SectionConfig(object):
         output data filename(s).  Source data files are specified by the
         'source' parameter of the configuration file--it can be either a dict or
         a string.  The filename can contain meta variable patterns that are
-        expanded by __eval_filename_pattern() static method.  Note that not all
+        expanded by __eval_filename_pattern() method.  Note that not all
         attributes are required for particular output data class--these unused
         keys are set to None.
 
@@ -92,20 +561,47 @@ class SectionConfig(object):
         section_name -- name of the section
         section_config -- configuration dict extracted by ConfigFileParser
 
+        Keyword arguments:
+        directory_index -- DirectoryIndex object shared by the sections
+                           (default: None = private index)
+
         """
+        self.section_name = section_name
+        self.config_dict = section_config
+        self.directory_index = directory_index if directory_index else DirectoryIndex()
+
+        # Initialize 'data_root' attribute
+        if 'data-root' in section_config:
+            data_root = section_config['data-root']
+        else:
+            data_root = None
+        self.data_root = data_root
+
         # Initialize 'output_data_class' attribute
         self.output_data_class = section_config['class']
 
         # Initialize 'source_data_file' attribute
         if type(section_config['source']) is dict:
             source_data_file = {}
-            for dataset, filename_pattern in section_config['source'].iteritems():
+            for dataset, filename_pattern in section_config['source'].items():
                 filename = self.__eval_filename_pattern(filename_pattern)
                 source_data_file[dataset] = filename
         else:
-            source_data_file = SectionConfig.__eval_filename_pattern(section_config['source'])
+            source_data_file = self.__eval_filename_pattern(section_config['source'])
         self.source_data_file = source_data_file
 
+        # Initialize 'source_snapshot_files' attribute
+        if getattr(globals().get(self.output_data_class), 'snapshots', False):
+            if type(section_config['source']) is dict:
+                source_snapshot_files = {}
+                for dataset, filename_pattern in section_config['source'].items():
+                    source_snapshot_files[dataset] = self.directory_index.matches(filename_pattern, self.data_root)
+            else:
+                source_snapshot_files = self.directory_index.matches(section_config['source'], self.data_root)
+        else:
+            source_snapshot_files = None
+        self.source_snapshot_files = source_snapshot_files
+
         # Initialize 'year_list' attribute
         if 'years' in section_config:
             min_year, max_year = section_config['years'].split('-')
@@ -121,13 +617,41 @@ class SectionConfig(object):
             group_list = None
         self.group_list = group_list
 
+        # Initialize 'group_col' attribute
+        if 'group-by' in section_config:
+            group_col = section_config['group-by']
+        else:
+            group_col = None
+        self.group_col = group_col
+
+        # Initialize 'group_separator' attribute
+        if 'group-separator' in section_config:
+            group_separator = section_config['group-separator']
+        else:
+            group_separator = None
+        self.group_separator = group_separator
+
+        # Initialize 'priority_list' attribute
+        if 'priority' in section_config:
+            priority_list = section_config['priority']
+        else:
+            priority_list = None
+        self.priority_list = priority_list
+
         # Initialize 'journal_catalog' attribute
         if 'journal-catalog' in section_config:
-            journal_catalog_file = SectionConfig.__eval_filename_pattern(section_config['journal-catalog'])
+            journal_catalog_file = self.__eval_filename_pattern(section_config['journal-catalog'])
         else:
             journal_catalog_file = None
         self.journal_catalog_file = journal_catalog_file
 
+        # Initialize 'alias_file' attribute
+        if 'aliases' in section_config:
+            alias_file = self.__eval_filename_pattern(section_config['aliases'])
+        else:
+            alias_file = None
+        self.alias_file = alias_file
+
         # Initialize 'extract_cols' attribute
         if 'extract' in section_config:
             extract_cols = section_config['extract']
@@ -142,6 +666,72 @@ class SectionConfig(object):
             select_cols = None
         self.select_cols = select_cols
 
+        # Initialize 'row_key' attribute
+        if 'row-key' in section_config:
+            row_key = section_config['row-key']
+        else:
+            row_key = None
+        self.row_key = row_key
+
+        # Initialize 'column_key' attribute
+        if 'column-key' in section_config:
+            column_key = section_config['column-key']
+        else:
+            column_key = None
+        self.column_key = column_key
+
+        # Initialize 'measure_list' attribute
+        if 'measures' in section_config:
+            measure_list = []
+            for name, measure in section_config['measures'].items():
+                match = self.measure_pattern.match(str(measure).strip())
+                if not match or (match.group(1) != 'count' and not match.group(2)):
+                    raise ValueError("Invalid measure '" + str(measure) + "' of section '" + section_name + "'")
+                measure_list.append((str(name), match.group(1), match.group(2) or None))
+        else:
+            measure_list = None
+        self.measure_list = measure_list
+
+        # Initialize 'storage' attribute
+        if 'storage' in section_config:
+            storage = section_config['storage']
+        else:
+            storage = None
+        # Output data classes that need the rows can't use the streaming mode
+        # (a storage engine required by the class overrides the configured one)
+        output_data_class = globals().get(self.output_data_class)
+        if storage == "streaming" and not getattr(output_data_class, 'storage', None) and \
+           not getattr(output_data_class, 'streamable', False):
+            raise ValueError("Storage engine 'streaming' can't be used by section '" + section_name + "' (" +
+                             self.output_data_class + " requires the rows of the source data)")
+        self.storage = storage
+
+        # Initialize 'row_filter' attribute
+        if 'filter' in section_config:
+            try:
+                row_filter = RowFilter(section_config['filter'])
+            except ValueError as e:
+                raise ValueError(str(e) + " (section '" + section_name + "')")
+        else:
+            row_filter = None
+        self.row_filter = row_filter
+
+        # Initialize 'query' attribute
+        if 'query' in section_config:
+            query = section_config['query']
+        else:
+            query = None
+        self.query = query
+
+        # Initialize 'output_format' attribute
+        if 'output-format' in section_config:
+            output_format = section_config['output-format']
+        else:
+            output_format = 'csv'
+        if output_format not in ('csv', 'columnar'):
+            raise ValueError("Unknown output format '" + str(output_format) + "' of section '" + section_name + "'")
+        self.output_format = output_format
+
         # Initialize 'output_directory' attribute
         if 'output-dir' in section_config:
             output_directory = section_config['output-dir']
@@ -153,31 +743,24 @@ class SectionConfig(object):
         dir_prefix = (output_directory + "/") if output_directory else ""
         self.output_data_file = dir_prefix + section_name + ".csv"
 
-    @staticmethod
-    def __eval_filename_pattern(filename_pattern):
+    def __eval_filename_pattern(self, filename_pattern):
         """Evaluate filename pattern.
 
         Performs filename pattern expansion.  Currently the only meta variable
         implemented to be used with filename pattern is '{date}' that stands for
         an arbitrary string--preferably a date in YYYY-MM-DD format.  If more
-        files in current directory match the pattern, the method returns the
-        last one from the list of the matches sorted in alphabetical order.
+        files match the pattern, the method returns the one with the latest
+        date.  Relative patterns are anchored to the data root directory (if
+        configured).  See DirectoryIndex.resolve().
 
         Positional arguments:
         filename_pattern -- filename pattern
 
-        Returns the name last file name in current directory that matches the
-        pattern.  Returns None if no file matches the pattern.
+        Returns the name of the latest file that matches the pattern.  Returns
+        None if no file matches the pattern.
 
         """
-        if "{date}" in filename_pattern:
-            file_list = sorted(glob.glob(filename_pattern.replace("{date}", "*")))
-            if file_list:
-                return file_list[-1]
-            else:
-                return None
-
-        return filename_pattern
+        return self.directory_index.resolve(filename_pattern, self.data_root)
 
 
 class ConfigFileParser(object):
@@ -192,6 +775,7 @@ class ConfigFileParser(object):
     Attributes:
     section_config_dict -- dict containing SectionConfig objects for all
                            sections
+    directory_index -- DirectoryIndex object shared by all sections
 
     """
 
@@ -203,24 +787,28 @@ class ConfigFileParser(object):
         first and its content is then merged into every single section-specific
         configuration.  The resulting dictionary is being used for instantiation
         of the SectionConfig object for each individual section.  These objects
-        are stored into the 'section_config_dict' attribute.
+        are stored into the 'section_config_dict' attribute.  Filename patterns
+        of all sections are resolved by a single DirectoryIndex object.
 
         Positional arguments:
         config_file -- configuration YAML file name
 
         """
-        with open(config_file, 'r') as yaml_file:
-            yaml_dict = yaml.load(yaml_file)
+        with open(config_file, 'rb') as yaml_file:
+            yaml_dict = yaml.safe_load(yaml_file)
 
         section_config_dict = {}
         default_config = yaml_dict['defaults']
+        directory_index = DirectoryIndex()
 
-        for section, config in yaml_dict.iteritems():
+        for section, config in yaml_dict.items():
             if section != 'defaults':
                 if config:
-                    section_config_dict[section] = SectionConfig(section, dict(default_config.items() + config.items()))
+                    section_config_dict[section] = SectionConfig(section, dict(default_config, **config), directory_index)
                 else:
-                    section_config_dict[section] = SectionConfig(section, default_config)
+                    section_config_dict[section] = SectionConfig(section, default_config, directory_index)
+
+        self.directory_index = directory_index
 
         self.section_config_dict = section_config_dict
 
@@ -241,534 +829,5098 @@ class ConfigFileParser(object):
         if selected_sections:
             return [self.section_config_dict[x] for x in selected_sections]
         else:
-            return self.section_config_dict.values()
+            return list(self.section_config_dict.values())
 
+    def refresh(self):
+        """Evaluate filename patterns of all sections again.
 
-class JournalCatalog(object):
+        Recreates SectionConfig objects from their configuration dicts without
+        parsing the configuration file again.  The directories are listed
+        again by a new DirectoryIndex object, so that the '{date}' patterns
+        match the files that have appeared since the configuration file was
+        parsed.
 
-    """Data container for a journal catalog.
+        """
+        self.directory_index = DirectoryIndex()
+        for section, section_config in self.section_config_dict.items():
+            self.section_config_dict[section] = SectionConfig(section, section_config.config_dict,
+                                                              self.directory_index)
+
+
+class BuildManifest(object):
 
-    Parses journal catalog file using unicodecsv.DictReader.  Data are saved
-    into a dictionary ('journal_dict') associated by value from the 'ISSN'
-    column.  The 'ISSN' values themselves are deleted from the journal
-    dictionary, as well as from the list of field names.
+    """Build manifest of the output directory.
+
+    Keeps record of the last build of each section whose output data are
+    written into the same output directory.  The record of each section
+    contains the script version and the SHA-1 hash of the script file, the
+    configuration of the section, signatures (size, modification time and
+    SHA-1 hash) of all input files (source data files and journal catalog)
+    and the list of written output files.  The manifest is stored in JSON
+    format in the output directory ('manifest_file').  A section is
+    considered up to date if the contents of its inputs, its configuration
+    and the script itself haven't changed since the recorded build and all
+    recorded output files exist.
 
     Attributes:
-    fieldnames -- list of the journal catalog data field names
-    journal_dict -- dictionary of journal catalog data
+    manifest_file -- manifest file name
+    section_dict -- dict of build records associated by section name
 
     """
 
-    def __init__(self, journal_catalog_file):
-        """Parse journal catalog file and initialize JournalCatalog object.
+    manifest_basename = ".scientometry-manifest.json"
+    script_sha1 = None
+
+    def __init__(self, output_directory=None):
+        """Initialize BuildManifest object.
+
+        Loads the manifest from the given output directory ('output_directory')
+        if it exists.
 
-        Uses unicodecsv.DictReader to parse given CSV file
-        ('journal_catalog_file') and extracts its contents into 'journal_dict'
-        attribute.
+        Keyword arguments:
+        output_directory -- output directory (default: None = current
+                            directory)
+
+        """
+        self.manifest_file = os.path.join(output_directory or "", self.manifest_basename)
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, 'r') as json_file:
+                self.section_dict = json.load(json_file)
+        else:
+            self.section_dict = {}
+
+    @staticmethod
+    def input_files(section_config):
+        """Return list of input files of given section.
 
         Positional arguments:
-        journal_catalog_file -- journal catalog file name
+        section_config -- SectionConfig object
+
+        Returns sorted list of source data files (including all snapshots if
+        the section processes them), journal catalog file and author alias
+        file.
 
         """
-        with open(journal_catalog_file, 'r') as csv_file:
-            # The 'utf-8-sig' encoding is required, because some input CSV files
-            # contain CSV preamble (for UTF-8) that has to be ignored.
-            csv_dict_reader = unicodecsv.DictReader(csv_file, encoding='utf-8-sig')
-            fieldnames = csv_dict_reader.fieldnames
-            fieldnames.remove('ISSN')
-            journal_dict = {}
-            for row in csv_dict_reader:
-                journal_dict[row['ISSN']] = row
-                del journal_dict[row['ISSN']]['ISSN']
+        if type(section_config.source_data_file) is dict:
+            input_file_list = list(section_config.source_data_file.values())
+        else:
+            input_file_list = [section_config.source_data_file]
+        if type(section_config.source_snapshot_files) is dict:
+            input_file_list.extend(x for y in section_config.source_snapshot_files.values() for d, x in y)
+        elif section_config.source_snapshot_files:
+            input_file_list.extend(x for d, x in section_config.source_snapshot_files)
+        if section_config.journal_catalog_file:
+            input_file_list.append(section_config.journal_catalog_file)
+        if section_config.alias_file:
+            input_file_list.append(section_config.alias_file)
+
+        return sorted(set(input_file_list))
 
-        self.fieldnames = fieldnames
-        self.journal_dict = journal_dict
+    @staticmethod
+    def file_signature(data_file, recorded_signature=None):
+        """Return signature of given file.
 
+        The SHA-1 hash of the file is computed only if the size or the
+        modification time of the file differ from the recorded signature
+        ('recorded_signature').
 
-class ScientometryData(object):
+        Positional arguments:
+        data_file -- file name
 
-    """Data container for a single set of the source scientometric data
+        Keyword arguments:
+        recorded_signature -- signature recorded by the last build (default:
+                              None)
 
-    Parses source data file using unicodecsv.DictReader into a list of rows
-    ('data').  The class also provides a set of useful methods for further data
-    processing.
+        Returns dict with 'size', 'mtime' and 'sha1' keys.
 
-    Attributes:
-    data -- extracted scientometric data
+        """
+        stat = os.stat(data_file)
+        if recorded_signature and recorded_signature['size'] == stat.st_size and \
+           recorded_signature['mtime'] == stat.st_mtime:
+            return recorded_signature
 
-    """
+        sha1 = hashlib.sha1()
+        with open(data_file, 'rb') as binary_file:
+            for block in iter(lambda: binary_file.read(1 << 20), b''):
+                sha1.update(block)
 
-    def __init__(self, data_file):
-        """Parse source data file and initialize ScientometryData object.
+        return {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha1': sha1.hexdigest()}
 
-        Uses unicodecsv.DictReader to parse given CSV file ('data_file') and
-        extracts its contents into 'journal_dict' attribute.
+    @classmethod
+    def script_signature(cls):
+        """Return SHA-1 hash of the script file (computed once per process)."""
+        if cls.script_sha1 is None:
+            cls.script_sha1 = BuildManifest.file_signature(os.path.abspath(__file__))['sha1']
+
+        return cls.script_sha1
+
+    def build_record(self, section_config):
+        """Compose build record of given section based on its current inputs.
 
         Positional arguments:
-        data_file -- source data file name
+        section_config -- SectionConfig object
+
+        Returns build record (dict) or None if some of the input files doesn't
+        exist.
 
         """
-        with open(data_file, 'r') as csv_file:
-            # The 'utf-8-sig' encoding is required, because some input CSV files
-            # contain CSV preamble (for UTF-8) that has to be ignored.
-            csv_dict_reader = unicodecsv.DictReader(csv_file, encoding='utf-8-sig')
-            data = []
-            for row in csv_dict_reader:
-                data.append(row)
-        self.data = data
+        recorded_inputs = self.section_dict.get(section_config.section_name, {}).get('inputs', {})
+        inputs = {}
+        for data_file in BuildManifest.input_files(section_config):
+            if not data_file or not os.path.exists(data_file):
+                return None
+            inputs[data_file] = BuildManifest.file_signature(data_file, recorded_inputs.get(data_file))
 
-    def publication_counts_per_year(self, year_list=None):
-        """Count number of publications per each year.
+        # Round trip through JSON normalises the config (e.g. tuples, keys)
+        config = json.loads(json.dumps(section_config.config_dict, sort_keys=True, default=str))
 
-        Counts lines containing the same year and maps these counts onto the
-        year_list, returning the dictionary of the publication counts per year.
-        If the year list is not specified, an intrinsic set of unique years
-        extracted from the data is being used instead.
+        return {'version': __version__, 'script': BuildManifest.script_signature(), 'config': config,
+                'inputs': inputs}
 
-        Keyword arguments:
-        year_list -- list of processed years (default: None)
+    def is_up_to_date(self, section_config):
+        """Check whether given section has to be rebuilt.
 
-        Returns dictionary of publication counts per year.
+        If the section is up to date, but some of its input files have been
+        touched without changing their contents, the recorded signatures are
+        updated, so that the files don't have to be hashed again next time
+        (the manifest has to be saved explicitly).
+
+        Positional arguments:
+        section_config -- SectionConfig object
+
+        Returns True if the section is up to date.
 
         """
-        if not year_list:
-            year_list = set([row['Year'] for row in self.data])
+        recorded = self.section_dict.get(section_config.section_name)
+        current = self.build_record(section_config)
+        if not recorded or not current:
+            return False
+        if recorded['version'] != current['version'] or recorded.get('script') != current['script'] or \
+           recorded['config'] != current['config']:
+            return False
+        if sorted(recorded['inputs'].keys()) != sorted(current['inputs'].keys()):
+            return False
+        for data_file, signature in current['inputs'].items():
+            if recorded['inputs'][data_file]['sha1'] != signature['sha1']:
+                return False
+        for output_file in recorded.get('outputs', []):
+            if not os.path.exists(output_file):
+                return False
+
+        recorded['inputs'] = current['inputs']
+        return True
+
+    def record(self, section_config, output_files):
+        """Record successful build of given section and save the manifest.
 
-        publication_count_dict = {k: 0 for k in year_list}
-        for row in self.data:
-            if row['Year'] in year_list:
-                publication_count_dict[row['Year']] += 1
+        Positional arguments:
+        section_config -- SectionConfig object
+        output_files -- list of written output files
 
-        return publication_count_dict
+        """
+        build_record = self.build_record(section_config)
+        build_record['outputs'] = sorted(output_files)
+        self.section_dict[section_config.section_name] = build_record
+        self.save()
 
-    def citation_counts_per_year(self, year_list=None):
-        """Count number of citations per each year.
+    def save(self):
+        """Save the manifest into 'manifest_file'."""
+        with open(self.manifest_file, 'w') as json_file:
+            json.dump(self.section_dict, json_file, indent=2, sort_keys=True)
+            json_file.write("\n")
 
-        Sums citations on the lines containing the same year and maps these sums
-        onto the year_list, returning the dictionary of the citation counts per
-        year.  If the year list is not specified, an intrinsic set of unique
-        years extracted from the data is being used instead.
 
-        Keyword arguments:
-        year_list -- list of processed years (default: None)
+class FileWatcher(object):
 
-        Returns dictionary of citation counts per year.
+    """Watcher of the changes in the input directories.
 
-        """
-        if not year_list:
-            year_list = set([row['Year'] for row in self.data])
+    Waits until any file in the watched directories is created, deleted,
+    moved or written.  The Linux inotify API (accessed via ctypes) is used if
+    it is available, otherwise the directories are polled--their listings
+    together with the sizes and the modification times of the files are
+    compared every 'interval' seconds.  Once a change is noticed, the watcher
+    waits until the directories stay unchanged for 'interval' seconds, so
+    that the files that are just being written are not processed
+    prematurely.
 
-        citation_count_dict = {k: 0 for k in year_list}
-        for row in self.data:
-            if row['Year'] in year_list:
-                citation_count_dict[row['Year']] += int(row['Cites'])
+    Attributes:
+    directory_list -- list of watched directories
+    interval -- polling and settling interval in seconds
+    inotify_fd -- inotify file descriptor (None = polling)
 
-        return citation_count_dict
+    """
 
-    def publication_counts_per_journal(self, issn_list=None):
-        """Count number of publications per each journal.
+    # IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE
+    inotify_mask = 0x0008 | 0x0040 | 0x0080 | 0x0100 | 0x0200
+    # IN_NONBLOCK, IN_CLOEXEC
+    inotify_flags = 0o4000 | 0o2000000
 
-        Counts lines containing the same journal ISSN and maps these counts onto
-        the issn_list, returning the dictionary of the publication counts per
-        journal.  If the journal list is not specified, an intrinsic set of
-        unique journals extracted from the data is being used instead.
+    def __init__(self, directory_list, interval=2.0, use_inotify=True):
+        """Initialize FileWatcher object.
 
-        Keyword arguments:
-        issn_list -- list of journal ISSNs (default: None)
+        Positional arguments:
+        directory_list -- list of watched directories
 
-        Returns dictionary of publication counts per jounal.
+        Keyword arguments:
+        interval -- polling and settling interval in seconds (default: 2.0)
+        use_inotify -- use inotify if it is available (default: True)
 
         """
-        if not issn_list:
-            issn_list = set([row['ISSN'] for row in self.data if row['ISSN']])
+        self.directory_list = sorted(set(directory_list))
+        self.interval = interval
+        self.inotify_fd = FileWatcher.__init_inotify(self.directory_list) if use_inotify else None
+        self.__snapshot = self.snapshot() if self.inotify_fd is None else None
 
-        publication_count_dict = {k: 0 for k in issn_list}
-        for row in self.data:
-            if row['ISSN'] in issn_list:
-                publication_count_dict[row['ISSN']] += 1
+    @staticmethod
+    def __init_inotify(directory_list):
+        """Return inotify file descriptor watching given directories.
 
-        return publication_count_dict
+        Returns None if inotify is not available.
 
-    def extract_results(self):
-        """Extract result data.
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            inotify_fd = libc.inotify_init1(FileWatcher.inotify_flags)
+        except (OSError, AttributeError):
+            return None
+        if inotify_fd < 0:
+            return None
+
+        for directory in directory_list:
+            if libc.inotify_add_watch(inotify_fd, os.fsencode(directory), FileWatcher.inotify_mask) < 0:
+                os.close(inotify_fd)
+                return None
 
-        The method assumes that the source file contains result data exported
-        from Publish and Perish.  It parses string in 'Query' column and
-        associates individual data rows into dataset groups and datasets.
-        Redundant 'Query' and 'Source' entries are excluded from the extracted
-        rows.
+        return inotify_fd
+
+    def snapshot(self):
+        """Return dict of (size, modification time) tuples of the files in the
+        watched directories associated by file name."""
+        snapshot = {}
+        for directory in self.directory_list:
+            try:
+                name_list = os.listdir(directory)
+            except OSError:
+                continue
+            for name in name_list:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_size, stat.st_mtime)
+
+        return snapshot
+
+    def __wait_for_change(self, timeout=None):
+        """Wait for a change of the watched directories.
 
-        Returns two dimensional dictionary of extracted rows.
+        Keyword arguments:
+        timeout -- maximum waiting time in seconds (default: None = wait
+                   indefinitely)
 
-        """
-        results_dict = {}
-        for row in self.data:
-            dataset_group, dataset = [x.strip() for x in row['Query'].split("-")[:2]]
-            if dataset_group not in results_dict:
-                results_dict[dataset_group] = {}
-            results_dict[dataset_group][dataset] = row
-            del results_dict[dataset_group][dataset]['Query']
-            results_dict[dataset_group][dataset].pop("Source", None)
+        Returns True if the directories have changed.
 
-        return results_dict
+        """
+        if self.inotify_fd is not None:
+            if not select.select([self.inotify_fd], [], [], timeout)[0]:
+                return False
+            # Only the fact that something has changed matters, the events
+            # themselves are discarded
+            while True:
+                try:
+                    if not os.read(self.inotify_fd, 1 << 16):
+                        break
+                except OSError as error:
+                    if error.errno == errno.EAGAIN:
+                        break
+                    raise
+            return True
+
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            time.sleep(self.interval if deadline is None else max(0, min(self.interval, deadline - time.time())))
+            snapshot = self.snapshot()
+            if snapshot != self.__snapshot:
+                self.__snapshot = snapshot
+                return True
+            if deadline is not None and time.time() >= deadline:
+                return False
+
+    def wait(self):
+        """Wait until the watched directories change and settle down."""
+        self.__wait_for_change()
+        while self.__wait_for_change(self.interval):
+            pass
+
+    def close(self):
+        """Stop watching the directories."""
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
 
 
-class OutputData(object):
+class JournalCatalog(object):
 
-    """Abstract data container for the output data.
+    """Data container for a journal catalog.
 
-    The abstract class that defines all common attributes and methods for all
-    output data classes.  This class shouldn't be used directly.
+    Provides access to the rows of the journal catalog file by ISSN.  The
+    catalog is compiled into an index that maps normalised ISSNs (see
+    normalize_issn()) onto byte offsets of the catalog records.  The index
+    contains ISSNs from the 'ISSN' column as well as from any other column
+    with 'ISSN' in its name (e.g. 'EISSN'), so that print and electronic
+    ISSNs of the same journal are aliases.  The original form of each ISSN is
+    kept in the index too, so that an exact match takes precedence if the
+    catalog contains different forms of the same ISSN in different records.
+    If an index directory is given (e.g. the cache directory), the index is
+    stored into a persistent index file ('index_file'), which is
+    memory-mapped and searched by binary search, and it is rebuilt only if
+    the size or the modification time of the catalog file changes.
+    Otherwise, or if the index file can't be written, the index is kept in
+    memory only.  The 'ISSN' values themselves are deleted from the returned
+    rows, as well as from the list of field names.  The catalog file stays
+    open until close() is called.
 
     Attributes:
-    config -- SectionConfig object containing current section configuration
-    source_data -- a dict of ScientometryData objects or a sinlge
-                   ScientometryData object
-    output_file -- name of the output file, a dict of filenames if data are
-                   supposed to be written to multiple output files
-    fieldnames -- list of field names in the output file header or a dict of
-                  such lists
-    data -- list of rows of the output data or a dict of such lists
-
-    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
-    combination with unicodecsv.DictWriter.
+    journal_catalog_file -- journal catalog file name
+    index_file -- index file name or None (index kept in memory only)
+    all_fieldnames -- list of all field names of the journal catalog file
+    fieldnames -- list of the journal catalog data field names
+    journal_dict -- dictionary of journal catalog data associated by the
+                    original 'ISSN' values (parsed on first access)
 
     """
 
-    def __init__(self, config):
-        """Initialize generic OutputData object.
+    index_magic = b"SDPISSN2"
+    index_header = struct.Struct("<8sqdq")
+    # Normalised ISSN, alias flag (0 = 'ISSN' column), original ISSN, offset
+    index_entry = struct.Struct("<8sB9sq")
+    # Only ASCII digits are valid, the index stores ISSNs as ASCII strings
+    issn_pattern = re.compile(r"\b([0-9]{4})-?([0-9]{3}[0-9Xx])\b")
+    truncated_issn_pattern = re.compile(r"^[0-9]{4,6}[0-9Xx]$")
+    index_suffix = ".issn-index"
 
-        Uses config data to instantiate source ScientometryData object(s) and
-        initializes all attributes that are common for all output data classes.
-        This method has to be explicitly called via super(SubClass, self) at the
-        beginning of the __init__ method of the derived subclass.
+    def __init__(self, journal_catalog_file, index_dir=None):
+        """Initialize JournalCatalog object.
+
+        Parses header of the given CSV file ('journal_catalog_file') and
+        loads its ISSN index (the index is built if it doesn't exist or it is
+        out of date).
 
         Positional arguments:
-        config -- SectionConfig object that contains configuration for the
-                  current section
+        journal_catalog_file -- journal catalog file name
+
+        Keyword arguments:
+        index_dir -- directory of the persistent index file (default: None =
+                     index kept in memory only)
+
+        """
+        self.journal_catalog_file = journal_catalog_file
+        if index_dir:
+            digest = hashlib.sha1(os.path.realpath(journal_catalog_file).encode('utf-8')).hexdigest()
+            self.index_file = os.path.join(index_dir, digest + self.index_suffix)
+        else:
+            self.index_file = None
+        self.__journal_dict = None
+        self.__index_map = None
+        self.__index_list = None
+
+        with open(journal_catalog_file, 'rb') as binary_file:
+            header = binary_file.readline()
+            self.__data_offset = binary_file.tell()
+        # The 'utf-8-sig' encoding is required, because some input CSV files
+        # contain CSV preamble (for UTF-8) that has to be ignored.
+        self.all_fieldnames = next(csv.reader([header.decode('utf-8-sig')]), [])
+        fieldnames = list(self.all_fieldnames)
+        fieldnames.remove('ISSN')
+        self.fieldnames = fieldnames
+
+        stat = os.stat(journal_catalog_file)
+        if not self.__load_index(stat):
+            self.__build_index(stat)
+        self.__catalog_file = open(journal_catalog_file, 'rb')
+
+    def close(self):
+        """Close the catalog file and the memory-mapped index file."""
+        if self.__catalog_file is not None:
+            self.__catalog_file.close()
+            self.__catalog_file = None
+        if self.__index_map is not None:
+            self.__index_map.close()
+            self.__index_map = None
+
+    @classmethod
+    def normalize_issn(cls, issn):
+        """Normalise ISSN.
+
+        Removes the hyphen and converts the 'X' check digit to uppercase.
+        Unhyphenated ISSNs with missing leading zeros (as produced by
+        spreadsheet software) are padded with zeros.
+
+        Positional arguments:
+        issn -- ISSN in hyphenated or unhyphenated form
+
+        Returns normalised 8-character ISSN or None if 'issn' is not a valid
+        ISSN.
+
+        """
+        issn = issn.strip() if issn else ""
+        if cls.truncated_issn_pattern.match(issn):
+            issn = issn.zfill(8)
+        match = cls.issn_pattern.match(issn)
+        if not match or match.end() != len(issn):
+            return None
+
+        return (match.group(1) + match.group(2)).upper()
+
+    def __record_lines(self, binary_file):
+        """Yield raw records of the catalog file with their byte offsets.
+
+        Records are split on newlines preceded by an even number of double
+        quotes, so that newlines embedded in quoted fields are preserved.
+
+        """
+        binary_file.seek(self.__data_offset)
+        offset = self.__data_offset
+        record_lines = []
+        quote_count = 0
+        for line in iter(binary_file.readline, b''):
+            record_lines.append(line)
+            quote_count += line.count(b'"')
+            if quote_count % 2 == 0:
+                yield offset, record_lines
+                offset += sum(len(x) for x in record_lines)
+                record_lines = []
+                quote_count = 0
+        if record_lines:
+            yield offset, record_lines
+
+    def __parse_record(self, record_lines):
+        """Parse a single raw record into a row (dict) without 'ISSN' key."""
+        values = next(csv.reader([x.decode('utf-8') for x in record_lines]), [])
+        row = dict(zip(self.all_fieldnames, values))
+        # Fill in missing or extra values in the same way as DictReader does
+        for fieldname in self.all_fieldnames[len(values):]:
+            row[fieldname] = None
+        if len(values) > len(self.all_fieldnames):
+            row[None] = values[len(self.all_fieldnames):]
+
+        return row
+
+    def __build_index(self, stat):
+        """Build the ISSN index and try to save it into 'index_file'."""
+        alias_fieldnames = [x for x in self.all_fieldnames if "ISSN" in x.upper() and x != 'ISSN']
+        entry_dict = {}
+        with open(self.journal_catalog_file, 'rb') as binary_file:
+            for offset, record_lines in self.__record_lines(binary_file):
+                row = self.__parse_record(record_lines)
+                if not any(row.values()):
+                    continue
+                key = JournalCatalog.normalize_issn(row['ISSN'])
+                if key:
+                    entry_dict[(key, 0, row['ISSN'].strip())] = offset
+                for fieldname in alias_fieldnames:
+                    for match in self.issn_pattern.finditer(row[fieldname] or ""):
+                        key = (match.group(1) + match.group(2)).upper()
+                        entry_dict[(key, 1, match.group(0))] = offset
+
+        index_list = sorted((key.encode('ascii'), alias, raw.encode('ascii'), offset)
+                            for (key, alias, raw), offset in entry_dict.items())
+
+        if self.index_file is None:
+            self.__index_list = index_list
+            self.__entry_count = len(index_list)
+            return
+
+        temp_file = self.index_file + "." + str(os.getpid()) + ".tmp"
+        try:
+            with open(temp_file, 'wb') as binary_file:
+                binary_file.write(self.index_header.pack(self.index_magic, stat.st_size, stat.st_mtime,
+                                                         len(index_list)))
+                for entry in index_list:
+                    binary_file.write(self.index_entry.pack(*entry))
+            os.rename(temp_file, self.index_file)
+        except (IOError, OSError):
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            self.__index_list = index_list
+            self.__entry_count = len(index_list)
+        else:
+            self.__load_index(stat)
+
+    def __load_index(self, stat):
+        """Memory-map 'index_file' if it is up to date.
+
+        Returns True if the index has been loaded.
+
+        """
+        if self.index_file is None:
+            return False
+        try:
+            with open(self.index_file, 'rb') as binary_file:
+                index_map = mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            return False
+
+        if len(index_map) < self.index_header.size:
+            index_map.close()
+            return False
+        magic, size, mtime, entry_count = self.index_header.unpack_from(index_map)
+        if magic != self.index_magic or size != stat.st_size or mtime != stat.st_mtime or \
+           len(index_map) != self.index_header.size + entry_count * self.index_entry.size:
+            index_map.close()
+            return False
+
+        self.__index_map = index_map
+        self.__entry_count = entry_count
+        return True
+
+    def __index_entry(self, position):
+        """Return index entry at given position as a tuple."""
+        if self.__index_list is not None:
+            return self.__index_list[position]
+
+        key, alias, raw, offset = self.index_entry.unpack_from(
+            self.__index_map, self.index_header.size + position * self.index_entry.size)
+        return key, alias, raw.rstrip(b"\0"), offset
+
+    def find(self, issn):
+        """Find catalog record of the journal with given ISSN.
+
+        The record with exactly the same form of ISSN is preferred, then the
+        record with the same normalised ISSN in the 'ISSN' column, then the
+        record with the same normalised ISSN in an alias column.
+
+        Positional arguments:
+        issn -- ISSN (in any of the forms accepted by normalize_issn())
+
+        Returns byte offset of the catalog record (that identifies the
+        journal) or None if the journal is not in the catalog.
+
+        """
+        key = JournalCatalog.normalize_issn(issn)
+        if not key:
+            return None
+        key = key.encode('ascii')
+        raw = issn.strip().encode('ascii')
+
+        low, high = 0, self.__entry_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.__index_entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        # Entries with the same key are sorted by alias flag, primary first
+        candidate = None
+        while low < self.__entry_count:
+            entry_key, alias, entry_raw, offset = self.__index_entry(low)
+            if entry_key != key:
+                break
+            if entry_raw == raw and not alias:
+                return offset
+            if candidate is None:
+                candidate = offset
+            low += 1
+
+        return candidate
+
+    def read_row(self, offset):
+        """Read catalog row at given byte offset.
+
+        Positional arguments:
+        offset -- byte offset returned by find()
+
+        Returns row (dict) without the 'ISSN' key.
+
+        """
+        self.__catalog_file.seek(offset)
+        record_lines = []
+        quote_count = 0
+        for line in iter(self.__catalog_file.readline, b''):
+            record_lines.append(line)
+            quote_count += line.count(b'"')
+            if quote_count % 2 == 0:
+                break
+        row = self.__parse_record(record_lines)
+        del row['ISSN']
+
+        return row
+
+    def lookup(self, issn):
+        """Return catalog row of the journal with given ISSN.
+
+        Positional arguments:
+        issn -- ISSN (in any of the forms accepted by normalize_issn())
+
+        Returns row (dict) without the 'ISSN' key or None if the journal is not
+        in the catalog.
+
+        """
+        offset = self.find(issn)
+        return self.read_row(offset) if offset is not None else None
+
+    @property
+    def journal_dict(self):
+        """Dictionary of all catalog rows associated by the 'ISSN' values."""
+        if self.__journal_dict is None:
+            journal_dict = {}
+            with open(self.journal_catalog_file, 'rb') as binary_file:
+                for offset, record_lines in self.__record_lines(binary_file):
+                    row = self.__parse_record(record_lines)
+                    if not any(row.values()):
+                        continue
+                    journal_dict[row['ISSN']] = row
+                    del journal_dict[row['ISSN']]['ISSN']
+            self.__journal_dict = journal_dict
+
+        return self.__journal_dict
+
+
+class SourceAggregates(object):
+
+    """Container for the aggregates of a single set of the source data.
+
+    Accumulates all aggregates required by the counting methods of
+    ScientometryData (publication counts per year, citation counts per year and
+    publication counts per journal) in a single pass over the source data rows.
+    Only the aggregates listed in 'aggregate_names' are being computed.  The
+    aggregates are collected for all years and journals found in the data and
+    mapped onto the requested year/ISSN list on demand.
+
+    Attributes:
+    aggregate_names -- set of computed aggregates (names of the corresponding
+                       ScientometryData methods)
+    year_count_dict -- dict of publication counts associated by year
+    year_citation_dict -- dict of citation counts associated by year
+    issn_count_dict -- dict of publication counts associated by ISSN
+    cites_error_list -- list of (year, value) tuples of the 'Cites' values
+                        that are not valid integers
+    row_count -- number of rows folded into the aggregates
+
+    """
+
+    all_aggregate_names = frozenset(['publication_counts_per_year',
+                                     'citation_counts_per_year',
+                                     'publication_counts_per_journal'])
+
+    def __init__(self, aggregate_names):
+        """Initialize empty SourceAggregates object.
+
+        Positional arguments:
+        aggregate_names -- iterable of computed aggregates
+
+        """
+        self.aggregate_names = frozenset(aggregate_names) & self.all_aggregate_names
+        self.year_count_dict = {}
+        self.year_citation_dict = {}
+        self.issn_count_dict = {}
+        self.cites_error_list = []
+        self.row_count = 0
+
+    def fold(self, rows):
+        """Accumulate aggregates over given rows.
+
+        Invalid 'Cites' values don't interrupt the pass--they are remembered
+        and the error is raised only if they are requested by
+        citation_counts_per_year().
+
+        Positional arguments:
+        rows -- iterable of source data rows (SourceRecord objects)
+
+        """
+        count_years = 'publication_counts_per_year' in self.aggregate_names
+        count_citations = 'citation_counts_per_year' in self.aggregate_names
+        count_journals = 'publication_counts_per_journal' in self.aggregate_names
+        year_count_dict = self.year_count_dict
+        year_citation_dict = self.year_citation_dict
+        issn_count_dict = self.issn_count_dict
+
+        row_count = 0
+        for row in rows:
+            row_count += 1
+            if count_years:
+                year = row['Year']
+                year_count_dict[year] = year_count_dict.get(year, 0) + 1
+            if count_citations:
+                year = row['Year']
+                try:
+                    year_citation_dict[year] = year_citation_dict.get(year, 0) + int(row['Cites'])
+                except (TypeError, ValueError):
+                    year_citation_dict.setdefault(year, 0)
+                    self.cites_error_list.append((year, row['Cites']))
+            if count_journals:
+                issn = row['ISSN']
+                issn_count_dict[issn] = issn_count_dict.get(issn, 0) + 1
+        self.row_count += row_count
+
+    def fold_records(self, records, fieldnames):
+        """Accumulate aggregates over given CSV records.
+
+        Tuple-based variant of fold() that accesses the values of the records
+        (lists of values returned by csv.reader) by their positions, so that
+        no row dicts have to be built.  The results (including the errors of
+        the missing columns) are the same as if the rows built by
+        csv.DictReader were folded--missing values of short records are None
+        and empty records are skipped.
+
+        Positional arguments:
+        records -- iterable of CSV records
+        fieldnames -- list of field names of the records
+
+        """
+        count_years = 'publication_counts_per_year' in self.aggregate_names
+        count_citations = 'citation_counts_per_year' in self.aggregate_names
+        count_journals = 'publication_counts_per_journal' in self.aggregate_names
+        year_count_dict = self.year_count_dict
+        year_citation_dict = self.year_citation_dict
+        issn_count_dict = self.issn_count_dict
+
+        # The last of the duplicate columns wins as in csv.DictReader
+        index_dict = {x: i for i, x in enumerate(fieldnames)}
+        required_cols = (['Year'] if count_years or count_citations else []) + \
+                        (['Cites'] if count_citations else []) + (['ISSN'] if count_journals else [])
+        missing_cols = [x for x in required_cols if x not in index_dict]
+        year_index = index_dict.get('Year')
+        cites_index = index_dict.get('Cites')
+        issn_index = index_dict.get('ISSN')
+        field_count = len(fieldnames)
+
+        row_count = 0
+        for record in records:
+            if not record:
+                continue
+            if missing_cols:
+                raise KeyError(missing_cols[0])
+            if len(record) < field_count:
+                record = record + [None] * (field_count - len(record))
+            row_count += 1
+            if count_years:
+                year = record[year_index]
+                year_count_dict[year] = year_count_dict.get(year, 0) + 1
+            if count_citations:
+                year = record[year_index]
+                try:
+                    year_citation_dict[year] = year_citation_dict.get(year, 0) + int(record[cites_index])
+                except (TypeError, ValueError):
+                    year_citation_dict.setdefault(year, 0)
+                    self.cites_error_list.append((year, record[cites_index]))
+            if count_journals:
+                issn = record[issn_index]
+                issn_count_dict[issn] = issn_count_dict.get(issn, 0) + 1
+        self.row_count += row_count
+
+    def merge(self, other):
+        """Merge aggregates of another SourceAggregates object into this one.
+
+        Positional arguments:
+        other -- SourceAggregates object with the same set of aggregates
+
+        """
+        for own_dict, other_dict in [(self.year_count_dict, other.year_count_dict),
+                                     (self.year_citation_dict, other.year_citation_dict),
+                                     (self.issn_count_dict, other.issn_count_dict)]:
+            for key, value in other_dict.items():
+                own_dict[key] = own_dict.get(key, 0) + value
+        self.cites_error_list.extend(other.cites_error_list)
+        self.row_count += other.row_count
+
+    def publication_counts_per_year(self, year_list=None):
+        """Map publication counts onto the year list.
+
+        See ScientometryData.publication_counts_per_year().
+
+        """
+        if not year_list:
+            return dict(self.year_count_dict)
+
+        return {k: self.year_count_dict.get(k, 0) for k in year_list}
+
+    def citation_counts_per_year(self, year_list=None):
+        """Map citation counts onto the year list.
+
+        See ScientometryData.citation_counts_per_year().
+
+        """
+        if not year_list:
+            year_list = list(self.year_citation_dict.keys())
+
+        # Raise the same error as summing an invalid value would raise
+        for year, value in self.cites_error_list:
+            if year in year_list:
+                int(value)
+
+        return {k: self.year_citation_dict.get(k, 0) for k in year_list}
+
+    def publication_counts_per_journal(self, issn_list=None):
+        """Map publication counts onto the ISSN list.
+
+        See ScientometryData.publication_counts_per_journal().
+
+        """
+        if not issn_list:
+            return {k: v for k, v in self.issn_count_dict.items() if k}
+
+        return {k: self.issn_count_dict.get(k, 0) for k in issn_list}
+
+
+class SourceTable(object):
+
+    """Typed columnar table of the source data.
+
+    Intermediate representation of the source data used by SourceCache and
+    of the output data written in the columnar output format.  Columns
+    containing only canonical integer values are stored as arrays of integers
+    ('int' columns), columns of the output data containing only numbers are
+    stored as arrays of doubles ('float' columns), other columns are
+    dictionary-encoded--stored as arrays of integer codes pointing into the
+    list of distinct values ('str' columns).
+
+    The binary form of the table (see write() and read()) consists of the
+    magic string, the length of the JSON header (32-bit unsigned integer)
+    and the JSON header itself, followed by the raw arrays of the values, the
+    offsets of the distinct values and the UTF-8 encoded distinct values of
+    each column.  Integer values and offsets are stored as 64-bit integers
+    ('q'), so that the layout doesn't depend on the size of the native long
+    integer.  The header contains 'fieldnames', 'row_count', 'byteorder' and
+    'itemsize' (of the 'i' integer codes) and 'columns' with the
+    'type', 'typecode', 'offset' and 'length' of the values of each column
+    (and 'label_offset', 'label_length' and 'blob_offset' of the distinct
+    values of the 'str' columns).  All offsets are absolute, so that each
+    column can be accessed directly in the memory-mapped file.
+
+    Attributes:
+    fieldnames -- list of field names
+    row_count -- number of rows
+    column_dict -- dict of columns associated by field name, each column is
+                   either ('int', values), ('float', values) or ('str', codes,
+                   labels) tuple
+
+    """
+
+    header_length = struct.Struct("<I")
+
+    def __init__(self, fieldnames, row_count, column_dict):
+        """Initialize SourceTable object.
+
+        Positional arguments:
+        fieldnames -- list of field names
+        row_count -- number of rows
+        column_dict -- dict of columns associated by field name
+
+        """
+        self.fieldnames = fieldnames
+        self.row_count = row_count
+        self.column_dict = column_dict
+
+    @staticmethod
+    def encode_column(codes, labels):
+        """Encode dictionary-encoded column, using integers if possible.
+
+        Positional arguments:
+        codes -- array of codes
+        labels -- list of distinct values
+
+        Returns column tuple.
+
+        """
+        try:
+            int_labels = [int(x) for x in labels]
+        except (TypeError, ValueError):
+            return ('str', codes, labels)
+        if any(str(x) != y for x, y in zip(int_labels, labels)):
+            return ('str', codes, labels)
+
+        return ('int', array('l', [int_labels[x] for x in codes]))
+
+    @staticmethod
+    def from_rows(rows):
+        """Create SourceTable object from the list of rows.
+
+        Positional arguments:
+        rows -- list of rows (SourceRecord objects) extracted by
+                read_csv_rows()
+
+        Returns SourceTable object or None if the rows can't be stored (e.g.
+        there are no rows or the rows have missing or extra values).
+
+        """
+        if not rows or None in rows[0]:
+            return None
+
+        layout = rows[0].layout
+        if any(row.layout is not layout for row in rows):
+            return None
+
+        fieldnames = list(layout)
+        value_lists = list(zip(*[row.record for row in rows]))
+        column_dict = {}
+        for fieldname in fieldnames:
+            values = value_lists[layout[fieldname]]
+            # Labels in the order of their first appearance keep the files
+            # reproducible (set order depends on the hash seed)
+            labels = list(dict.fromkeys(values))
+            if None in labels:
+                return None
+            code_dict = {x: i for i, x in enumerate(labels)}
+            codes = array('l', map(code_dict.__getitem__, values))
+            column_dict[fieldname] = SourceTable.encode_column(codes, labels)
+
+        return SourceTable(fieldnames, len(rows), column_dict)
+
+    @staticmethod
+    def from_output_rows(fieldnames, rows):
+        """Create SourceTable object from the rows of the output data.
+
+        Columns of integers are stored as 'int' columns and columns of floats
+        as 'float' columns.  Other values are stored in the same textual form
+        as they are written into CSV files (see csv_text()).
+
+        Positional arguments:
+        fieldnames -- list of the written field names
+        rows -- list of rows (dicts)
+
+        Returns SourceTable object.
+
+        """
+        column_dict = {}
+        for fieldname in fieldnames:
+            values = [row.get(fieldname, "") for row in rows]
+            type_set = set(type(x) for x in values)
+            if type_set and type_set <= set([int]):
+                column_dict[fieldname] = ('int', array('l', values))
+            elif type_set == set([float]):
+                column_dict[fieldname] = ('float', array('d', values))
+            else:
+                values = list(map(csv_text, values))
+                labels = list(dict.fromkeys(values))
+                code_dict = {x: i for i, x in enumerate(labels)}
+                codes = array('l', [code_dict[x] for x in values])
+                column_dict[fieldname] = ('str', codes, labels)
+
+        return SourceTable(list(fieldnames), len(rows), column_dict)
+
+    @staticmethod
+    def read_header(buffer, magic):
+        """Read header of the binary form of the table.
+
+        Positional arguments:
+        buffer -- buffer (e.g. memory-mapped file) containing the table
+        magic -- expected magic string
+
+        Returns header dict or None if the buffer doesn't start with the magic
+        string or the table has been written on a platform with different
+        byte order or size of integers.
+
+        """
+        if buffer[:len(magic)] != magic:
+            return None
+        offset = len(magic) + SourceTable.header_length.size
+        header_length = SourceTable.header_length.unpack_from(buffer, len(magic))[0]
+        header = json.loads(buffer[offset:offset + header_length].decode('utf-8'))
+        if header['byteorder'] != sys.byteorder or header['itemsize'] != array('i').itemsize:
+            return None
+
+        return header
+
+    @staticmethod
+    def read(buffer, header, fieldnames=None):
+        """Read table from its binary form.
+
+        Positional arguments:
+        buffer -- buffer (e.g. memory-mapped file) containing the table
+        header -- header of the table (see read_header())
+
+        Keyword arguments:
+        fieldnames -- list of read columns (default: None = all columns),
+                      columns missing in the table are left out
+
+        Returns SourceTable object.
+
+        """
+        def read_array(position, length, typecode='q'):
+            values = array(typecode)
+            values.frombytes(buffer[position:position + length])
+            return values
+
+        column_dict = {}
+        for fieldname, layout in header['columns'].items():
+            if fieldnames is not None and fieldname not in fieldnames:
+                continue
+            values = read_array(layout['offset'], layout['length'], layout['typecode'])
+            if layout['type'] != 'str':
+                column_dict[fieldname] = (layout['type'], values)
+            else:
+                label_offsets = read_array(layout['label_offset'], layout['label_length'])
+                blob = buffer[layout['blob_offset']:layout['blob_offset'] + label_offsets[-1]]
+                labels = [blob[label_offsets[i]:label_offsets[i + 1]].decode('utf-8')
+                          for i in range(len(label_offsets) - 1)]
+                column_dict[fieldname] = ('str', values, labels)
+
+        return SourceTable(header['fieldnames'], header['row_count'], column_dict)
+
+    def write(self, binary_file, magic, header=None):
+        """Write binary form of the table.
+
+        Positional arguments:
+        binary_file -- file object opened for writing in binary mode
+        magic -- magic string
+
+        Keyword arguments:
+        header -- dict of additional header items (default: None)
+
+        """
+        column_layout = {}
+        block_list = []
+        position = 0
+        for fieldname, column in sorted(self.column_dict.items()):
+            # Integer values need full range, codes of distinct values don't
+            typecode = {'int': 'q', 'float': 'd', 'str': 'i'}[column[0]]
+            values = column[1]
+            # Native long integers mostly have the same layout as 'q' integers
+            if values.typecode != typecode and not (values.typecode == 'l' and typecode == 'q' and
+                                                    values.itemsize == array('q').itemsize):
+                values = array(typecode, values)
+            codes = values.tobytes()
+            layout = {'type': column[0], 'typecode': typecode, 'offset': position, 'length': len(codes)}
+            block_list.append(codes)
+            position += len(codes)
+            if column[0] == 'str':
+                encoded_labels = [x.encode('utf-8') for x in column[2]]
+                label_offsets = array('q', [0])
+                for label in encoded_labels:
+                    label_offsets.append(label_offsets[-1] + len(label))
+                label_offsets = label_offsets.tobytes()
+                layout.update(label_offset=position, label_length=len(label_offsets))
+                block_list.append(label_offsets)
+                position += len(label_offsets)
+                layout['blob_offset'] = position
+                block_list.append(b''.join(encoded_labels))
+                position += len(block_list[-1])
+            column_layout[fieldname] = layout
+
+        header = dict(header or {}, byteorder=sys.byteorder, itemsize=array('i').itemsize,
+                      fieldnames=self.fieldnames, row_count=self.row_count)
+        # Offsets are stored relative to the end of the header, so they have
+        # to be shifted--which in turn may change the length of the header
+        data_offset = 0
+        while True:
+            header['data_offset'] = data_offset
+            shifted_layout = {}
+            for fieldname, layout in column_layout.items():
+                shifted_layout[fieldname] = {k: v + data_offset if k.endswith('offset') else v
+                                             for k, v in layout.items()}
+            header['columns'] = shifted_layout
+            header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+            new_data_offset = len(magic) + self.header_length.size + len(header_bytes)
+            if new_data_offset == data_offset:
+                break
+            data_offset = new_data_offset
+
+        binary_file.write(magic)
+        binary_file.write(self.header_length.pack(len(header_bytes)))
+        binary_file.write(header_bytes)
+        for block in block_list:
+            binary_file.write(block)
+
+    def values(self, fieldname):
+        """Return list of values of given column.
+
+        Equal values of the column are the same (shared) objects.
+
+        """
+        column = self.column_dict[fieldname]
+        if column[0] == 'int':
+            label_dict = {x: str(x) for x in set(column[1])}
+            return list(map(label_dict.__getitem__, column[1]))
+        if column[0] == 'float':
+            return [repr(x) for x in column[1]]
+
+        return list(map(column[2].__getitem__, column[1]))
+
+    def rows(self):
+        """Return list of rows (SourceRecord objects) as read_csv_rows() does.
+
+        Rows of the table read partially contain only the read columns.
+
+        """
+        fieldnames = [x for x in self.fieldnames if x in self.column_dict]
+        layout = {x: i for i, x in enumerate(fieldnames)}
+        return [SourceRecord(layout, x) for x in zip(*[self.values(x) for x in fieldnames])]
+
+    def categorical_column(self, fieldname):
+        """Return given column as CategoricalColumn object."""
+        column = CategoricalColumn()
+        if fieldname not in self.column_dict:
+            return column
+
+        if self.column_dict[fieldname][0] == 'int':
+            values = self.column_dict[fieldname][1]
+            column.labels = [str(x) for x in sorted(set(values))]
+            code_dict = {int(x): i for i, x in enumerate(column.labels)}
+            column.codes = array('l', map(code_dict.__getitem__, values))
+        else:
+            column.codes = self.column_dict[fieldname][1]
+            column.labels = self.column_dict[fieldname][2]
+        column.code_dict = {x: i for i, x in enumerate(column.labels)}
+
+        return column
+
+
+class SourceCache(object):
+
+    """Size-bounded cache of the parsed source data files.
+
+    Stores SourceTable objects into binary cache files in the cache directory
+    ('cache_dir'), one file per source data file.  Each cache file contains
+    the binary form of the table (see SourceTable.write()), its header also
+    identifies the source data file.  Cache files are memory-mapped when
+    loaded.  A cache file is valid as long as the size and the modification
+    time of the source data file match the header.  If only the modification
+    time differs, the SHA-1 hash of the source data file is compared with the
+    header (as BuildManifest does), so that touched files remain cached.  The
+    total size of the cache directory is kept below 'max_size' by evicting
+    the least recently used cache files.
+
+    Attributes:
+    cache_dir -- cache directory
+    max_size -- maximum total size of the cache files in bytes
+
+    """
+
+    cache_magic = b"SDPCACH2"
+    cache_suffix = ".sdpcache"
+
+    def __init__(self, cache_dir, max_size=1 << 30):
+        """Initialize SourceCache object.
+
+        Positional arguments:
+        cache_dir -- cache directory (will be created if it does not exist)
+
+        Keyword arguments:
+        max_size -- maximum total size of the cache files in bytes (default:
+                    1 GiB)
+
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        make_directory(cache_dir)
+
+    def cache_file(self, data_file):
+        """Return name of the cache file of given source data file."""
+        digest = hashlib.sha1(os.path.realpath(data_file).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + self.cache_suffix)
+
+    def load(self, data_file, fieldnames=None):
+        """Load cached SourceTable of given source data file.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Keyword arguments:
+        fieldnames -- list of required columns (default: None = all columns
+                      of the source data file)
+
+        Returns SourceTable object or None if the cache file doesn't exist, is
+        out of date or doesn't contain all required columns (complete cache
+        file contains all columns of the source data file, hence the missing
+        columns are simply left out).
+
+        """
+        cache_file = self.cache_file(data_file)
+        try:
+            stat = os.stat(data_file)
+            with open(cache_file, 'rb') as binary_file:
+                cache_map = mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            return None
+
+        try:
+            header = SourceTable.read_header(cache_map, self.cache_magic)
+            if not header or header['size'] != stat.st_size:
+                return None
+            if header['mtime'] != stat.st_mtime and \
+               header['sha1'] != BuildManifest.file_signature(data_file)['sha1']:
+                return None
+            if not header['complete'] and (fieldnames is None or not set(fieldnames) <= set(header['columns'])):
+                return None
+            table = SourceTable.read(cache_map, header, fieldnames)
+        finally:
+            cache_map.close()
+
+        # Access time of the cache file determines the eviction order
+        os.utime(cache_file, None)
+        return table
+
+    def store(self, data_file, table, complete=True):
+        """Store SourceTable of given source data file into the cache.
+
+        Positional arguments:
+        data_file -- source data file name
+        table -- SourceTable object
+
+        Keyword arguments:
+        complete -- True if the table contains all columns of the source data
+                    file (default: True)
+
+        """
+        signature = BuildManifest.file_signature(data_file)
+        header = {'size': signature['size'], 'mtime': signature['mtime'], 'sha1': signature['sha1'],
+                  'complete': complete}
+
+        cache_file = self.cache_file(data_file)
+        temp_file = cache_file + "." + str(os.getpid()) + ".tmp"
+        try:
+            with open(temp_file, 'wb') as binary_file:
+                table.write(binary_file, self.cache_magic, header)
+            os.rename(temp_file, cache_file)
+        except (IOError, OSError):
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used cache files exceeding 'max_size'."""
+        cache_file_list = []
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(self.cache_suffix):
+                cache_file = os.path.join(self.cache_dir, filename)
+                try:
+                    stat = os.stat(cache_file)
+                except OSError:
+                    continue
+                cache_file_list.append((max(stat.st_atime, stat.st_mtime), stat.st_size, cache_file))
+
+        total_size = sum(x[1] for x in cache_file_list)
+        for access_time, size, cache_file in sorted(cache_file_list):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(cache_file)
+            except OSError:
+                pass
+            total_size -= size
+
+
+class SourceDatabase(object):
+
+    """SQLite database of the source data.
+
+    Bulk-loads source data files and journal catalogs into the tables of a
+    SQLite database that is either stored in a file or kept in memory.  Each
+    file is loaded into its own table named after the resolved path of the file
+    and the filter of its rows, if any (see table_name()).  All columns are of
+    the TEXT type, so that the values are kept exactly as they appear in the
+    file.  Columns listed in 'index_cols' are indexed.  Tables containing the
+    'ISSN' column get an additional indexed 'issn_key' column with the
+    normalised ISSN (see JournalCatalog.normalize_issn()), so that different
+    forms of the same ISSN can be joined.  The size and the modification time
+    of every loaded file are recorded in the 'source_files' table, hence a
+    database stored in a file is reused across sections and runs--the file is
+    loaded again only if it has changed.
+
+    Attributes:
+    database_file -- database file name (None for in-memory database)
+    connection -- sqlite3.Connection object (opened on first access)
+
+    """
+
+    index_cols = ['Year', 'ISSN', 'DOI']
+    issn_key_col = "issn_key"
+
+    def __init__(self, database_file=None):
+        """Initialize SourceDatabase object.
+
+        The database is not opened until it is accessed for the first time.
+
+        Keyword arguments:
+        database_file -- database file name (default: None = in memory)
+
+        """
+        self.database_file = database_file
+        self.__connection = None
+
+    def __getstate__(self):
+        # Connection can't be passed to worker processes--each process opens
+        # its own connection.
+        return {'database_file': self.database_file}
+
+    def __setstate__(self, state):
+        self.__init__(state['database_file'])
+
+    @property
+    def connection(self):
+        """Open the database and return its sqlite3.Connection object."""
+        if self.__connection is None:
+            # Transactions are controlled explicitly, see load().  The timeout
+            # allows worker processes to wait for each other while loading
+            # data into the same database file.
+            connection = sqlite3.connect(self.database_file or ":memory:", timeout=600, isolation_level=None)
+            connection.execute("CREATE TABLE IF NOT EXISTS source_files "
+                               "(table_name TEXT PRIMARY KEY, path TEXT, size INTEGER, mtime REAL)")
+            self.__connection = connection
+
+        return self.__connection
+
+    @staticmethod
+    def quote(identifier):
+        """Return quoted SQL identifier."""
+        return '"' + identifier.replace('"', '""') + '"'
+
+    @staticmethod
+    def table_name(data_file, row_filter=None):
+        """Return name of the table of given source data file (and filter)."""
+        name = os.path.realpath(data_file) + ("\n" + row_filter.signature if row_filter else "")
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()
+        return "source_" + digest[:16]
+
+    def load(self, data_file, row_filter=None):
+        """Load CSV file into the database.
+
+        The file is loaded only if it hasn't been loaded yet or if it has
+        changed since it was loaded.  Rows are inserted in a single
+        transaction and the indexes are created after all rows are inserted.
+        Short rows are padded with NULL values, excessive values are ignored.
+        Rows rejected by the filter ('row_filter') are not inserted.
+
+        Positional arguments:
+        data_file -- CSV file name
+
+        Keyword arguments:
+        row_filter -- RowFilter object (default: None = all rows)
+
+        Returns name of the table.
+
+        """
+        table_name = self.table_name(data_file, row_filter)
+        stat = os.stat(data_file)
+        connection = self.connection
+        quote = SourceDatabase.quote
+
+        # The write lock is acquired before the check, so that concurrent
+        # processes don't load the same file twice.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            record = connection.execute("SELECT size, mtime FROM source_files WHERE table_name = ?",
+                                        (table_name,)).fetchone()
+            if record == (stat.st_size, stat.st_mtime):
+                connection.execute("COMMIT")
+                return table_name
+
+            # The 'utf-8-sig' encoding is required, because some input CSV
+            # files contain CSV preamble (for UTF-8) that has to be ignored.
+            with open(data_file, 'r', encoding='utf-8-sig', newline='') as csv_file:
+                fieldnames, records = csv_records(csv_file, row_filter)
+                field_count = len(fieldnames)
+                rows = (row[:field_count] + [None] * (field_count - len(row)) for row in records)
+                col_list = [quote(x) + " TEXT" for x in fieldnames]
+                if 'ISSN' in fieldnames:
+                    issn_index = fieldnames.index('ISSN')
+                    rows = (row + [JournalCatalog.normalize_issn(row[issn_index])] for row in rows)
+                    col_list.append(quote(self.issn_key_col) + " TEXT")
+
+                connection.execute("DROP TABLE IF EXISTS " + quote(table_name))
+                connection.execute("CREATE TABLE " + quote(table_name) + " (" + ", ".join(col_list) + ")")
+                connection.executemany("INSERT INTO " + quote(table_name) + " VALUES (" +
+                                       ", ".join("?" * len(col_list)) + ")", rows)
+
+            index_col_list = [x for x in self.index_cols if x in fieldnames]
+            if 'ISSN' in fieldnames:
+                index_col_list.append(self.issn_key_col)
+            for col in index_col_list:
+                connection.execute("CREATE INDEX " + quote(table_name + "_" + col) + " ON " +
+                                   quote(table_name) + " (" + quote(col) + ")")
+            connection.execute("INSERT OR REPLACE INTO source_files VALUES (?, ?, ?, ?)",
+                               (table_name, os.path.realpath(data_file), stat.st_size, stat.st_mtime))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        return table_name
+
+    def fieldnames(self, table_name):
+        """Return list of the field names of the source data in given table."""
+        col_list = [x[1] for x in self.connection.execute("PRAGMA table_info(" + self.quote(table_name) + ")")]
+        if self.issn_key_col in col_list and 'ISSN' in col_list:
+            col_list.remove(self.issn_key_col)
+
+        return col_list
+
+    def query(self, query, table_dict=None):
+        """Execute SQL query.
+
+        Tables are made available to the query under the names given by
+        'table_dict' through temporary views.
+
+        Positional arguments:
+        query -- SQL query
+
+        Keyword arguments:
+        table_dict -- dict of table names associated by the names used in the
+                      query (default: None)
+
+        Returns tuple (list of column names, list of rows of the result).  The
+        rows are dicts associated by the column names.
+
+        """
+        connection = self.connection
+        quote = SourceDatabase.quote
+        table_dict = table_dict or {}
+
+        try:
+            for name, table_name in table_dict.items():
+                connection.execute("CREATE TEMP VIEW " + quote(name) + " AS SELECT * FROM main." + quote(table_name))
+            cursor = connection.execute(query)
+            fieldnames = [x[0] for x in cursor.description] if cursor.description else []
+            data = [dict(zip(fieldnames, row)) for row in cursor]
+        finally:
+            for name in table_dict:
+                connection.execute("DROP VIEW IF EXISTS temp." + quote(name))
+
+        return fieldnames, data
+
+
+class SourceRecord(collections.abc.Mapping):
+
+    """Compact row of the source data.
+
+    Stores the values of a single row in a tuple ('record') laid out by the
+    header of the source data file.  The positions of the values associated
+    by field names ('layout') are shared by all rows of the same file, so
+    that the row costs a small object and a tuple instead of a dict with its
+    own hash table.  The row behaves as a read-only dict (row['Year'],
+    row.get('DOI'), 'ISSN' in row, keys(), items(), dict(row), ...).  Values
+    of the columns whose names are valid identifiers are accessible as
+    attributes as well (row.Year), unless the name is taken by a method.
+
+    Attributes:
+    layout -- dict of positions of the values associated by field names
+    record -- tuple of the values
+
+    """
+
+    __slots__ = ('layout', 'record')
+
+    def __init__(self, layout, record):
+        """Initialize SourceRecord object.
+
+        Positional arguments:
+        layout -- dict of positions of the values associated by field names
+        record -- tuple of the values
+
+        """
+        self.layout = layout
+        self.record = record
+
+    def __getitem__(self, key):
+        return self.record[self.layout[key]]
+
+    def __getattr__(self, name):
+        # Unset slots end up here too, they must not be looked up again
+        if name in SourceRecord.__slots__ or name.startswith("__"):
+            raise AttributeError(name)
+        try:
+            return self.record[self.layout[name]]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __contains__(self, key):
+        return key in self.layout
+
+    def __iter__(self):
+        return iter(self.layout)
+
+    def __len__(self):
+        return len(self.layout)
+
+    def __repr__(self):
+        return "SourceRecord(%r)" % dict(self)
+
+    def get(self, key, default=None):
+        """Return value of given field or default if there is no such field."""
+        position = self.layout.get(key)
+        return self.record[position] if position is not None else default
+
+    def keys(self):
+        """Return view of the field names."""
+        return self.layout.keys()
+
+    def values(self):
+        """Return iterator over the values in the order of the field names."""
+        return map(self.record.__getitem__, self.layout.values())
+
+    def items(self):
+        """Return iterator over (field name, value) pairs."""
+        return zip(self.layout, self.values())
+
+
+class ScientometryData(object):
+
+    """Data container for a single set of the source scientometric data
+
+    Parses source data file using read_csv_rows() into a list of compact rows
+    ('data', see SourceRecord).  The class also provides a set of useful
+    methods for further data processing.  Results of the counting methods are
+    backed by SourceAggregates object that can be precomputed for multiple
+    methods in a single pass (see precompute_aggregates()).  If SourceCache is
+    given, the rows are loaded from the cache instead of parsing the source
+    data file, or the cache is filled after parsing.  The rows can be narrowed
+    to the given columns ('columns') and filtered by RowFilter ('row_filter')
+    while the source data file is being parsed (see read_csv_rows()).  Filtered
+    rows are never cached.
+
+    Attributes:
+    data -- extracted scientometric data (list of SourceRecord objects)
+    projection -- frozenset of the extracted columns (None = all columns)
+    row_filter -- RowFilter object of the extracted rows (None = all rows)
+    aggregates -- SourceAggregates object of the already computed aggregates
+
+    """
+
+    __author_index = None
+
+    def __init__(self, data_file, source_cache=None, columns=None, row_filter=None):
+        """Parse source data file and initialize ScientometryData object.
+
+        Uses read_csv_rows() to parse given CSV file ('data_file') and
+        extracts its contents into 'data' attribute.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Keyword arguments:
+        source_cache -- SourceCache object (default: None)
+        columns -- iterable of the extracted columns (default: None = all
+                   columns)
+        row_filter -- RowFilter object (default: None = all rows)
+
+        """
+        self.data_file = data_file
+        self.projection = frozenset(columns) if columns is not None else None
+        self.row_filter = row_filter
+        if row_filter:
+            source_cache = None
+        with stage_profiler.stage('parse', file=data_file, storage='rows') as record:
+            fieldnames = sorted(self.projection) if self.projection is not None else None
+            table = source_cache.load(data_file, fieldnames) if source_cache else None
+            if table:
+                self.data = table.rows()
+                record['cached'] = True
+            else:
+                self.data = ScientometryData.read_rows(data_file, self.projection, row_filter)
+                table = SourceTable.from_rows(self.data) if source_cache else None
+                if table:
+                    source_cache.store(data_file, table, complete=self.projection is None)
+            record['rows_read'] = len(self.data)
+        self.aggregates = SourceAggregates([])
+
+    @staticmethod
+    def read_rows(data_file, columns=None, row_filter=None):
+        """Read all rows of the source data file.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Keyword arguments:
+        columns -- iterable of the extracted columns (default: None = all
+                   columns)
+        row_filter -- RowFilter object (default: None = all rows)
+
+        Returns list of rows (SourceRecord objects) extracted by
+        read_csv_rows().
+
+        """
+        # The 'utf-8-sig' encoding is required, because some input CSV files
+        # contain CSV preamble (for UTF-8) that has to be ignored.
+        with open(data_file, 'r', encoding='utf-8-sig', newline='') as csv_file:
+            data = list(read_csv_rows(csv_file, columns, row_filter))
+
+        return data
+
+    def compute_aggregates(self, aggregate_names):
+        """Compute given aggregates in a single pass over the data.
+
+        Positional arguments:
+        aggregate_names -- iterable of aggregate names
+
+        Returns SourceAggregates object.
+
+        """
+        aggregates = SourceAggregates(aggregate_names)
+        aggregates.fold(self.data)
+
+        return aggregates
+
+    def precompute_aggregates(self, aggregate_names):
+        """Precompute given aggregates in a single pass over the data.
+
+        Aggregates that have been computed already are not computed again.
+
+        Positional arguments:
+        aggregate_names -- iterable of aggregate names
+
+        Returns SourceAggregates object containing all computed aggregates.
+
+        """
+        missing_names = frozenset(aggregate_names) - self.aggregates.aggregate_names
+        if missing_names:
+            aggregate_names = missing_names | self.aggregates.aggregate_names
+            with stage_profiler.stage('aggregate', file=self.data_file, aggregates=sorted(aggregate_names)) as record:
+                aggregates = self.compute_aggregates(aggregate_names)
+                if aggregates.row_count:
+                    record['rows_read'] = aggregates.row_count
+            self.aggregates = aggregates
+
+        return self.aggregates
+
+    def publication_counts_per_year(self, year_list=None):
+        """Count number of publications per each year.
+
+        Counts lines containing the same year and maps these counts onto the
+        year_list, returning the dictionary of the publication counts per year.
+        If the year list is not specified, an intrinsic set of unique years
+        extracted from the data is being used instead.
+
+        Keyword arguments:
+        year_list -- list of processed years (default: None)
+
+        Returns dictionary of publication counts per year.
+
+        """
+        aggregates = self.precompute_aggregates(['publication_counts_per_year'])
+        return aggregates.publication_counts_per_year(year_list)
+
+    def citation_counts_per_year(self, year_list=None):
+        """Count number of citations per each year.
+
+        Sums citations on the lines containing the same year and maps these sums
+        onto the year_list, returning the dictionary of the citation counts per
+        year.  If the year list is not specified, an intrinsic set of unique
+        years extracted from the data is being used instead.
+
+        Keyword arguments:
+        year_list -- list of processed years (default: None)
+
+        Returns dictionary of citation counts per year.
+
+        """
+        aggregates = self.precompute_aggregates(['citation_counts_per_year'])
+        return aggregates.citation_counts_per_year(year_list)
+
+    def publication_counts_per_journal(self, issn_list=None):
+        """Count number of publications per each journal.
+
+        Counts lines containing the same journal ISSN and maps these counts onto
+        the issn_list, returning the dictionary of the publication counts per
+        journal.  If the journal list is not specified, an intrinsic set of
+        unique journals extracted from the data is being used instead.
+
+        Keyword arguments:
+        issn_list -- list of journal ISSNs (default: None)
+
+        Returns dictionary of publication counts per jounal.
+
+        """
+        aggregates = self.precompute_aggregates(['publication_counts_per_journal'])
+        return aggregates.publication_counts_per_journal(issn_list)
+
+    def author_index(self):
+        """Return AuthorIndex object of the data.
+
+        The index is built on the first call only, so that it can be shared by
+        all sections that use the same source data.
+
+        Returns AuthorIndex object.
+
+        """
+        if self.__author_index is None:
+            self.__author_index = AuthorIndex(self.data)
+
+        return self.__author_index
+
+    def extract_results(self):
+        """Extract result data.
+
+        The method assumes that the source file contains result data exported
+        from Publish and Perish.  It parses string in 'Query' column and
+        associates individual data rows into dataset groups and datasets.
+        Redundant 'Query' and 'Source' entries are excluded from the extracted
+        rows (dicts), the source data rows are left intact.
+
+        Returns two dimensional dictionary of extracted rows.
+
+        """
+        results_dict = {}
+        for row in self.data:
+            dataset_group, dataset = [x.strip() for x in row['Query'].split("-")[:2]]
+            if dataset_group not in results_dict:
+                results_dict[dataset_group] = {}
+            results_dict[dataset_group][dataset] = {k: v for k, v in row.items() if k not in ('Query', 'Source')}
+
+        return results_dict
+
+
+class CategoricalColumn(object):
+
+    """Dictionary-encoded column of the source data.
+
+    Stores each distinct value of the column only once (in 'labels') and
+    represents the individual rows by integer codes pointing into the list of
+    labels.
+
+    Attributes:
+    codes -- array of integer codes (one per row)
+    labels -- list of distinct values of the column
+    code_dict -- dict of codes associated by label
+
+    """
+
+    def __init__(self):
+        """Initialize empty CategoricalColumn object."""
+        self.codes = array('l')
+        self.labels = []
+        self.code_dict = {}
+
+    def append(self, value):
+        """Append a single value to the column.
+
+        Positional arguments:
+        value -- appended value
+
+        """
+        code = self.code_dict.get(value)
+        if code is None:
+            code = len(self.labels)
+            self.code_dict[value] = code
+            self.labels.append(value)
+        self.codes.append(code)
+
+    def extend(self, values):
+        """Append a sequence of values to the column.
+
+        New labels are added in the order of their first appearance, the codes
+        are looked up by a single map() over the values.
+
+        Positional arguments:
+        values -- list of appended values
+
+        """
+        code_dict = self.code_dict
+        for value in dict.fromkeys(values):
+            if value not in code_dict:
+                code_dict[value] = len(self.labels)
+                self.labels.append(value)
+        self.codes.extend(map(code_dict.__getitem__, values))
+
+    def bincount(self, weights=None):
+        """Count (or sum weights of) rows for each distinct label.
+
+        The codes are counted by collections.Counter in C.  Weights are summed
+        in a single pass over the pairs of codes and weights (sorting the
+        weights by the codes in order to sum contiguous slices is slower).
+
+        Keyword arguments:
+        weights -- sequence of row weights (default: None)
+
+        Returns dict of counts (or sums of weights) associated by label.
+
+        """
+        if weights is None:
+            counter = collections.Counter(self.codes)
+            return {label: counter[code] for code, label in enumerate(self.labels)}
+
+        sums = [0] * len(self.labels)
+        for code, weight in zip(self.codes, weights):
+            sums[code] += weight
+
+        return dict(zip(self.labels, sums))
+
+
+class ColumnarScientometryData(ScientometryData):
+
+    """Columnar data container for a single set of the source scientometric data
+
+    Alternative storage engine to ScientometryData that keeps only the columns
+    required by the counting methods: 'Cites' as an integer array and 'Year',
+    'ISSN', 'Source' and 'Type' as dictionary-encoded (categorical) columns.
+    Complete rows are parsed again from the source data file only when the
+    'data' attribute is accessed.  The aggregates are computed from the arrays
+    of integer codes, giving exactly the same results as ScientometryData.
+    Rows can be filtered by RowFilter ('row_filter') while the source data
+    file is being parsed.  Columns of the filtered rows are never cached.
+
+    Attributes:
+    data_file -- source data file name
+    row_filter -- RowFilter object of the extracted rows (None = all rows)
+    row_count -- number of rows in the source data
+    cites -- array of citation counts
+    cites_errors -- list of (row index, raw value) tuples of the 'Cites'
+                    values that are not valid integers
+    columns -- dict of CategoricalColumn objects associated by column name
+    data -- extracted scientometric data (parsed on demand)
+    aggregates -- SourceAggregates object of the already computed aggregates
+
+    """
+
+    categorical_cols = ['Year', 'ISSN', 'Source', 'Type']
+
+    def __init__(self, data_file, source_cache=None, row_filter=None):
+        """Parse source data and initialize ColumnarScientometryData object.
+
+        Uses csv.reader to parse given CSV file ('data_file') and extracts the
+        stored columns into arrays.  Invalid 'Cites' values are stored as
+        zeros and remembered, so that the error is raised only when they are
+        actually summed (as ScientometryData does).  If SourceCache is given,
+        the columns are loaded from the cache instead of parsing the source
+        data file, or the cache is filled after parsing.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Keyword arguments:
+        source_cache -- SourceCache object (default: None)
+        row_filter -- RowFilter object (default: None = all rows)
+
+        """
+        self.data_file = data_file
+        self.row_filter = row_filter
+        if row_filter:
+            source_cache = None
+        self.__data = None
+        self.aggregates = SourceAggregates([])
+
+        with stage_profiler.stage('parse', file=data_file, storage='columnar') as record:
+            table = source_cache.load(data_file, self.categorical_cols + ['Cites']) if source_cache else None
+            if table:
+                self.__load_table(table)
+                record['cached'] = True
+            else:
+                self.__parse(data_file)
+                if source_cache and not self.cites_errors and \
+                   not any(None in x.code_dict for x in self.columns.values()):
+                    column_dict = {k: ('str', v.codes, v.labels) for k, v in self.columns.items() if v.codes}
+                    if self.cites:
+                        column_dict['Cites'] = ('int', self.cites)
+                    source_cache.store(data_file, SourceTable(None, self.row_count, column_dict), complete=False)
+            record['rows_read'] = self.row_count
+
+    def __load_table(self, table):
+        """Initialize columns from the cached SourceTable object."""
+        self.row_count = table.row_count
+        self.columns = {col: table.categorical_column(col) for col in self.categorical_cols}
+        self.cites_errors = []
+        if 'Cites' not in table.column_dict:
+            self.cites = array('l')
+        elif table.column_dict['Cites'][0] == 'int':
+            self.cites = table.column_dict['Cites'][1]
+        else:
+            codes, labels = table.column_dict['Cites'][1:]
+            int_labels = []
+            for label in labels:
+                try:
+                    int_labels.append(int(label))
+                except (TypeError, ValueError):
+                    int_labels.append(None)
+            self.cites = array('l', [int_labels[x] or 0 for x in codes])
+            self.cites_errors = [(i, labels[x]) for i, x in enumerate(codes) if int_labels[x] is None]
+
+    def __parse(self, data_file, chunk_size=256):
+        """Parse the stored columns from the source data file.
+
+        Records are processed in chunks of 'chunk_size' records, each stored
+        column of a chunk is extracted and encoded at once (see
+        CategoricalColumn.extend()).
+
+        """
+        columns = {col: CategoricalColumn() for col in self.categorical_cols}
+        cites = array('l')
+        cites_errors = []
+        row_count = 0
+        # The 'utf-8-sig' encoding is required, because some input CSV files
+        # contain CSV preamble (for UTF-8) that has to be ignored.
+        with open(data_file, 'r', encoding='utf-8-sig', newline='') as csv_file:
+            fieldnames, records = csv_records(csv_file, self.row_filter)
+            col_index_list = [(columns[x], fieldnames.index(x)) for x in self.categorical_cols if x in fieldnames]
+            cites_index = fieldnames.index('Cites') if 'Cites' in fieldnames else None
+            index_list = [x[1] for x in col_index_list] + ([cites_index] if cites_index is not None else [])
+            width = max(index_list) + 1 if index_list else 0
+            for chunk in iter(lambda: list(itertools.islice(records, chunk_size)), []):
+                # Short records are padded with None values of the missing fields
+                if min(map(len, chunk)) < width:
+                    chunk = [row + [None] * (width - len(row)) if len(row) < width else row for row in chunk]
+                for column, index in col_index_list:
+                    column.extend(list(map(itemgetter(index), chunk)))
+                if cites_index is not None:
+                    values = list(map(itemgetter(cites_index), chunk))
+                    length = len(cites)
+                    try:
+                        cites.extend(map(int, values))
+                    except (TypeError, ValueError):
+                        del cites[length:]
+                        for position, value in enumerate(values, row_count):
+                            try:
+                                cites.append(int(value))
+                            except (TypeError, ValueError):
+                                cites.append(0)
+                                cites_errors.append((position, value))
+                row_count += len(chunk)
+
+        self.row_count = row_count
+        self.cites = cites
+        self.cites_errors = cites_errors
+        self.columns = columns
+
+    @property
+    def data(self):
+        """List of complete rows, parsed from the file on first access."""
+        if self.__data is None:
+            self.__data = ScientometryData.read_rows(self.data_file, row_filter=self.row_filter)
+
+        return self.__data
+
+    def __column(self, col):
+        """Return CategoricalColumn object of given column.
+
+        Raises KeyError in the same way as ScientometryData does when the
+        column is missing in the source data.
+
+        """
+        column = self.columns[col]
+        if self.row_count and len(column.codes) == 0:
+            raise KeyError(col)
+
+        return column
+
+    def compute_aggregates(self, aggregate_names):
+        """Compute given aggregates from the stored columns.
+
+        Columnar variant of ScientometryData.compute_aggregates(), which
+        counts the integer codes of the categorical columns instead of
+        iterating over the rows.
+
+        Positional arguments:
+        aggregate_names -- iterable of aggregate names
+
+        Returns SourceAggregates object.
+
+        """
+        aggregates = SourceAggregates(aggregate_names)
+        if 'publication_counts_per_year' in aggregates.aggregate_names:
+            aggregates.year_count_dict = self.__column('Year').bincount()
+        if 'citation_counts_per_year' in aggregates.aggregate_names:
+            year_column = self.__column('Year')
+            if self.row_count and len(self.cites) == 0:
+                raise KeyError('Cites')
+            aggregates.year_citation_dict = year_column.bincount(self.cites)
+            aggregates.cites_error_list = [(year_column.labels[year_column.codes[index]], value)
+                                           for index, value in self.cites_errors]
+        if 'publication_counts_per_journal' in aggregates.aggregate_names:
+            aggregates.issn_count_dict = self.__column('ISSN').bincount()
+
+        return aggregates
+
+
+class StreamingScientometryData(ScientometryData):
+
+    """Streaming data container for a set of the source scientometric data
+
+    Alternative storage engine to ScientometryData that doesn't keep any rows
+    in memory.  Aggregates are computed by folding SourceAggregates over the
+    records read by csv.reader (see SourceAggregates.fold_records()), so that
+    the memory consumption doesn't depend on the size of the source data file.
+    Only the counting methods are available--the rows themselves ('data') are
+    not.  Large files can be split into chunks aggregated in parallel by a pool
+    of worker processes (see split_csv_records() and aggregate_csv_chunk()).
+
+    Attributes:
+    data_file -- source data file name
+    parse_jobs -- number of chunks processed in parallel
+    row_filter -- RowFilter object of the folded rows (None = all rows)
+    aggregates -- SourceAggregates object of the already computed aggregates
+
+    """
+
+    def __init__(self, data_file, parse_jobs=1, row_filter=None):
+        """Initialize StreamingScientometryData object.
+
+        The source data file ('data_file') is not parsed until some aggregates
+        are requested.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Keyword arguments:
+        parse_jobs -- number of chunks processed in parallel (default: 1)
+        row_filter -- RowFilter object (default: None = all rows)
+
+        """
+        self.data_file = data_file
+        self.parse_jobs = parse_jobs
+        self.row_filter = row_filter
+        self.aggregates = SourceAggregates([])
+
+    @property
+    def data(self):
+        """Rows are not available in the streaming mode."""
+        raise ValueError("Rows of " + self.data_file + " are not kept in the streaming mode")
+
+    def compute_aggregates(self, aggregate_names):
+        """Compute given aggregates in a single pass over the source data file.
+
+        If more parse jobs are requested, the file is split into chunks on
+        record boundaries and the partial aggregates of the chunks are merged.
+
+        Positional arguments:
+        aggregate_names -- iterable of aggregate names
+
+        Returns SourceAggregates object.
+
+        """
+        aggregates = SourceAggregates(aggregate_names)
+        if self.parse_jobs > 1:
+            header, chunk_list = split_csv_records(self.data_file, self.parse_jobs)
+            task_list = [(self.data_file, header, start, end, aggregates.aggregate_names, self.row_filter)
+                         for start, end in chunk_list]
+            pool = multiprocessing.Pool(self.parse_jobs)
+            try:
+                for chunk_aggregates in pool.map(aggregate_csv_chunk, task_list):
+                    aggregates.merge(chunk_aggregates)
+            finally:
+                pool.close()
+                pool.join()
+            return aggregates
+
+        # The 'utf-8-sig' encoding is required, because some input CSV files
+        # contain CSV preamble (for UTF-8) that has to be ignored.
+        with open(self.data_file, 'r', encoding='utf-8-sig', newline='') as csv_file:
+            fieldnames, records = csv_records(csv_file, self.row_filter)
+            aggregates.fold_records(records, fieldnames)
+
+        return aggregates
+
+
+class SqliteScientometryData(ScientometryData):
+
+    """SQLite data container for a single set of the source scientometric data
+
+    Alternative storage engine to ScientometryData that bulk-loads the source
+    data file into a table of the SourceDatabase.  Aggregates are computed by
+    SQL queries grouped by the indexed columns and the rows ('data') are read
+    from the database on first access.  The table can be queried directly
+    (see SqlData).
+
+    Attributes:
+    data_file -- source data file name
+    database -- SourceDatabase object
+    table_name -- name of the table containing the source data
+    aggregates -- SourceAggregates object of the already computed aggregates
+
+    """
+
+    def __init__(self, data_file, source_database, row_filter=None):
+        """Initialize SqliteScientometryData object.
+
+        Loads the source data file ('data_file') into the database unless it
+        has been loaded already.  Filtered rows are loaded into a separate
+        table (see SourceDatabase.load()).
+
+        Positional arguments:
+        data_file -- source data file name
+        source_database -- SourceDatabase object
+
+        Keyword arguments:
+        row_filter -- RowFilter object (default: None = all rows)
+
+        """
+        self.data_file = data_file
+        self.database = source_database
+        with stage_profiler.stage('parse', file=data_file, storage='sqlite') as record:
+            self.table_name = source_database.load(data_file, row_filter)
+            if stage_profiler.enabled:
+                record['rows_read'] = source_database.connection.execute(
+                    "SELECT COUNT(*) FROM " + SourceDatabase.quote(self.table_name)).fetchone()[0]
+        self.aggregates = SourceAggregates([])
+        self.__data = None
+
+    @property
+    def data(self):
+        """List of rows read from the database on first access."""
+        if self.__data is None:
+            col_list = self.database.fieldnames(self.table_name)
+            query = "SELECT " + ", ".join(SourceDatabase.quote(x) for x in col_list) + \
+                    " FROM " + SourceDatabase.quote(self.table_name) + " ORDER BY rowid"
+            self.__data = self.database.query(query)[1]
+
+        return self.__data
+
+    def compute_aggregates(self, aggregate_names):
+        """Compute given aggregates by grouping queries.
+
+        Citations are grouped by the distinct pairs of year and 'Cites'
+        value, so that invalid 'Cites' values are detected in the same way as
+        by SourceAggregates.fold().
+
+        Positional arguments:
+        aggregate_names -- iterable of aggregate names
+
+        Returns SourceAggregates object.
+
+        """
+        aggregates = SourceAggregates(aggregate_names)
+        table = SourceDatabase.quote(self.table_name)
+
+        if 'publication_counts_per_year' in aggregates.aggregate_names:
+            query = "SELECT Year, COUNT(*) AS Count FROM " + table + " GROUP BY Year"
+            for row in self.database.query(query)[1]:
+                aggregates.year_count_dict[row['Year']] = row['Count']
+        if 'citation_counts_per_year' in aggregates.aggregate_names:
+            query = "SELECT Year, Cites, COUNT(*) AS Count FROM " + table + " GROUP BY Year, Cites"
+            for row in self.database.query(query)[1]:
+                year = row['Year']
+                try:
+                    citations = int(row['Cites']) * row['Count']
+                except (TypeError, ValueError):
+                    citations = 0
+                    aggregates.cites_error_list.append((year, row['Cites']))
+                aggregates.year_citation_dict[year] = aggregates.year_citation_dict.get(year, 0) + citations
+        if 'publication_counts_per_journal' in aggregates.aggregate_names:
+            query = "SELECT ISSN, COUNT(*) AS Count FROM " + table + " GROUP BY ISSN"
+            for row in self.database.query(query)[1]:
+                aggregates.issn_count_dict[row['ISSN']] = row['Count']
+
+        return aggregates
+
+
+def csv_records(csv_file, row_filter=None, fieldnames=None):
+    """Return field names and records of the source data file.
+
+    Records (lists of values) are split by csv.reader and filtered by the
+    RowFilter ('row_filter') before anything else is done with them.
+
+    Positional arguments:
+    csv_file -- iterable of the lines of the CSV file (e.g. file object
+                opened in text mode with newline='')
+
+    Keyword arguments:
+    row_filter -- RowFilter object (default: None = all records)
+    fieldnames -- list of field names (default: None = read from the header
+                  record)
+
+    Returns tuple (list of field names, iterator over the records).
+
+    """
+    csv_reader = csv.reader(csv_file)
+    if fieldnames is None:
+        fieldnames = next(csv_reader, [])
+    if row_filter:
+        return fieldnames, filter(row_filter.compile(fieldnames), csv_reader)
+
+    return fieldnames, csv_reader
+
+
+def intern_records(records, field_count, sample_size=1024):
+    """Share equal values of the low-cardinality columns of CSV records.
+
+    Columns with at most half of the values distinct within the first
+    'sample_size' records (e.g. 'Year', 'Type', 'Source' or 'QueryDate') are
+    considered low-cardinality.  Their equal values are replaced by a single
+    shared instance, so that the repeated values are stored only once.
+
+    Positional arguments:
+    records -- iterable of CSV records (lists of values)
+    field_count -- number of fields of the header
+
+    Keyword arguments:
+    sample_size -- number of records the columns are assessed by
+
+    Returns iterator over the records.
+
+    """
+    records = iter(records)
+    sample = list(itertools.islice(records, sample_size))
+    intern_list = []
+    for position in range(field_count):
+        values = [x[position] for x in sample if len(x) > position]
+        if values and len(set(values)) * 2 <= len(values):
+            intern_list.append((position, {}))
+
+    for record in itertools.chain(sample, records):
+        if len(record) >= field_count:
+            for position, value_dict in intern_list:
+                value = record[position]
+                record[position] = value_dict.setdefault(value, value)
+        yield record
+
+
+def read_csv_rows(csv_file, columns=None, row_filter=None, fieldnames=None):
+    """Read source data rows with pushed down projection and filter.
+
+    Records are split by csv.reader and filtered (see csv_records()), only
+    the accepted records are turned into rows and only the values of the
+    projected columns ('columns') are stored in them.  The rows are compact
+    SourceRecord objects sharing the layout of the header and the values of
+    the low-cardinality columns (see intern_records()).  Without projection
+    the rows contain the same items as those of csv.DictReader, including
+    None values of short records and the None key of excessive values.
+    Projected rows contain only the projected columns found in the header and
+    no excessive values.  Empty records are skipped.
+
+    Positional arguments:
+    csv_file -- iterable of the lines of the CSV file (e.g. file object
+                opened in text mode with newline='')
+
+    Keyword arguments:
+    columns -- iterable of the extracted columns (default: None = all columns)
+    row_filter -- RowFilter object (default: None = all rows)
+    fieldnames -- list of field names (default: None = read from the header
+                  record)
+
+    Returns iterator over the rows (SourceRecord objects).
+
+    """
+    fieldnames, records = csv_records(csv_file, row_filter, fieldnames)
+    field_count = len(fieldnames)
+
+    # The last of the duplicate columns wins as in csv.DictReader
+    column_set = frozenset(columns) if columns is not None else frozenset(fieldnames)
+    position_dict = {x: i for i, x in enumerate(fieldnames) if x in column_set}
+    positions = list(position_dict.values())
+    layout = {x: i for i, x in enumerate(position_dict)}
+    extra_layout = dict(layout)
+    extra_layout[None] = len(layout)
+    direct = positions == list(range(field_count))
+
+    for record in intern_records(records, field_count):
+        length = len(record)
+        if length < field_count:
+            if not record:
+                continue
+            record = record + [None] * (field_count - length)
+        if direct:
+            values = tuple(record) if length == field_count else tuple(record[:field_count])
+        else:
+            values = tuple(map(record.__getitem__, positions))
+        if length > field_count and columns is None:
+            yield SourceRecord(extra_layout, values + (record[field_count:],))
+        else:
+            yield SourceRecord(layout, values)
+
+
+def split_csv_records(data_file, chunk_count, block_size=1 << 20):
+    """Split CSV file into byte ranges on record boundaries.
+
+    Record boundary is a newline preceded by an even number of double quotes
+    (counted from the beginning of the file), so that newlines embedded in
+    quoted fields are never used as a boundary.  The file is scanned block by
+    block, hence the scan doesn't need more memory than 'block_size'.
+
+    Positional arguments:
+    data_file -- CSV file name
+    chunk_count -- requested number of chunks
+
+    Keyword arguments:
+    block_size -- size of the scanned blocks in bytes (default: 1 MiB)
+
+    Returns tuple (header, chunk list), where header is the raw header record
+    (including the UTF-8 preamble, if present) and chunk list is a list of
+    (start, end) tuples of byte offsets of the data records.
+
+    """
+    file_size = os.path.getsize(data_file)
+    # The first boundary ends the header, the rest split the data evenly
+    target_list = [0] + [file_size * i // chunk_count for i in range(1, chunk_count)]
+    boundary_list = []
+    quote_count = 0
+    position = 0
+    with open(data_file, 'rb') as binary_file:
+        while target_list:
+            block = binary_file.read(block_size)
+            if not block:
+                break
+            index = 0
+            while target_list:
+                newline_index = block.find(b'\n', max(index, target_list[0] - position))
+                if newline_index < 0:
+                    break
+                quote_count += block.count(b'"', index, newline_index)
+                index = newline_index + 1
+                # Odd count means the newline is embedded in a quoted field
+                if quote_count % 2 == 0:
+                    boundary_list.append(position + index)
+                    while target_list and target_list[0] < position + index:
+                        target_list.pop(0)
+            quote_count += block.count(b'"', index)
+            position += len(block)
+
+        binary_file.seek(0)
+        header = binary_file.read(boundary_list[0] if boundary_list else file_size)
+
+    boundary_list.append(file_size)
+    chunk_list = [(start, end) for start, end in zip(boundary_list[:-1], boundary_list[1:]) if start < end]
+
+    return header, chunk_list
+
+
+def aggregate_csv_chunk(task):
+    """Compute aggregates of a single chunk of the CSV file.
+
+    This function is supposed to be run by a worker process.  The header is
+    parsed separately using 'utf-8-sig' encoding (it contains the UTF-8
+    preamble if the file does), the records of the chunk are parsed using the
+    field names from the header.
+
+    Positional arguments:
+    task -- tuple (CSV file name, raw header, start offset, end offset,
+            aggregate names, RowFilter object)
+
+    Returns SourceAggregates object.
+
+    """
+    data_file, header, start, end, aggregate_names, row_filter = task
+    fieldnames = next(csv.reader([header.decode('utf-8-sig')]), [])
+
+    def read_lines(binary_file, position):
+        while position < end:
+            line = binary_file.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode('utf-8')
+
+    aggregates = SourceAggregates(aggregate_names)
+    with open(data_file, 'rb') as binary_file:
+        binary_file.seek(start)
+        records = csv_records(read_lines(binary_file, start), row_filter, fieldnames)[1]
+        aggregates.fold_records(records, fieldnames)
+
+    return aggregates
+
+
+class SourceDataRegistry(object):
+
+    """Run-scoped registry of the parsed source data.
+
+    Shares ScientometryData objects among all sections processed within a
+    single run, so that every source data file is parsed only once no matter
+    how many sections refer to it.  Source data files are identified by their
+    resolved path together with their size and modification time.  The
+    registry counts references to each source data file in advance and
+    releases the parsed data as soon as the last section that uses them has
+    been processed--unless the parsed data are kept ('keep_data') for the
+    following runs of the watch mode.  In that case the registry is planned
+    again before each run (see plan()) and only the data of the changed files
+    are parsed again.  JournalCatalog objects are shared the same way (see
+    acquire_catalog()).  Data parsed by different storage engines (see
+    'storage_class_dict') are registered separately.  If the storage engine
+    of a section is not configured, the source data file is processed in the
+    streaming mode as long as all sections using it without explicit storage
+    engine are 'streamable' (see OutputData); otherwise complete rows are kept.
+
+    Output data classes that require particular storage engine (see
+    'storage' attribute of the OutputData subclasses) override the configured
+    one.
+
+    The registry also plans the aggregates: it collects aggregates required by
+    all sections that refer to the same source data (see 'source_aggregates'
+    attribute of the OutputData subclasses) and computes them together in a
+    single pass over the data when the source data file is parsed.
+
+    Similarly, the registry plans the projection of the source data: the
+    columns required by all sections that refer to the same source data (see
+    OutputData.required_columns()) are combined and only these columns are
+    extracted into the rows when the source data file is parsed.  Data filtered
+    by the RowFilter of the section ('row_filter' attribute of SectionConfig)
+    are registered separately for each filter, the filter is evaluated by the
+    parser as well.
+
+    Attributes:
+    storage_class_dict -- dict of source data classes associated by storage
+                          engine name
+    parse_jobs -- number of chunks of the streamed source data files processed
+                  in parallel
+    source_cache -- SourceCache object or None
+    source_database -- SourceDatabase object used by the 'sqlite' storage
+                       engine
+    keep_data -- True if the parsed data are kept after the last section that
+                 uses them has been processed
+    file_key_dict -- dict of file identity keys associated by file name
+    auto_storage_dict -- dict of automatically selected storage engines
+                         associated by file identity key
+    reference_count_dict -- dict of remaining section references associated by
+                            file identity key
+    source_data_dict -- dict of ScientometryData objects associated by file
+                        identity key
+    catalog_dict -- dict of JournalCatalog objects associated by file
+                    identity key
+    catalog_reference_dict -- dict of remaining section references to the
+                              journal catalogs associated by file identity key
+    aggregate_plan_dict -- dict of sets of required aggregates associated by
+                           file identity key
+    projection_dict -- dict of sets of required columns (None = all columns)
+                       associated by file identity key
+
+    """
+
+    storage_class_dict = {
+        'rows': ScientometryData,
+        'columnar': ColumnarScientometryData,
+        'streaming': StreamingScientometryData,
+        'sqlite': SqliteScientometryData,
+    }
+
+    def __init__(self, section_config_list, parse_jobs=1, source_cache=None, source_database=None,
+                 keep_data=False):
+        """Initialize SourceDataRegistry object.
+
+        Plans processing of the given list of SectionConfig objects
+        ('section_config_list', see plan()).
+
+        Positional arguments:
+        section_config_list -- list of SectionConfig objects processed within
+                               the current run
+
+        Keyword arguments:
+        parse_jobs -- number of chunks of the streamed source data files
+                      processed in parallel (default: 1)
+        source_cache -- SourceCache object used by the storage engines that
+                        keep the data in memory (default: None)
+        source_database -- SourceDatabase object used by the 'sqlite' storage
+                           engine (default: None = in-memory database)
+        keep_data -- keep the parsed data for the following runs (default:
+                     False)
+
+        """
+        self.parse_jobs = parse_jobs
+        self.source_cache = source_cache
+        self.source_database = source_database if source_database else SourceDatabase()
+        self.keep_data = keep_data
+        self.source_data_dict = {}
+        self.catalog_dict = {}
+        self.plan(section_config_list)
+
+    def plan(self, section_config_list):
+        """Plan processing of given sections.
+
+        Counts the references to every source data file from the given list of
+        SectionConfig objects ('section_config_list') and collects aggregates
+        required by each section from every source data file.  Files that can't
+        be identified (e.g. missing files) are not counted--the error is raised
+        when the corresponding section is being processed.  Parsed data and
+        journal catalogs of the files that have changed since they were parsed
+        or that are not used by any of the sections are dropped, as well as
+        the data lacking some of the required columns.  The others are reused.
+
+        Positional arguments:
+        section_config_list -- list of SectionConfig objects processed within
+                               the current run
+
+        """
+        self.file_key_dict = {}
+        self.auto_storage_dict = {}
+        self.reference_count_dict = {}
+        self.catalog_reference_dict = {}
+        self.aggregate_plan_dict = {}
+        self.projection_dict = {}
+
+        for section_config in section_config_list:
+            if SourceDataRegistry.section_storage(section_config):
+                continue
+            output_data_class = globals().get(section_config.output_data_class)
+            streamable = getattr(output_data_class, 'streamable', False)
+            for data_file in SourceDataRegistry.source_data_files(section_config):
+                try:
+                    file_key = self.file_key(data_file)
+                except (OSError, TypeError):
+                    continue
+                if streamable and self.auto_storage_dict.get(file_key, "streaming") == "streaming":
+                    self.auto_storage_dict[file_key] = "streaming"
+                else:
+                    self.auto_storage_dict[file_key] = "rows"
+
+        for section_config in section_config_list:
+            output_data_class = globals().get(section_config.output_data_class)
+            source_aggregates = getattr(output_data_class, 'source_aggregates', [])
+            if hasattr(output_data_class, 'required_columns'):
+                columns = output_data_class.required_columns(section_config)
+            else:
+                columns = None
+            storage = SourceDataRegistry.section_storage(section_config)
+            for data_file in SourceDataRegistry.source_data_files(section_config):
+                try:
+                    key = self.data_key(data_file, storage, section_config.row_filter)
+                except (OSError, TypeError):
+                    continue
+                self.reference_count_dict[key] = self.reference_count_dict.get(key, 0) + 1
+                self.aggregate_plan_dict.setdefault(key, set()).update(source_aggregates)
+                if columns is None or self.projection_dict.get(key, set()) is None:
+                    self.projection_dict[key] = None
+                else:
+                    self.projection_dict.setdefault(key, set()).update(columns)
+
+        for section_config in section_config_list:
+            try:
+                key = self.file_key(section_config.journal_catalog_file)
+            except (OSError, TypeError):
+                continue
+            self.catalog_reference_dict[key] = self.catalog_reference_dict.get(key, 0) + 1
+        for key in list(self.source_data_dict.keys()):
+            projection = getattr(self.source_data_dict[key], 'projection', None)
+            required = self.projection_dict.get(key)
+            if key not in self.reference_count_dict or \
+               (projection is not None and (required is None or not required <= projection)):
+                del self.source_data_dict[key]
+        for key in list(self.catalog_dict.keys()):
+            if key not in self.catalog_reference_dict:
+                self.catalog_dict.pop(key).close()
+
+    @staticmethod
+    def section_storage(section_config):
+        """Return storage engine used by given section.
+
+        Positional arguments:
+        section_config -- SectionConfig object
+
+        Returns name of the storage engine required by the output data class
+        or the configured one (None = automatic).
+
+        """
+        output_data_class = globals().get(section_config.output_data_class)
+        return getattr(output_data_class, 'storage', None) or section_config.storage
+
+    @staticmethod
+    def source_data_files(section_config):
+        """Return list of source data files used by given section.
+
+        Positional arguments:
+        section_config -- SectionConfig object
+
+        Returns list of source data file names.
+
+        """
+        if type(section_config.source_data_file) is dict:
+            return list(section_config.source_data_file.values())
+        else:
+            return [section_config.source_data_file]
+
+    def file_key(self, data_file):
+        """Return identity key of given source data file.
+
+        The key is composed from the resolved path, the size and the
+        modification time of the file.  Once computed, the key is remembered
+        for the rest of the run, so that the file is identified consistently
+        even if it gets modified in the meantime.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Returns tuple (resolved path, size, modification time).
+
+        """
+        if data_file not in self.file_key_dict:
+            stat = os.stat(data_file)
+            self.file_key_dict[data_file] = (os.path.realpath(data_file), stat.st_size, stat.st_mtime)
+
+        return self.file_key_dict[data_file]
+
+    def data_key(self, data_file, storage=None, row_filter=None):
+        """Return key of the parsed data of given source data file.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Keyword arguments:
+        storage -- configured storage engine (default: None = automatic)
+        row_filter -- RowFilter object (default: None = all rows)
+
+        Returns tuple (file identity key, storage engine, filter signature).
+
+        """
+        return (self.file_key(data_file), self.resolve_storage(data_file, storage),
+                row_filter.signature if row_filter else None)
+
+    def resolve_storage(self, data_file, storage=None):
+        """Resolve storage engine used for given source data file.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Keyword arguments:
+        storage -- configured storage engine (default: None = automatic)
+
+        Returns name of the storage engine.
+
+        """
+        if storage:
+            return storage
+
+        return self.auto_storage_dict.get(self.file_key(data_file), "rows")
+
+    def acquire(self, data_file, storage=None, row_filter=None):
+        """Return ScientometryData object for given source data file.
+
+        Parses the source data file only if it hasn't been parsed yet within
+        the current run by the same storage engine (and with the same filter).
+        Only the columns planned for the source data file are extracted (by
+        the storage engines that support projection) and all aggregates
+        planned for the source data file are precomputed right after parsing.
+
+        Positional arguments:
+        data_file -- source data file name
+
+        Keyword arguments:
+        storage -- name of the storage engine (default: None = automatic)
+        row_filter -- RowFilter object (default: None = all rows)
+
+        Returns ScientometryData object.
+
+        """
+        storage = self.resolve_storage(data_file, storage)
+        if storage not in self.storage_class_dict:
+            raise ValueError("Unknown storage engine '" + storage + "'")
+
+        key = self.data_key(data_file, storage, row_filter)
+        if key not in self.source_data_dict:
+            if storage == "streaming":
+                source_data = StreamingScientometryData(data_file, self.parse_jobs, row_filter)
+            elif storage == "sqlite":
+                source_data = SqliteScientometryData(data_file, self.source_database, row_filter)
+            elif storage == "columnar":
+                source_data = ColumnarScientometryData(data_file, self.source_cache, row_filter)
+            else:
+                columns = self.projection_dict.get(key)
+                source_data = self.storage_class_dict[storage](data_file, self.source_cache, columns, row_filter)
+            source_data.precompute_aggregates(self.aggregate_plan_dict.get(key, []))
+            self.source_data_dict[key] = source_data
+
+        return self.source_data_dict[key]
+
+    def acquire_catalog(self, journal_catalog_file):
+        """Return JournalCatalog object for given journal catalog file.
+
+        Positional arguments:
+        journal_catalog_file -- journal catalog file name
+
+        Returns JournalCatalog object.
+
+        """
+        key = self.file_key(journal_catalog_file)
+        if key not in self.catalog_dict:
+            index_dir = self.source_cache.cache_dir if self.source_cache else None
+            self.catalog_dict[key] = JournalCatalog(journal_catalog_file, index_dir)
+
+        return self.catalog_dict[key]
+
+    def release(self, section_config):
+        """Release source data used by given section.
+
+        Decrements reference counts of all source data files and the journal
+        catalog used by the section ('section_config') and drops the parsed
+        data and closes the catalogs that are no longer referenced by any of
+        the remaining sections (unless the data are kept).
+
+        Positional arguments:
+        section_config -- SectionConfig object of the processed section
+
+        """
+        for data_file in SourceDataRegistry.source_data_files(section_config):
+            if data_file not in self.file_key_dict:
+                continue
+            storage = SourceDataRegistry.section_storage(section_config)
+            key = self.data_key(data_file, storage, section_config.row_filter)
+            self.reference_count_dict[key] = self.reference_count_dict.get(key, 1) - 1
+            if self.reference_count_dict[key] <= 0 and not self.keep_data:
+                self.source_data_dict.pop(key, None)
+
+        if section_config.journal_catalog_file in self.file_key_dict:
+            key = self.file_key(section_config.journal_catalog_file)
+            self.catalog_reference_dict[key] = self.catalog_reference_dict.get(key, 1) - 1
+            if self.catalog_reference_dict[key] <= 0 and not self.keep_data and key in self.catalog_dict:
+                self.catalog_dict.pop(key).close()
+
+
+class DeduplicationIndex(object):
+
+    """Index of the deduplicated publication records.
+
+    Collects publication records from multiple datasets and matches every
+    added record against the records of the previously added datasets.  The
+    records are matched exactly by the normalised DOI first (see
+    normalize_doi()).  Records that don't match by DOI are matched by the
+    similarity of their normalised titles (see normalize_title()), but only
+    with the candidates of the same year found by the blocking index.  The
+    blocking keys are the normalised ISSN, the beginning and the end of the
+    normalised title (each combined with the year), so that the number of
+    compared pairs stays proportional to the number of records.  Records
+    with different DOIs or different ISSNs never match.  Each record is
+    matched with at most one record of every other dataset.
+
+    Attributes:
+    title_threshold -- minimum similarity ratio of the matched titles
+    block_prefix_length -- length of the title beginning/end used as blocking
+                           key
+    record_list -- list of merged records, each record is a dict with 'row'
+                   (merged row), 'datasets' (list of datasets), 'doi',
+                   'title', 'issn' and 'year' items
+    doi_dict -- dict of record indices associated by normalised DOI
+    block_dict -- dict of sets of record indices associated by blocking key
+    stats_dict -- dict of match statistics associated by dataset
+
+    """
+
+    title_threshold = 0.9
+    block_prefix_length = 16
+    doi_prefix_pattern = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+    title_separator_pattern = re.compile(r"[\W_]+", re.UNICODE)
+
+    def __init__(self):
+        """Initialize empty DeduplicationIndex object."""
+        self.record_list = []
+        self.doi_dict = {}
+        self.block_dict = {}
+        self.stats_dict = {}
+
+    @classmethod
+    def normalize_doi(cls, doi):
+        """Normalise DOI.
+
+        Removes the resolver URL or 'doi:' prefix and converts the DOI to
+        lowercase (DOIs are case insensitive).
+
+        Positional arguments:
+        doi -- DOI
+
+        Returns normalised DOI or None if 'doi' is empty.
+
+        """
+        doi = cls.doi_prefix_pattern.sub("", doi.strip()) if doi else ""
+        return doi.lower() if doi else None
+
+    @classmethod
+    def normalize_title(cls, title):
+        """Normalise title.
+
+        Removes diacritics, punctuation and redundant whitespace and converts
+        the title to lowercase.
+
+        Positional arguments:
+        title -- title
+
+        Returns normalised title.
+
+        """
+        title = unicodedata.normalize('NFKD', title or "")
+        title = "".join(x for x in title if not unicodedata.combining(x))
+        return cls.title_separator_pattern.sub(" ", title.lower()).strip()
+
+    def block_keys(self, record):
+        """Return list of blocking keys of the record."""
+        year, title = record['year'], record['title']
+        key_list = [(year, 'title-start', title[:self.block_prefix_length]),
+                    (year, 'title-end', title[-self.block_prefix_length:])]
+        if record['issn']:
+            key_list.append((year, 'issn', record['issn']))
+
+        return key_list
+
+    def is_compatible(self, record, other):
+        """Check whether the records don't contradict each other."""
+        if record['doi'] and other['doi'] and record['doi'] != other['doi']:
+            return False
+        if record['issn'] and other['issn'] and record['issn'] != other['issn']:
+            return False
+
+        return True
+
+    def find(self, record, dataset):
+        """Find record matching given record.
+
+        Positional arguments:
+        record -- record (see 'record_list')
+        dataset -- dataset of the record
+
+        Returns tuple (index of the matching record, match type) where the
+        match type is 'doi' or 'title'.  Returns (None, None) if no record
+        matches.
+
+        """
+        if record['doi']:
+            index = self.doi_dict.get(record['doi'])
+            if index is not None and dataset not in self.record_list[index]['datasets']:
+                return index, 'doi'
+
+        if not record['title']:
+            return None, None
+
+        candidate_set = set()
+        for key in self.block_keys(record):
+            candidate_set.update(self.block_dict.get(key, ()))
+
+        best_index = None
+        best_ratio = self.title_threshold
+        matcher = SequenceMatcher(None, "", record['title'])
+        for index in sorted(candidate_set):
+            other = self.record_list[index]
+            if dataset in other['datasets'] or not self.is_compatible(record, other):
+                continue
+            # SequenceMatcher caches the information about the second
+            # sequence, hence the title of the added record is the second one
+            matcher.set_seq1(other['title'])
+            if matcher.real_quick_ratio() >= best_ratio and matcher.quick_ratio() >= best_ratio:
+                ratio = matcher.ratio()
+                if ratio >= best_ratio:
+                    best_index, best_ratio = index, ratio
+                    if ratio == 1.0:
+                        break
+
+        return (best_index, 'title') if best_index is not None else (None, None)
+
+    def add(self, row, dataset):
+        """Add row of given dataset into the index.
+
+        If the row matches some of the records, the record is updated--its
+        empty values are filled with the values from the row.  Otherwise the
+        row is added as a new record.
+
+        Positional arguments:
+        row -- source data row (SourceRecord object)
+        dataset -- dataset of the row
+
+        """
+        record = {
+            'doi': DeduplicationIndex.normalize_doi(row.get('DOI')),
+            'title': DeduplicationIndex.normalize_title(row.get('Title')),
+            'issn': JournalCatalog.normalize_issn(row.get('ISSN')),
+            'year': row.get('Year'),
+        }
+        stats = self.stats_dict.setdefault(dataset, {'records': 0, 'doi': 0, 'title': 0, 'new': 0})
+        stats['records'] += 1
+
+        index, match_type = self.find(record, dataset)
+        if index is None:
+            index = len(self.record_list)
+            record['row'] = dict(row.items())
+            record['datasets'] = [dataset]
+            self.record_list.append(record)
+            stats['new'] += 1
+        else:
+            merged_record = self.record_list[index]
+            merged_row = merged_record['row']
+            for key, value in row.items():
+                if value and not merged_row.get(key):
+                    merged_row[key] = value
+            merged_record['datasets'].append(dataset)
+            for key in ['doi', 'issn']:
+                if record[key] and not merged_record[key]:
+                    merged_record[key] = record[key]
+            stats[match_type] += 1
+
+        for key in self.block_keys(self.record_list[index]):
+            self.block_dict.setdefault(key, set()).add(index)
+        if record['doi'] and record['doi'] not in self.doi_dict:
+            self.doi_dict[record['doi']] = index
+
+
+class AuthorIndex(object):
+
+    """Inverted index of the authors of the source data.
+
+    Splits the comma-separated 'Authors' column of every row only once and
+    maps each author name onto the array of ids (positions) of the rows the
+    name appears in.  Names and years are interned, so that every distinct
+    value is stored only once no matter how many rows refer to it.  Years and
+    citations of the rows are kept aside, so that tables of the authors are
+    computed from the arrays of row ids only.  Name variants of the same
+    person are resolved by an alias dict when the tables are computed (see
+    author_rows()), hence the same index serves any alias file.
+
+    Attributes:
+    posting_dict -- dict of arrays of row ids associated by author names
+    year_list -- list of years of the rows
+    cites_array -- array of citations of the rows
+
+    """
+
+    def __init__(self, rows):
+        """Initialize AuthorIndex object.
+
+        Author names are stripped and the whitespace inside them is
+        collapsed.
+
+        Positional arguments:
+        rows -- list of source data rows (SourceRecord objects)
+
+        """
+        intern_dict = {}
+        posting_dict = {}
+        year_list = []
+        cites_array = array('l')
+
+        for row_id, row in enumerate(rows):
+            year = row['Year']
+            year_list.append(intern_dict.setdefault(year, year))
+            cites_array.append(int(row['Cites']))
+            for name in (row.get('Authors') or "").split(","):
+                name = " ".join(name.split())
+                if not name:
+                    continue
+                name = intern_dict.setdefault(name, name)
+                posting = posting_dict.get(name)
+                if posting is None:
+                    posting = posting_dict[name] = array('l')
+                # The same name listed twice in a row is counted once
+                if not posting or posting[-1] != row_id:
+                    posting.append(row_id)
+
+        self.posting_dict = posting_dict
+        self.year_list = year_list
+        self.cites_array = cites_array
+
+    @staticmethod
+    def load_aliases(alias_file):
+        """Load author alias file.
+
+        The alias file is a CSV file with 'Author' and 'Alias' columns, each
+        row maps a name variant ('Alias') onto the name of the person
+        ('Author').
+
+        Positional arguments:
+        alias_file -- author alias file name
+
+        Returns dict of author names associated by name variants.
+
+        """
+        alias_dict = {}
+        # The 'utf-8-sig' encoding is required, because some input CSV files
+        # contain CSV preamble (for UTF-8) that has to be ignored.
+        with open(alias_file, 'r', encoding='utf-8-sig', newline='') as csv_file:
+            for row in csv.DictReader(csv_file):
+                alias_dict[" ".join(row['Alias'].split())] = " ".join(row['Author'].split())
+
+        return alias_dict
+
+    def author_rows(self, alias_dict=None):
+        """Map authors onto their rows.
+
+        Keyword arguments:
+        alias_dict -- dict of author names associated by name variants
+                      (default: None)
+
+        Returns dict of sequences of row ids associated by author names.
+
+        """
+        alias_dict = alias_dict or {}
+        variant_dict = {}
+        for name, posting in self.posting_dict.items():
+            variant_dict.setdefault(alias_dict.get(name, name), []).append(posting)
+
+        author_row_dict = {}
+        for author, posting_list in variant_dict.items():
+            if len(posting_list) == 1:
+                author_row_dict[author] = posting_list[0]
+            else:
+                author_row_dict[author] = sorted(set().union(*posting_list))
+
+        return author_row_dict
+
+    def counts_per_year(self, row_ids):
+        """Count publications and citations of given rows per year.
+
+        Positional arguments:
+        row_ids -- sequence of row ids
+
+        Returns tuple of dicts (publication counts, citation counts)
+        associated by year.
+
+        """
+        year_list = self.year_list
+        cites_array = self.cites_array
+        publication_count_dict = {}
+        citation_count_dict = {}
+        for row_id in row_ids:
+            year = year_list[row_id]
+            publication_count_dict[year] = publication_count_dict.get(year, 0) + 1
+            citation_count_dict[year] = citation_count_dict.get(year, 0) + cites_array[row_id]
+
+        return publication_count_dict, citation_count_dict
+
+
+class OutputData(object):
+
+    """Abstract data container for the output data.
+
+    The abstract class that defines all common attributes and methods for all
+    output data classes.  This class shouldn't be used directly.  Subclasses
+    declare aggregates they request from the source data in the
+    'source_aggregates' class attribute, so that these can be planned and
+    precomputed by SourceDataRegistry.  Subclasses that use nothing but these
+    aggregates set the 'streamable' class attribute, so that their source data
+    can be processed in the streaming mode.  Subclasses that require
+    particular storage engine of the source data set the 'storage' class
+    attribute.  Subclasses that use only some columns of the source data
+    declare them in the 'source_columns' class attribute (see
+    required_columns()), so that the other columns are not extracted at all.
+
+    The output data are written either as CSV files or, if the 'output_format'
+    of the section configuration is 'columnar', as binary columnar files (see
+    SourceTable) that can be memory-mapped by the downstream tools.  Each file
+    is written into a temporary file that replaces the output file only if
+    their contents differ (see replace_file()), so that the readers never see
+    partially written file and unchanged files keep their modification time.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_registry -- SourceDataRegistry object the source data are obtained
+                       from
+    source_data -- a dict of ScientometryData objects or a sinlge
+                   ScientometryData object
+    output_file -- name of the output file, a dict of filenames if data are
+                   supposed to be written to multiple output files
+    fieldnames -- list of field names in the output file header or a dict of
+                  such lists
+    data -- list of rows of the output data or a dict of such lists
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    source_aggregates = []
+    source_columns = None
+    streamable = False
+    storage = None
+    columnar_magic = b"SDPCOLS2"
+    columnar_suffix = ".sdpcol"
+
+    def __init__(self, config, source_registry=None):
+        """Initialize generic OutputData object.
+
+        Uses config data to instantiate source ScientometryData object(s) and
+        initializes all attributes that are common for all output data classes.
+        The source data are obtained from the 'source_registry' object, so that
+        they can be shared with the other sections instead of being parsed
+        again.  If 'source_registry' is not given, a private SourceDataRegistry
+        object is used.  This method has to be explicitly called via
+        super(SubClass, self) at the beginning of the __init__ method of the
+        derived subclass.
+
+        Positional arguments:
+        config -- SectionConfig object that contains configuration for the
+                  current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        self.config = config
+
+        if not source_registry:
+            source_registry = SourceDataRegistry([config])
+        self.source_registry = source_registry
+
+        storage = SourceDataRegistry.section_storage(config)
+        if type(config.source_data_file) is dict:
+            source_data = {}
+            for key, data_file in config.source_data_file.items():
+                source_data[key] = source_registry.acquire(data_file, storage, config.row_filter)
+        else:
+            source_data = source_registry.acquire(config.source_data_file, storage, config.row_filter)
+        self.source_data = source_data
+
+        self.output_file = config.output_data_file
+        self.fieldnames = None
+        self.data = None
+
+    @classmethod
+    def required_columns(cls, config):
+        """Return columns of the source data required by given section.
+
+        Positional arguments:
+        config -- SectionConfig object of the section
+
+        Returns set of column names or None if all columns are required.
+
+        """
+        return set(cls.source_columns) if cls.source_columns is not None else None
+
+    def output_list(self):
+        """Return list of (output file, field names, data) tuples.
+
+        Columnar output files get the '.sdpcol' suffix instead of '.csv'.
+
+        """
+        if type(self.output_file) is dict:
+            output_list = [(data_file, self.fieldnames[key], self.data[key])
+                           for key, data_file in self.output_file.items()]
+        else:
+            output_list = [(self.output_file, self.fieldnames, self.data)]
+        if self.config.output_format == 'columnar':
+            output_list = [(os.path.splitext(data_file)[0] + self.columnar_suffix, fieldnames, data)
+                           for data_file, fieldnames, data in output_list]
+
+        return output_list
+
+    def write(self, verbose=True):
+        """Write output data into an output file(s).
+
+        Depending on the actual character of the output data this method calls
+        OutputData.__write_csv() (or OutputData.__write_columnar() for the
+        'columnar' output format) to write either single output file or a set
+        of output files (see output_list()).
+
+        Keyword arguments:
+        verbose -- print names of the written files (default: True)
+
+        Returns list of written output files.
+
+        """
+        written_files = []
+        for data_file, fieldnames, data in self.output_list():
+            if self.config.output_format == 'columnar':
+                OutputData.__write_columnar(data_file, fieldnames, data, verbose)
+            else:
+                OutputData.__write_csv(data_file, fieldnames, data, verbose)
+            written_files.append(data_file)
+
+        return written_files
+
+    @staticmethod
+    def __write_csv(data_file, fieldnames, data, verbose=True):
+        """Write data into CSV file
+
+        Writes output CSV file with header based on the data stored in the
+        'data' and 'fieldnames' attributes.  The output is byte-identical to
+        the output of csv.DictWriter (with extrasaction='ignore'), but the
+        rows are passed to csv.writer as lists of values in bulk (see
+        csv.writer.writerows()), so that the rows are formatted by the C
+        implementation of the csv module without any per-row dict lookups of
+        DictWriter.  The file is written into a temporary file first (see
+        replace_file()).
+
+        """
+        with stage_profiler.stage('write', file=data_file) as record:
+            if verbose:
+                print("Generating", data_file, "...")
+            temp_file = data_file + "." + str(os.getpid()) + ".tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8', newline='') as csv_file:
+                    csv_writer = csv.writer(csv_file)
+                    csv_writer.writerow(fieldnames)
+                    csv_writer.writerows([row.get(x, "") for x in fieldnames] for row in data)
+            except BaseException:
+                os.remove(temp_file)
+                raise
+            record['unchanged'] = not replace_file(temp_file, data_file)
+            record['rows_written'] = len(data)
+
+    @staticmethod
+    def __write_columnar(data_file, fieldnames, data, verbose=True):
+        """Write data into binary columnar file
+
+        Writes the binary form of the SourceTable object created from the
+        'data' and 'fieldnames' attributes (see SourceTable.write()).  The file
+        is written into a temporary file first (see replace_file()), so that
+        the readers never map partially written file.
+
+        """
+        with stage_profiler.stage('write', file=data_file) as record:
+            if verbose:
+                print("Generating", data_file, "...")
+            table = SourceTable.from_output_rows(fieldnames, data)
+            temp_file = data_file + "." + str(os.getpid()) + ".tmp"
+            try:
+                with open(temp_file, 'wb') as binary_file:
+                    table.write(binary_file, OutputData.columnar_magic)
+            except BaseException:
+                os.remove(temp_file)
+                raise
+            record['unchanged'] = not replace_file(temp_file, data_file)
+            record['rows_written'] = len(data)
+
+
+class PublicationsData(OutputData):
+
+    """Data container for the publications data.
+
+    Generates and stores publications data based on the dictionary of
+    ScientometryData object containing the source scientometric data extracted
+    from each individual citation register.  The resulting data can be written
+    into a CSV file that can serve as input data file for the
+    'scientometry-plot-gen' script.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of ScientometryData objects
+    output_file -- name of the output file, a dict of filenames if data are
+                   supposed to be written to multiple output files
+    fieldnames -- list of field names in the output file header
+    data -- list of rows of the output data
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    source_aggregates = ['publication_counts_per_year']
+    source_columns = ['Year']
+    streamable = True
+
+    def __init__(self, config, source_registry=None):
+        """Initialize PublicationsData object and process given data.
+
+        Processes given 'scientometry_data_dict' in order to get publication
+        counts per year per citation register into the table of publication
+        counts and and saves it into the 'data' attribute.  Also generates data
+        header and saves it into 'fieldnames' attribute.  The list of field
+        names can be are optionally narrowed and/or reordered based on
+        'select_cols' attribute of the SectionConfig instance.  The 'fieldnames'
+        and 'data' attributes are supposed to be used in combination with
+        csv.DictWriter.
+
+        Positional arguments:
+        config -- SectionConfig object that contains configuration for the
+                  current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(PublicationsData, self).__init__(config, source_registry)
+
+        year_list = config.year_list
+        dataset_list = list(config.source_data_file.keys())
+
+        publication_count_dict = {}
+        for dataset, source_data in self.source_data.items():
+            publication_count_dict[dataset] = source_data.publication_counts_per_year(year_list)
+
+        data = []
+        for year in year_list:
+            # Since publication_counts_per_year method returns a dictionary, the
+            # publication_count_dict now contains two-dimensional dictionary
+            row = {k: publication_count_dict[k][year] for k in dataset_list}
+            row['Year'] = year
+            data.append(row)
+        self.data = data
+
+        fieldnames = config.select_cols if config.select_cols else ["Year"] + dataset_list
+        self.fieldnames = fieldnames
+
+
+class CitationsData(OutputData):
+
+    """Data container for the citations data.
+
+    Generates and stores citations data based on the dictionary of
+    ScientometryData object containing the source scientometric data extracted
+    from each individual citation register.  The resulting data can be written
+    into a CSV file that can serve as input data file for the
+    'scientometry-plot-gen' script.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of ScientometryData objects
+    output_file -- name of the output file
+    fieldnames -- list of field names in the output file header
+    data -- list of rows of the citations data
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    source_aggregates = ['citation_counts_per_year']
+    source_columns = ['Year', 'Cites']
+    streamable = True
+
+    def __init__(self, config, source_registry=None):
+        """Initialize CitationsData object and process given data.
+
+        Processes given 'scientometry_data_dict' in order to get citation counts
+        per year per citation register into the table of citation counts and and
+        saves it into the 'data' attribute.  Also generates data header and
+        saves it into 'fieldnames' attribute. The list of field names can be are
+        optionally narrowed and/or reordered based on 'select_cols' attribute of
+        the SectionConfig instance.
+
+        Positional arguments:
+        config -- SectionConfig object that contains configuration for the
+                  current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(CitationsData, self).__init__(config, source_registry)
+
+        year_list = config.year_list
+        dataset_list = list(config.source_data_file.keys())
+
+        citation_count_dict = {}
+        for dataset, source_data in self.source_data.items():
+            citation_count_dict[dataset] = source_data.citation_counts_per_year(year_list)
+
+        data = []
+        for year in config.year_list:
+            # Since citation_counts_per_year method returns a dictionary, the
+            # publication_count_dict now contains two-dimensional dictionary
+            row = {k: citation_count_dict[k][year] for k in dataset_list}
+            row['Year'] = year
+            data.append(row)
+        self.data = data
+
+        fieldnames = config.select_cols if config.select_cols else ["Year"] + dataset_list
+        self.fieldnames = fieldnames
+
+
+class JournalsData(OutputData):
+
+    """Data container for the journals data.
+
+    Generates and stores journals data based on the ScientometryData object,
+    containing the merged source scientometric data, and JournalCatalog object,
+    containing citation indicators for all journals.  The resulting data can be
+    written into a CSV file.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data --
+                   ScientometryData object
+    output_file -- name of the output file, a dict of filenames if data are
+                   supposed to be written to multiple output files
+    fieldnames -- list of field names in the output file header or a dict of
+                  such lists
+    data -- list of rows of the output data or a dict of such lists
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    source_aggregates = ['publication_counts_per_journal']
+    source_columns = ['ISSN']
+    streamable = True
+
+    def __init__(self, config, source_registry=None):
+        """Initialize JournalsData object and process given data.
+
+        Processes given 'scientometry_data' object in order to get table of
+        publicaton counts per journal that is inner-joined with the given
+        'journal_catalog' object using its ISSN index (counts of the different
+        forms of ISSN of the same journal are summed).  Prints warning if ISSN
+        was not found in the journal catalog.  Resulting dict is sorted by
+        combination of 'Papers' column (descending) and 'Source title' column
+        (ascending).  The resulting data table and field names are stored into
+        'data' and 'fieldnames' attributes respectively.  The list of field
+        names can be are optionally narrowed and/or reordered based on
+        'select_cols' attribute of the SectionConfig instance.
+
+        Positional arguments:
+        config -- configuration for the current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(JournalsData, self).__init__(config, source_registry)
+
+        with stage_profiler.stage('catalog', file=config.journal_catalog_file):
+            journal_catalog = self.source_registry.acquire_catalog(config.journal_catalog_file)
+        publication_count_dict = self.source_data.publication_counts_per_journal()
+        source_issn_list = list(publication_count_dict.keys())
+
+        # Different forms of ISSN of the same journal are joined with the same
+        # catalog record, hence the rows are associated by the record offset
+        row_dict = {}
+        for issn in source_issn_list:
+            offset = journal_catalog.find(issn)
+            if offset is None:
+                print("WARNING: ISSN", issn, "not found in", config.journal_catalog_file)
+            elif offset in row_dict:
+                row_dict[offset]['Papers'] += publication_count_dict[issn]
+            else:
+                row = journal_catalog.read_row(offset)
+                row['Papers'] = publication_count_dict[issn]
+                row_dict[offset] = row
+        data = list(row_dict.values())
+
+        if "Source title" in journal_catalog.fieldnames:
+            data.sort(key=itemgetter("Source title"))
+        data.sort(key=itemgetter("Papers"), reverse=True)
+        self.data = data
+
+        fieldnames = config.select_cols if config.select_cols else journal_catalog.fieldnames + ["Papers"]
+        self.fieldnames = fieldnames
+
+
+class ResultsData(OutputData):
+
+    """Data container for the results data.
+
+    Generates and stores results data based on the ScientometryData object,
+    containing the exported result data from the Publish or Perish.  Data for
+    individual source columns are divided according dataset groups and dataset
+    into a dictionary of output data, where each toplevel item contains set of
+    output data similar to those generated by PublicationsData and CitationsData
+    classes.  The resulting data can be written into a set of CSV files.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of ScientometryData objects or a sinlge
+                   ScientometryData object
+    output_file -- name of the output file, a dict of filenames if data are
+                   supposed to be written to multiple output files
+    fieldnames -- list of field names in the output file header or a dict of
+                  such lists
+    data -- list of rows of the output data or a dict of such lists
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    def __init__(self, config, source_registry=None):
+        """Initialize ResultsData object and process given data.
+
+        Processes given 'scientometry_data' object in order to extract values
+        into set of data tables, using the 'Query' column to determine name of
+        dataset group and dataset.  Each individual source data column
+        translates into a data matrix [dataset groups x datasets].  Selection of
+        the extracted columns can be narrowed using extract_cols attribute or
+        the SectionConfig object in the same way as the selection of the output
+        columns in all output data matrices can be narrowed/reordered by the
+        select_cols attribute.  Each individual output file is composed from the
+        section name and the name of the name of extracted column (in lowercase;
+        dashes instead of spaces).  The field names, output filenames as well as
+        data are stored as a dict, with the name of extracted column as key.
+
+        Positional arguments:
+        config -- configuration for the current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(ResultsData, self).__init__(config, source_registry)
+
+        results_dict = self.source_data.extract_results()
+
+        # Since results_dict is a two-dimensional dictionary, extraction of an
+        # arbitrary row requires a single step of two-level nested iteration.
+        all_cols = list(next(iter(next(iter(results_dict.values())).values())).keys())
+        dataset_list = list(next(iter(results_dict.values())).keys())
+
+        self.output_file, self.fieldnames, self.data = \
+            ResultsData.build_matrices(config, results_dict, all_cols, dataset_list)
+
+    @staticmethod
+    def build_matrices(config, results_dict, all_cols, dataset_list, key_fieldname="Group"):
+        """Divide results into data matrices [dataset groups x datasets].
+
+        Selection of the columns and dataset groups is narrowed by the
+        'extract_cols' and 'group_list' attributes of the SectionConfig
+        instance and the output columns are narrowed by its 'select_cols'
+        attribute (see ResultsData.__init__()).
+
+        Positional arguments:
+        config -- configuration for the current section
+        results_dict -- two dimensional dictionary of results rows
+                        [dataset group][dataset]
+        all_cols -- list of all available columns
+        dataset_list -- list of all datasets
+
+        Keyword arguments:
+        key_fieldname -- field name of the column of dataset groups (default:
+                         'Group')
+
+        Returns tuple of dicts (output file names, field names, data)
+        associated by the name of extracted column.
+
+        """
+        all_groups = sorted(results_dict.keys())
+
+        extract_col_list = config.extract_cols if config.extract_cols else all_cols
+        dataset_group_list = config.group_list if config.group_list else all_groups
+        file_prefix = os.path.splitext(config.output_data_file)[0] + "-"
+
+        output_file_dict = {}
+        fieldnames_dict = {}
+        data_dict = {}
+        for col in extract_col_list:
+            output_file_dict[col] = file_prefix + col.replace(" ", "-").lower() + ".csv"
+            fieldnames_dict[col] = config.select_cols if config.select_cols else [key_fieldname] + dataset_list
+            data_dict[col] = []
+            for dataset_group in dataset_group_list:
+                row = {k: x[col] for k, x in results_dict[dataset_group].items()}
+                row[key_fieldname] = dataset_group
+                data_dict[col].append(row)
+
+        return output_file_dict, fieldnames_dict, data_dict
+
+
+class IndicatorsData(OutputData):
+
+    """Data container for the citation indicators.
+
+    Computes the citation indicators of the h-index family (see
+    citation_indicators()) directly from the source data of the citation
+    registers.  The indicators are divided into the same set of data matrices
+    [dataset groups x datasets] as the ones generated by ResultsData class
+    from the results exported from Publish or Perish.  The resulting data can
+    be written into a set of CSV files.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of ScientometryData objects
+    output_file -- a dict of filenames associated by the indicator names
+    fieldnames -- a dict of lists of field names in the output file headers
+    data -- a dict of lists of rows of the output data
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    source_columns = ['Year', 'Cites', 'Authors']
+
+    def __init__(self, config, source_registry=None):
+        """Initialize IndicatorsData object and process given data.
+
+        Collects publications of each dataset group and dataset and computes
+        their citation indicators.  If the 'group_col' attribute of the
+        SectionConfig instance is defined, dataset groups are given by the
+        values of this column (split by 'group_separator' if defined, e.g. for
+        'Authors' column) and datasets are given by the keys of the source
+        data dict.  Otherwise the keys of the source data dict define both
+        dataset group and dataset in the same '{dataset_group}-{dataset}'
+        format as the 'Query' column of the results data file.  Only
+        publications from the years given by the 'year_list' attribute are
+        processed (if defined) and the age of the publications is related to
+        the last of these years (or to the current year).  The output files,
+        field names and data are generated by ResultsData.build_matrices().
+
+        Positional arguments:
+        config -- configuration for the current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(IndicatorsData, self).__init__(config, source_registry)
+
+        current_year = int(config.year_list[-1]) if config.year_list else datetime.date.today().year
+        year_set = frozenset(config.year_list) if config.year_list else None
+
+        paper_list_dict = {}
+        dataset_set = set()
+        for key, source_data in self.source_data.items():
+            if config.group_col:
+                dataset_group, dataset = None, key
+            elif "-" in key:
+                dataset_group, dataset = [x.strip() for x in key.split("-")[:2]]
+            else:
+                dataset_group, dataset = "All", key
+            dataset_set.add(dataset)
+
+            for row in source_data.data:
+                year = row['Year']
+                if year_set and year not in year_set:
+                    continue
+                author_count = len([x for x in (row.get('Authors') or "").split(",") if x.strip()])
+                paper = (int(row['Cites']), int(year) if (year or "").isdigit() else current_year, author_count or 1)
+
+                if config.group_col:
+                    value = row.get(config.group_col) or ""
+                    values = value.split(config.group_separator) if config.group_separator else [value]
+                    dataset_group_set = set(x.strip() for x in values if x.strip())
+                else:
+                    dataset_group_set = [dataset_group]
+                for x in dataset_group_set:
+                    paper_list_dict.setdefault((x, dataset), []).append(paper)
+
+        dataset_list = sorted(dataset_set)
+        dataset_group_list = config.group_list if config.group_list else \
+            sorted(set(x for x, dataset in paper_list_dict))
+        results_dict = {}
+        for dataset_group in dataset_group_list:
+            results_dict[dataset_group] = {}
+            for dataset in dataset_list:
+                paper_list = paper_list_dict.get((dataset_group, dataset), [])
+                results_dict[dataset_group][dataset] = citation_indicators(paper_list, current_year)
+
+        self.output_file, self.fieldnames, self.data = \
+            ResultsData.build_matrices(config, results_dict, indicator_names, dataset_list)
+
+    @classmethod
+    def required_columns(cls, config):
+        """Return columns of the source data required by given section.
+
+        The column defining the groups ('group_col') is required as well.
+
+        """
+        columns = super(IndicatorsData, cls).required_columns(config)
+        if config.group_col:
+            columns.add(config.group_col)
+
+        return columns
+
+
+class SqlData(OutputData):
+
+    """Data container for the results of SQL query.
+
+    Generates and stores output data by an arbitrary SQL query over the source
+    data loaded into the SourceDatabase (the 'sqlite' storage engine is always
+    used).  The resulting data can be written into a CSV file.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of SqliteScientometryData objects or a single
+                   SqliteScientometryData object
+    output_file -- name of the output file
+    fieldnames -- list of field names in the output file header
+    data -- list of rows of the output data
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    storage = "sqlite"
+
+    def __init__(self, config, source_registry=None):
+        """Initialize SqlData object and process given data.
+
+        Executes SQL query defined by the 'query' attribute of the
+        SectionConfig instance.  If the source data are defined by a dict, the
+        table of each source data file is available under the name of its
+        dataset, otherwise the table is available under the name 'source'.
+        The journal catalog (if defined) is available under the name
+        'journals'.  The field names are taken from the columns of the query
+        result, the list of field names can be optionally narrowed and/or
+        reordered based on 'select_cols' attribute of the SectionConfig
+        instance.
+
+        Positional arguments:
+        config -- configuration for the current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(SqlData, self).__init__(config, source_registry)
+
+        if not config.query:
+            raise ValueError("Section " + config.section_name + " doesn't define 'query'")
+
+        if type(self.source_data) is dict:
+            table_dict = {k: x.table_name for k, x in self.source_data.items()}
+            database = next(iter(self.source_data.values())).database
+        else:
+            table_dict = {'source': self.source_data.table_name}
+            database = self.source_data.database
+        if config.journal_catalog_file:
+            table_dict['journals'] = database.load(config.journal_catalog_file)
+
+        fieldnames, data = database.query(config.query, table_dict)
+        self.data = data
+
+        self.fieldnames = config.select_cols if config.select_cols else fieldnames
+
+
+class MergedData(OutputData):
+
+    """Data container for the merged data.
+
+    Generates and stores deduplicated union of the source data extracted from
+    multiple citation registers (see DeduplicationIndex).  The resulting data
+    can be written into a CSV file that can serve as the source data file for
+    the JournalsData class.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of ScientometryData objects
+    output_file -- name of the output file
+    fieldnames -- list of field names in the output file header
+    data -- list of rows of the output data
+    match_stats -- dict of match statistics associated by dataset
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    def __init__(self, config, source_registry=None):
+        """Initialize MergedData object and process given data.
+
+        Adds rows of the datasets into DeduplicationIndex in the order given by
+        the 'priority_list' attribute of the SectionConfig instance (datasets
+        are sorted by name if the priority isn't defined).  Values of the
+        matched rows are taken from the dataset of the highest priority, the
+        empty values are filled from the other datasets.  The list of datasets
+        each row was found in is stored in the 'Datasets' column.  The match
+        statistics are printed and saved into the 'match_stats' attribute.
+        The rows are sorted by 'Source' and 'Title' columns (case insensitive).
+        The field names are taken from the header of the source data file of
+        the highest priority, the list of field names can be optionally
+        narrowed and/or reordered based on 'select_cols' attribute of the
+        SectionConfig instance.
+
+        Positional arguments:
+        config -- configuration for the current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(MergedData, self).__init__(config, source_registry)
+
+        dataset_list = config.priority_list if config.priority_list else sorted(self.source_data.keys())
+
+        deduplication_index = DeduplicationIndex()
+        for dataset in dataset_list:
+            for row in self.source_data[dataset].data:
+                deduplication_index.add(row, dataset)
+
+        data = []
+        for record in deduplication_index.record_list:
+            row = record['row']
+            row['Datasets'] = ", ".join(record['datasets'])
+            data.append(row)
+        data.sort(key=lambda row: ((row.get('Source') or "").lower(), (row.get('Title') or "").lower()))
+        self.data = data
+
+        self.match_stats = deduplication_index.stats_dict
+        for dataset in dataset_list:
+            stats = self.match_stats.get(dataset, {'records': 0, 'doi': 0, 'title': 0, 'new': 0})
+            print("Merging", dataset, "...", stats['records'], "records,", stats['doi'], "matched by DOI,", \
+                  stats['title'], "matched by title,", stats['new'], "new")
+
+        if config.select_cols:
+            fieldnames = config.select_cols
+        else:
+            # The 'utf-8-sig' encoding is required, because some input CSV
+            # files contain CSV preamble (for UTF-8) that has to be ignored.
+            with open(config.source_data_file[dataset_list[0]], 'r', encoding='utf-8-sig', newline='') as csv_file:
+                fieldnames = next(csv.reader(csv_file)) + ["Datasets"]
+        self.fieldnames = fieldnames
+
+
+class AuthorsData(OutputData):
+
+    """Data container for the authors data.
+
+    Generates and stores tables of publication and citation counts per author
+    and year based on the AuthorIndex of the source data.  The resulting data
+    can be written into a set of CSV files.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of ScientometryData objects or a single
+                   ScientometryData object
+    output_file -- a dict of filenames associated by the table names
+    fieldnames -- a dict of lists of field names in the output file headers
+    data -- a dict of lists of rows of the output data
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    source_columns = ['Year', 'Cites', 'Authors']
+    table_names = ['Papers', 'Citations']
+
+    def __init__(self, config, source_registry=None):
+        """Initialize AuthorsData object and process given data.
+
+        Generates tables [authors x years] of publication counts ('Papers')
+        and citation counts ('Citations') for each source data file.  Selection
+        of the tables can be narrowed using 'extract_cols' attribute of the
+        SectionConfig instance.  Name variants are mapped onto the authors by
+        the author alias file ('alias_file' attribute), the list of authors
+        can be narrowed by the 'group_list' attribute (all authors sorted by
+        name as default) and the list of years by the 'year_list' attribute
+        (all years found in the data as default).  The 'Total' column contains
+        the sum over the years.  Each individual output file is composed from
+        the section name, the dataset name (if source data are defined by a
+        dict) and the name of the table (in lowercase).  The field names,
+        output filenames as well as data are stored as a dict, with the
+        '{dataset}-{table}' (or '{table}') as key.
+
+        Positional arguments:
+        config -- configuration for the current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(AuthorsData, self).__init__(config, source_registry)
+
+        alias_dict = AuthorIndex.load_aliases(config.alias_file) if config.alias_file else {}
+        if type(self.source_data) is dict:
+            source_data_dict = self.source_data
+        else:
+            source_data_dict = {None: self.source_data}
+        extract_col_list = config.extract_cols if config.extract_cols else self.table_names
+        for col in extract_col_list:
+            if col not in self.table_names:
+                raise ValueError("Unknown table '" + col + "'")
+        file_prefix = os.path.splitext(config.output_data_file)[0] + "-"
+
+        output_file_dict = {}
+        fieldnames_dict = {}
+        data_dict = {}
+        for dataset, source_data in source_data_dict.items():
+            author_index = source_data.author_index()
+            author_row_dict = author_index.author_rows(alias_dict)
+            author_list = config.group_list if config.group_list else sorted(author_row_dict.keys())
+            year_list = config.year_list if config.year_list else sorted(set(author_index.year_list) - set([None]))
+
+            table_dict = {x: [] for x in self.table_names}
+            for author in author_list:
+                publication_count_dict, citation_count_dict = \
+                    author_index.counts_per_year(author_row_dict.get(author, []))
+                for col, count_dict in [('Papers', publication_count_dict), ('Citations', citation_count_dict)]:
+                    row = {x: count_dict.get(x, 0) for x in year_list}
+                    row['Author'] = author
+                    row['Total'] = sum(row[x] for x in year_list)
+                    table_dict[col].append(row)
+
+            for col in extract_col_list:
+                key = dataset + "-" + col if dataset else col
+                output_file_dict[key] = file_prefix + key.replace(" ", "-").lower() + ".csv"
+                fieldnames_dict[key] = config.select_cols if config.select_cols else ["Author"] + year_list + ["Total"]
+                data_dict[key] = table_dict[col]
+
+        self.output_file = output_file_dict
+        self.fieldnames = fieldnames_dict
+        self.data = data_dict
+
+
+class SnapshotsData(OutputData):
+
+    """Data container for the time series of the source data snapshots.
+
+    Processes all dated snapshots of the source data files (all files matching
+    the '{date}' pattern, see DirectoryIndex) instead of the latest one only.
+    Consecutive snapshots are compared record by record--records are
+    identified by DOI, or by the normalised title and year if DOI is missing
+    (see DeduplicationIndex)--so that the counts of each snapshot are derived
+    from the counts of the previous one by processing the changed records
+    only.  The counts of the processed snapshots are kept in the snapshot
+    state file in the output directory ('state_file'), so that the following
+    runs process only new or changed snapshots.  The resulting data can be
+    written into a set of CSV files.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of ScientometryData objects or a single
+                   ScientometryData object (the latest snapshots)
+    state_file -- snapshot state file name
+    output_file -- a dict of filenames associated by the table names
+    fieldnames -- a dict of lists of field names in the output file headers
+    data -- a dict of lists of rows of the output data
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    source_columns = ['DOI', 'Title', 'Year', 'Cites']
+    snapshots = True
+    table_names = ['Papers', 'Citations', 'Growth']
+
+    def __init__(self, config, source_registry=None):
+        """Initialize SnapshotsData object and process given data.
+
+        Generates tables [snapshots x years] of publication counts ('Papers'),
+        citation counts ('Citations') and increments of the citation counts
+        since the previous snapshot ('Growth', empty for the first snapshot)
+        for each source data file pattern.  Snapshots are labelled by the
+        string matched by the '{date}' meta variable and sorted from the
+        oldest to the latest one.  Selection of the tables can be narrowed
+        using 'extract_cols' attribute of the SectionConfig instance, the list
+        of years by the 'year_list' attribute (all years found in the data as
+        default).  The 'Total' column contains the sum over the years.  Each
+        individual output file is composed from the section name, the dataset
+        name (if source data are defined by a dict) and the name of the table
+        (in lowercase).  The field names, output filenames as well as data are
+        stored as a dict, with the '{dataset}-{table}' (or '{table}') as key.
+
+        Positional arguments:
+        config -- configuration for the current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(SnapshotsData, self).__init__(config, source_registry)
+
+        if type(config.source_snapshot_files) is dict:
+            snapshot_file_dict = config.source_snapshot_files
+            source_data_dict = self.source_data
+        else:
+            snapshot_file_dict = {None: config.source_snapshot_files}
+            source_data_dict = {None: self.source_data}
+        extract_col_list = config.extract_cols if config.extract_cols else self.table_names
+        for col in extract_col_list:
+            if col not in self.table_names:
+                raise ValueError("Unknown table '" + col + "'")
+        file_prefix = os.path.splitext(config.output_data_file)[0] + "-"
+
+        self.state_file = os.path.join(config.output_directory or "", "." + config.section_name + "-snapshots.json")
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as json_file:
+                state_dict = json.load(json_file)
+        else:
+            state_dict = {}
+
+        output_file_dict = {}
+        fieldnames_dict = {}
+        data_dict = {}
+        for dataset, snapshot_list in snapshot_file_dict.items():
+            recorded_dict = {x['file']: x for x in state_dict.get(dataset or "", [])}
+            entry_list = self.__process_snapshots(snapshot_list, recorded_dict, source_data_dict[dataset])
+            state_dict[dataset or ""] = entry_list
+            year_list = config.year_list if config.year_list else \
+                sorted(set(x for entry in entry_list for x in entry['papers']) - set([""]))
+
+            table_dict = {x: [] for x in self.table_names}
+            previous_citations = None
+            for entry in entry_list:
+                citations = {x: entry['citations'].get(x, 0) for x in year_list}
+                if previous_citations is None:
+                    growth = {x: None for x in year_list}
+                else:
+                    growth = {x: citations[x] - previous_citations[x] for x in year_list}
+                previous_citations = citations
+                for col, count_dict in [('Papers', entry['papers']), ('Citations', citations), ('Growth', growth)]:
+                    row = {x: count_dict.get(x, 0) for x in year_list}
+                    row['Snapshot'] = entry['snapshot']
+                    row['Total'] = None if None in row.values() else sum(row[x] for x in year_list)
+                    table_dict[col].append(row)
+
+            for col in extract_col_list:
+                key = dataset + "-" + col if dataset else col
+                output_file_dict[key] = file_prefix + key.replace(" ", "-").lower() + ".csv"
+                fieldnames_dict[key] = config.select_cols if config.select_cols else ["Snapshot"] + year_list + ["Total"]
+                data_dict[key] = table_dict[col]
+
+        # The state is only a cache of the counts, failure to save it is not
+        # an error
+        try:
+            with open(self.state_file, 'w') as json_file:
+                json.dump(state_dict, json_file, indent=2, separators=(',', ': '), sort_keys=True)
+                json_file.write("\n")
+        except IOError:
+            pass
+
+        self.output_file = output_file_dict
+        self.fieldnames = fieldnames_dict
+        self.data = data_dict
+
+    def __process_snapshots(self, snapshot_list, recorded_dict, latest_data):
+        """Compute counts of the snapshots of a single source data pattern.
+
+        Snapshots recorded in the state (with the same size, modification time
+        and filter) are not processed again.  The counts of other snapshots are
+        derived from the counts of the previous snapshot by subtracting the
+        records that have disappeared or changed and adding the records that
+        have appeared or changed.
+
+        Positional arguments:
+        snapshot_list -- list of (date string, file name) tuples sorted from
+                         the oldest snapshot
+        recorded_dict -- dict of recorded state entries associated by file
+                         name
+        latest_data -- ScientometryData object of the latest snapshot
+
+        Returns list of state entries (dicts with 'file', 'snapshot', 'size',
+        'mtime', 'filter', 'papers' and 'citations' keys, the counts are dicts
+        associated by years).
+
+        """
+        entry_list = []
+        previous_records = None
+        processed_count = 0
+        row_filter = self.config.row_filter.signature if self.config.row_filter else None
+        for index, (date_string, data_file) in enumerate(snapshot_list):
+            stat = os.stat(data_file)
+            recorded = recorded_dict.get(data_file)
+            if recorded and recorded['size'] == stat.st_size and recorded['mtime'] == stat.st_mtime and \
+               recorded.get('filter') == row_filter:
+                entry_list.append(recorded)
+                previous_records = None
+                continue
+
+            records = self.__snapshot_records(data_file, latest_data)
+            if index == 0:
+                previous_records = frozenset()
+                papers, citations = {}, {}
+            else:
+                if previous_records is None:
+                    previous_records = self.__snapshot_records(snapshot_list[index - 1][1], latest_data)
+                papers, citations = dict(entry_list[-1]['papers']), dict(entry_list[-1]['citations'])
+            for key, ordinal, year, cites in previous_records - records:
+                papers[year] -= 1
+                citations[year] -= cites
+            for key, ordinal, year, cites in records - previous_records:
+                papers[year] = papers.get(year, 0) + 1
+                citations[year] = citations.get(year, 0) + cites
+            for year in [x for x, count in papers.items() if not count]:
+                del papers[year], citations[year]
+
+            entry_list.append({'file': data_file, 'snapshot': date_string, 'size': stat.st_size,
+                               'mtime': stat.st_mtime, 'filter': row_filter, 'papers': papers,
+                               'citations': citations})
+            previous_records = records
+            processed_count += 1
+
+        if snapshot_list:
+            print("Processed", processed_count, "of", len(snapshot_list), "snapshots of", snapshot_list[-1][1], "...")
+        return entry_list
+
+    def __snapshot_records(self, data_file, latest_data):
+        """Return set of records of a snapshot.
+
+        Positional arguments:
+        data_file -- snapshot file name
+        latest_data -- ScientometryData object of the latest snapshot (reused
+                       if it is the requested snapshot)
+
+        Returns frozenset of (key, ordinal, year, citations) tuples, the
+        ordinal distinguishes records with the same key within the snapshot.
+
+        """
+        if os.path.realpath(data_file) == os.path.realpath(latest_data.data_file):
+            rows = latest_data.data
+        else:
+            rows = ScientometryData(data_file, self.source_registry.source_cache, self.source_columns,
+                                    self.config.row_filter).data
+
+        ordinal_dict = {}
+        record_list = []
+        for row in rows:
+            year = row['Year'] or ""
+            doi = DeduplicationIndex.normalize_doi(row.get('DOI'))
+            key = doi if doi else (DeduplicationIndex.normalize_title(row.get('Title')), year)
+            ordinal = ordinal_dict[key] = ordinal_dict.get(key, -1) + 1
+            record_list.append((key, ordinal, year, int(row['Cites'])))
+
+        return frozenset(record_list)
+
+
+class PivotData(OutputData):
+
+    """Data container for generic pivot tables of the source data.
+
+    Aggregates the source data into data matrices [row keys x column keys],
+    one matrix per measure.  The row and column keys are given by the values
+    of the 'row_key' and 'column_key' columns (or by the datasets--the keys
+    of the source data dict--if the key is '{dataset}').  Each measure
+    applies one of the aggregations to the rows of each cell: 'count' (number
+    of rows, or of non-empty values of a column), 'sum' and 'mean' (of the
+    numeric values of a column) and 'distinct' (number of distinct non-empty
+    values of a column).  All measures are computed within a single pass over
+    the source data and the matrices are written in the same set of output
+    files as the ones generated by ResultsData class.  With the default keys
+    (years x datasets), the 'count' and 'sum(Cites)' measures give the same
+    data as PublicationsData and CitationsData classes.
+
+    Attributes:
+    config -- SectionConfig object containing current section configuration
+    source_data -- a dict of ScientometryData objects or a sinlge
+                   ScientometryData object
+    output_file -- a dict of filenames associated by the measure names
+    fieldnames -- a dict of lists of field names in the output file headers
+    data -- a dict of lists of rows of the output data
+
+    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
+    combination with csv.DictWriter.
+
+    """
+
+    dataset_key = "{dataset}"
+    default_row_key = "Year"
+    default_column_key = dataset_key
+    default_measure_list = [("Papers", 'count', None)]
+
+    def __init__(self, config, source_registry=None):
+        """Initialize PivotData object and process given data.
+
+        Assigns every row of the source data to the cell given by its row and
+        column key and accumulates all measures of the cell.  Values of the
+        row key are split by 'group_separator' (if defined), so that a row
+        with several values is assigned to several rows of the matrices (e.g.
+        'Authors' split by ',').  If the 'year_list' attribute of the
+        SectionConfig instance is defined, only publications from these years
+        are processed.  Rows of the matrices are given by the 'group_list'
+        attribute (if defined), by the 'year_list' attribute if the row key
+        is 'Year', or by all row keys found in the data otherwise.  Columns of
+        the matrices are the datasets (in the order of the configuration) or
+        all column keys found in the data.  Empty cells are 0 ('count', 'sum'
+        and 'distinct') or empty ('mean').  Means and sums of non-integer
+        values are rounded to two decimal places.  The output files, field
+        names and data are generated by ResultsData.build_matrices().
+
+        Positional arguments:
+        config -- configuration for the current section
+
+        Keyword arguments:
+        source_registry -- SourceDataRegistry object (default: None)
+
+        """
+        super(PivotData, self).__init__(config, source_registry)
+
+        row_key, column_key, measure_list = PivotData.pivot(config)
+        year_set = frozenset(config.year_list) if config.year_list else None
+        if config.group_list:
+            row_list = config.group_list
+        elif row_key == 'Year' and config.year_list:
+            row_list = config.year_list
+        else:
+            row_list = None
+        # Groups given as numbers in the configuration match the text values
+        row_set = frozenset(str(x) for x in row_list) if row_list is not None else None
+
+        source_data_dict = self.source_data if type(self.source_data) is dict else {"All": self.source_data}
+        cell_dict = {}
+        for dataset, source_data in source_data_dict.items():
+            for row in source_data.data:
+                if year_set and row.get('Year') not in year_set:
+                    continue
+                column = dataset if column_key == PivotData.dataset_key else row.get(column_key) or ""
+                value = dataset if row_key == PivotData.dataset_key else row.get(row_key) or ""
+                if config.group_separator:
+                    key_list = set(x.strip() for x in value.split(config.group_separator) if x.strip())
+                else:
+                    key_list = [value]
+                for key in key_list:
+                    if row_set is not None and key not in row_set:
+                        continue
+                    cell = cell_dict.get((key, column))
+                    if cell is None:
+                        cell = cell_dict[(key, column)] = PivotData.empty_cell(measure_list)
+                    PivotData.accumulate(cell, measure_list, row)
+
+        if column_key == PivotData.dataset_key:
+            column_list = list(source_data_dict.keys())
+        else:
+            column_list = sorted(set(x for key, x in cell_dict))
+        if row_list is None:
+            row_list = sorted(set(key for key, x in cell_dict))
+
+        results_dict = {}
+        for key in row_list:
+            results_dict[key] = {}
+            for column in column_list:
+                cell = cell_dict.get((str(key), column)) or PivotData.empty_cell(measure_list)
+                results_dict[key][column] = PivotData.cell_values(cell, measure_list)
+
+        key_fieldname = "Dataset" if row_key == PivotData.dataset_key else row_key
+        self.output_file, self.fieldnames, self.data = \
+            ResultsData.build_matrices(config, results_dict, [x[0] for x in measure_list], column_list,
+                                       key_fieldname)
+
+    @staticmethod
+    def pivot(config):
+        """Return (row key, column key, list of measures) of given section.
+
+        Keys and measures not defined by the section configuration are set to
+        the defaults (years x datasets, number of publications).
+
+        """
+        return (config.row_key or PivotData.default_row_key,
+                config.column_key or PivotData.default_column_key,
+                config.measure_list or PivotData.default_measure_list)
+
+    @staticmethod
+    def empty_cell(measure_list):
+        """Return list of the initial accumulators of the measures."""
+        return [set() if x[1] == 'distinct' else [0, 0] for x in measure_list]
+
+    @staticmethod
+    def accumulate(cell, measure_list, row):
+        """Accumulate values of a single row into the accumulators of a cell.
+
+        The 'count', 'sum' and 'mean' accumulators are [total, count] lists,
+        the 'distinct' accumulator is a set of values.  Missing and empty
+        values are skipped, as well as non-numeric values of the 'sum' and
+        'mean' measures (they are not counted into the mean either).
+
+        Positional arguments:
+        cell -- list of the accumulators of the measures
+        measure_list -- list of (name, aggregation, column) tuples
+        row -- source data row
+
+        """
+        for accumulator, (name, aggregation, column) in zip(cell, measure_list):
+            if column is None:
+                accumulator[1] += 1
+                continue
+            value = row.get(column)
+            if value is None or value == "":
+                continue
+            if aggregation == 'distinct':
+                accumulator.add(value)
+            elif aggregation == 'count':
+                accumulator[1] += 1
+            else:
+                try:
+                    value = int(value)
+                except ValueError:
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        continue
+                    if not math.isfinite(value):
+                        continue
+                accumulator[0] += value
+                accumulator[1] += 1
+
+    @staticmethod
+    def cell_values(cell, measure_list):
+        """Return dict of the measure values of a cell associated by names."""
+        values = {}
+        for accumulator, (name, aggregation, column) in zip(cell, measure_list):
+            if aggregation == 'distinct':
+                value = len(accumulator)
+            elif aggregation == 'count':
+                value = accumulator[1]
+            elif aggregation == 'mean':
+                value = round_indicator(float(accumulator[0]) / accumulator[1]) if accumulator[1] else None
+            else:
+                value = accumulator[0] if type(accumulator[0]) is int else round_indicator(accumulator[0])
+            values[name] = value
+
+        return values
+
+    @classmethod
+    def required_columns(cls, config):
+        """Return columns of the source data required by given section.
+
+        The key columns, the columns of the measures and 'Year' (if the
+        years are narrowed) are required.
 
         """
-        self.config = config
+        row_key, column_key, measure_list = PivotData.pivot(config)
+        columns = set(x[2] for x in measure_list if x[2])
+        columns.update(x for x in (row_key, column_key) if x != PivotData.dataset_key)
+        if config.year_list:
+            columns.add('Year')
 
-        if type(config.source_data_file) is dict:
-            source_data = {}
-            for key, data_file in config.source_data_file.iteritems():
-                source_data[key] = ScientometryData(data_file)
+        return columns
+
+
+class OutputWriter(object):
+
+    """Writer of the output data running in a background thread.
+
+    Output files of a section are written by a single background thread
+    while the following sections are being processed, so that the disk I/O
+    overlaps the parsing and computation.  At most 'max_pending' sections
+    wait for being written, so that the output data of many sections are not
+    kept in memory at once.  Names of the output files are printed when the
+    section is submitted, so that they end up in the output of the section.
+    If the writer is not running in the background (e.g. when the stages are
+    profiled), the output files are written immediately.
+
+    Attributes:
+    executor -- concurrent.futures.ThreadPoolExecutor of the writer thread
+                (None = the files are written immediately)
+    max_pending -- maximum number of sections waiting for being written
+    pending_list -- list of Future objects of the submitted sections
+
+    """
+
+    def __init__(self, background=True, max_pending=2):
+        """Initialize OutputWriter object.
+
+        Keyword arguments:
+        background -- write the files in a background thread (default: True)
+        max_pending -- maximum number of sections waiting for being written
+                       (default: 2)
+
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(1) if background else None
+        self.max_pending = max_pending
+        self.pending_list = []
+
+    def submit(self, output_data, verbose=True):
+        """Submit output data of a section for writing.
+
+        Waits until there are less than 'max_pending' sections waiting for
+        being written.
+
+        Positional arguments:
+        output_data -- OutputData object
+
+        Keyword arguments:
+        verbose -- print names of the written files (default: True)
+
+        Returns concurrent.futures.Future object of the list of written output
+        files (see OutputData.write()).
+
+        """
+        if not self.executor:
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(output_data.write(verbose))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        if verbose:
+            for data_file, fieldnames, data in output_data.output_list():
+                print("Generating", data_file, "...")
+        self.pending_list = [x for x in self.pending_list if not x.done()]
+        while len(self.pending_list) >= self.max_pending:
+            # Errors are reported by the owners of the futures
+            self.pending_list.pop(0).exception()
+        future = self.executor.submit(output_data.write, False)
+        self.pending_list.append(future)
+
+        return future
+
+    def close(self):
+        """Wait until all submitted sections are written and stop the thread."""
+        if self.executor:
+            self.executor.shutdown(wait=True)
+        self.pending_list = []
+
+
+class QueryService(object):
+
+    """Query service answering requests for the output data of the sections.
+
+    Loads the sections from the configuration file once and computes the
+    output data of a section on request, optionally with 'years', 'groups'
+    and 'select' keys of the section configuration overridden.  The parsed
+    source data are kept in a SourceDataRegistry object, computed responses
+    are kept in a bounded LRU cache ('response_dict').  Before each request
+    the '{date}' patterns are evaluated again and the input files are checked
+    (the configuration file is parsed again only if it has changed)--if any
+    of them has changed, the changed source data are dropped and the cache is
+    cleared.
+
+    Attributes:
+    config_file -- configuration file name
+    selected_sections -- list of served sections (None = all sections)
+    cache_size -- maximum number of cached responses
+    source_registry -- SourceDataRegistry object keeping the parsed data
+    response_dict -- ordered dict of JSON encoded responses associated by
+                     (section name, overrides) tuples, least recently used
+                     first
+    hit_count -- number of requests answered from the cache
+    miss_count -- number of computed responses
+
+    """
+
+    override_keys = ['years', 'groups', 'select']
+    years_pattern = re.compile(r"^\d{4}-\d{4}$")
+
+    def __init__(self, config_file, selected_sections=None, cache_size=128, parse_jobs=1, source_cache=None,
+                 source_database=None):
+        """Initialize QueryService object.
+
+        Positional arguments:
+        config_file -- configuration file name
+
+        Keyword arguments:
+        selected_sections -- list of served sections (default: None = all
+                             sections)
+        cache_size -- maximum number of cached responses (default: 128)
+        parse_jobs -- number of chunks of the streamed source data files
+                      processed in parallel (default: 1)
+        source_cache -- SourceCache object (default: None)
+        source_database -- SourceDatabase object (default: None = in-memory
+                           database)
+
+        """
+        self.config_file = config_file
+        self.selected_sections = selected_sections
+        self.cache_size = cache_size
+        self.response_dict = collections.OrderedDict()
+        self.hit_count = 0
+        self.miss_count = 0
+
+        self.__config_stat = os.stat(config_file)
+        self.__config_file_parser = ConfigFileParser(config_file)
+        section_config_list = self.__config_file_parser.select_sections(selected_sections)
+        self.__input_state = input_state(config_file, section_config_list)
+        self.source_registry = SourceDataRegistry(section_config_list, parse_jobs, source_cache, source_database,
+                                                  keep_data=True)
+
+    def refresh(self):
+        """Drop cached responses and source data if the inputs have changed."""
+        stat = os.stat(self.config_file)
+        if (stat.st_size, stat.st_mtime) != (self.__config_stat.st_size, self.__config_stat.st_mtime):
+            self.__config_file_parser = ConfigFileParser(self.config_file)
+            self.__config_stat = stat
         else:
-            source_data = ScientometryData(config.source_data_file)
-        self.source_data = source_data
+            self.__config_file_parser.refresh()
 
-        self.output_file = config.output_data_file
-        self.fieldnames = None
-        self.data = None
+        section_config_list = self.__config_file_parser.select_sections(self.selected_sections)
+        state = input_state(self.config_file, section_config_list)
+        if state != self.__input_state:
+            self.__input_state = state
+            self.source_registry.plan(section_config_list)
+            self.response_dict.clear()
 
+    def sections(self):
+        """Return list of dicts describing the served sections."""
+        self.refresh()
+        section_config_list = self.__config_file_parser.select_sections(self.selected_sections)
+        return [{'name': x.section_name, 'class': x.output_data_class}
+                for x in sorted(section_config_list, key=lambda x: x.section_name)]
 
-    def write(self):
-        """Write output data into an output file(s).
+    def query(self, section_name, override_dict=None):
+        """Return output data of given section.
 
-        Depending on the actual character of the output data this method calls
-        OutputData.write_csv() to write either single output file or a set of
-        output files.
+        Positional arguments:
+        section_name -- name of the section
+
+        Keyword arguments:
+        override_dict -- dict of overridden configuration values associated by
+                         configuration keys (default: None), 'years' is a
+                         'YYYY-YYYY' range, 'groups' and 'select' are lists
+
+        Returns JSON encoded dict with 'section', 'fieldnames' and 'data'
+        (list of row dicts) keys, or with 'section' and 'tables' (dict of such
+        dicts associated by output keys) keys if the section produces more
+        output files.  Returns None if the section doesn't exist.
 
         """
-        if type(self.output_file) is dict:
-            for key, data_file in self.output_file.iteritems():
-                OutputData.__write_csv(data_file, self.fieldnames[key], self.data[key])
+        override_dict = override_dict or {}
+        QueryService.check_overrides(override_dict)
+
+        self.refresh()
+        if self.selected_sections and section_name not in self.selected_sections:
+            return None
+        section_config = self.__config_file_parser.section_config_dict.get(section_name)
+        if not section_config:
+            return None
+
+        key = (section_name, json.dumps(override_dict, sort_keys=True))
+        if key in self.response_dict:
+            self.hit_count += 1
+            response = self.response_dict.pop(key)
+            self.response_dict[key] = response
+            return response
+
+        self.miss_count += 1
+        section_config = SectionConfig(section_name, dict(section_config.config_dict, **override_dict),
+                                       self.__config_file_parser.directory_index)
+        output_data_class = eval(section_config.output_data_class)
+        output_data = output_data_class(section_config, self.source_registry)
+
+        def table(fieldnames, data):
+            return {'fieldnames': fieldnames,
+                    'data': [{x: row.get(x) for x in fieldnames} for row in data]}
+
+        if type(output_data.output_file) is dict:
+            response = {'section': section_name,
+                        'tables': {x: table(output_data.fieldnames[x], output_data.data[x])
+                                   for x in output_data.output_file}}
         else:
-            OutputData.__write_csv(self.output_file, self.fieldnames, self.data)
+            response = dict(table(output_data.fieldnames, output_data.data), section=section_name)
+        response = json.dumps(response, sort_keys=True)
+
+        self.response_dict[key] = response
+        while len(self.response_dict) > self.cache_size:
+            self.response_dict.popitem(last=False)
+
+        return response
 
     @staticmethod
-    def __write_csv(data_file, fieldnames, data, verbose=True):
-        """Write data into CSV file
+    def check_overrides(override_dict):
+        """Check overridden configuration values.
+
+        Positional arguments:
+        override_dict -- dict of overridden configuration values associated by
+                         configuration keys
 
-        Uses unicodecsv.DictWriter to write output CSV file with header based on
-        the data stored in the 'data' and 'fieldnames' attributes.
+        Raises ValueError if any of the keys or values is not valid.
 
         """
-        with open(data_file, 'w') as csv_file:
-            if verbose:
-                print "Generating", data_file, "..."
-            # The 'extrasaction' parameter has to be set to 'ignore' because we
-            # might want to narrow selection of fields by 'fieldnames'.
-            csv_dict_writer = unicodecsv.DictWriter(csv_file, fieldnames=fieldnames, extrasaction='ignore', encoding="utf-8")
-            csv_dict_writer.writeheader()
-            for row in data:
-                csv_dict_writer.writerow(row)
+        for key, value in override_dict.items():
+            if key not in QueryService.override_keys:
+                raise ValueError("Unknown override '" + key + "'")
+            if key == 'years' and not QueryService.years_pattern.match(value):
+                raise ValueError("Invalid year range '" + value + "'")
 
+    def stats(self):
+        """Return dict of the cache statistics."""
+        return {'cached': len(self.response_dict), 'cache_size': self.cache_size,
+                'hits': self.hit_count, 'misses': self.miss_count,
+                'source_data': len(self.source_registry.source_data_dict)}
 
-class PublicationsData(OutputData):
 
-    """Data container for the publications data.
+class QueryRequestHandler(http.server.BaseHTTPRequestHandler):
 
-    Generates and stores publications data based on the dictionary of
-    ScientometryData object containing the source scientometric data extracted
-    from each individual citation register.  The resulting data can be written
-    into a CSV file that can serve as input data file for the
-    'scientometry-plot-gen' script.
+    """HTTP request handler of the query service.
 
-    Attributes:
-    config -- SectionConfig object containing current section configuration
-    source_data -- a dict of ScientometryData objects
-    output_file -- name of the output file, a dict of filenames if data are
-                   supposed to be written to multiple output files
-    fieldnames -- list of field names in the output file header
-    data -- list of rows of the output data
+    Answers GET requests with JSON documents:
 
-    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
-    combination with unicodecsv.DictWriter.
+    /sections -- list of the served sections
+    /sections/{section name} -- output data of the section (see
+                                QueryService.query()), 'years', 'groups' and
+                                'select' query parameters override the section
+                                configuration ('groups' and 'select' are
+                                comma-separated lists)
+    /stats -- statistics of the response cache
 
-    """
+    The QueryService object is expected in the 'service' attribute of the
+    server.
 
-    def __init__(self, config):
-        """Initialize PublicationsData object and process given data.
+    """
 
-        Processes given 'scientometry_data_dict' in order to get publication
-        counts per year per citation register into the table of publication
-        counts and and saves it into the 'data' attribute.  Also generates data
-        header and saves it into 'fieldnames' attribute.  The list of field
-        names can be are optionally narrowed and/or reordered based on
-        'select_cols' attribute of the SectionConfig instance.  The 'fieldnames'
-        and 'data' attributes are supposed to be used in combination with
-        unicodecsv.DictWriter.
+    def do_GET(self):
+        """Answer GET request."""
+        url = urllib.parse.urlparse(self.path)
+        path = urllib.parse.unquote(url.path).rstrip("/")
+        service = self.server.service
+        try:
+            if path in ("", "/sections"):
+                self.send_json(200, json.dumps({'sections': service.sections()}))
+            elif path == "/stats":
+                self.send_json(200, json.dumps(service.stats(), sort_keys=True))
+            elif path.startswith("/sections/"):
+                override_dict = {}
+                for key, value in urllib.parse.parse_qsl(url.query):
+                    override_dict[key] = value.split(",") if key in ('groups', 'select') else value
+                try:
+                    QueryService.check_overrides(override_dict)
+                except ValueError as error:
+                    self.send_json(400, json.dumps({'error': str(error)}))
+                    return
+                section_name = path[len("/sections/"):]
+                response = service.query(section_name, override_dict)
+                if response is None:
+                    self.send_json(404, json.dumps({'error': "Unknown section " + section_name}))
+                else:
+                    self.send_json(200, response)
+            else:
+                self.send_json(404, json.dumps({'error': "Unknown path " + path}))
+        except Exception:
+            # The traceback is logged by the server only, it would expose the
+            # internals to the clients (logged line by line, because the log
+            # escapes newlines)
+            for line in traceback.format_exc().splitlines():
+                self.log_error("%s", line)
+            self.send_json(500, json.dumps({'error': "Internal server error"}))
+
+    def send_json(self, status, body):
+        """Send JSON response.
 
         Positional arguments:
-        config -- SectionConfig object that contains configuration for the
-                  current section
+        status -- HTTP status code
+        body -- JSON encoded response body
 
         """
-        super(PublicationsData, self).__init__(config)
+        body = body.encode('utf-8') if type(body) is str else body
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
-        year_list = config.year_list
-        dataset_list = config.source_data_file.keys()
 
-        publication_count_dict = {}
-        for dataset, source_data in self.source_data.iteritems():
-            publication_count_dict[dataset] = source_data.publication_counts_per_year(year_list)
+# Citation indicators in the order of the results data file columns
+indicator_names = ['Papers', 'Citations', 'Papers_Author', 'Cites_Paper', 'h_index', 'g_index',
+                   'hc_index', 'hI_index', 'hI_norm', 'AWCR', 'AW_index', 'AWCRpA', 'e_index', 'hm_index']
 
-        data = []
-        for year in year_list:
-            # Since publication_counts_per_year method returns a dictionary, the
-            # publication_count_dict now contains two-dimensional dictionary
-            row = {k: publication_count_dict[k][year] for k in dataset_list}
-            row['Year'] = year
-            data.append(row)
-        self.data = data
 
-        fieldnames = config.select_cols if config.select_cols else ["Year"] + dataset_list
-        self.fieldnames = fieldnames
+def h_index(values):
+    """Return the highest number h of values that are at least h."""
+    h = 0
+    for rank, value in enumerate(sorted(values, reverse=True), 1):
+        if value < rank:
+            break
+        h = rank
 
+    return h
 
-class CitationsData(OutputData):
 
-    """Data container for the citations data.
+def round_indicator(value, ndigits=2):
+    """Round value of an indicator to a given number of decimal digits.
 
-    Generates and stores citations data based on the dictionary of
-    ScientometryData object containing the source scientometric data extracted
-    from each individual citation register.  The resulting data can be written
-    into a CSV file that can serve as input data file for the
-    'scientometry-plot-gen' script.
+    Exact ties are rounded away from zero, as the former Python 2 round() did,
+    so that the published indicators do not change by rounding half to even.
 
-    Attributes:
-    config -- SectionConfig object containing current section configuration
-    source_data -- a dict of ScientometryData objects
-    output_file -- name of the output file
-    fieldnames -- list of field names in the output file header
-    data -- list of rows of the citations data
+    Positional arguments:
+    value -- rounded number
 
-    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
-    combination with unicodecsv.DictWriter.
+    Keyword arguments:
+    ndigits -- number of decimal digits
+
+    Returns float.
 
     """
+    quantum = decimal.Decimal(1).scaleb(-ndigits)
+    return float(decimal.Decimal(value).quantize(
+        quantum, rounding=decimal.ROUND_HALF_UP))
 
-    def __init__(self, config):
-        """Initialize CitationsData object and process given data.
 
-        Processes given 'scientometry_data_dict' in order to get citation counts
-        per year per citation register into the table of citation counts and and
-        saves it into the 'data' attribute.  Also generates data header and
-        saves it into 'fieldnames' attribute. The list of field names can be are
-        optionally narrowed and/or reordered based on 'select_cols' attribute of
-        the SectionConfig instance.
+def citation_indicators(paper_list, current_year):
+    """Compute citation indicators of a set of publications.
 
-        Positional arguments:
-        config -- SectionConfig object that contains configuration for the
-                  current section
+    Computes the same indicators as Publish or Perish does (see
+    'indicator_names'): number of papers and citations, papers per author,
+    citations per paper, h-index, g-index, contemporary h-index (hc_index),
+    individual h-index (hI_index), normalised individual h-index (hI_norm),
+    age-weighted citation rate (AWCR), AW-index, age-weighted citation rate
+    per author (AWCRpA), e-index and multi-authored h-index (hm_index).  The
+    publications are sorted by citations once and all the rank-based
+    indicators are computed within a single pass over the sorted list.
 
-        """
-        super(CitationsData, self).__init__(config)
+    Positional arguments:
+    paper_list -- list of (citations, year, number of authors) tuples
+    current_year -- year the age of publications is related to
 
-        year_list = config.year_list
-        dataset_list = config.source_data_file.keys()
+    Returns dict of indicators associated by indicator names.
 
-        citation_count_dict = {}
-        for dataset, source_data in self.source_data.iteritems():
-            citation_count_dict[dataset] = source_data.citation_counts_per_year(year_list)
+    """
+    paper_list = sorted(paper_list, key=itemgetter(0), reverse=True)
+
+    citation_count = 0
+    author_papers = 0.0
+    h = 0
+    h_core_citations = 0
+    h_core_authors = 0
+    g = 0
+    awcr = 0.0
+    awcr_pa = 0.0
+    effective_rank = 0.0
+    hm = 0.0
+    normalized_list = []
+    contemporary_list = []
+    for rank, (citations, year, author_count) in enumerate(paper_list, 1):
+        citation_count += citations
+        author_papers += 1.0 / author_count
+        if citations >= rank:
+            h = rank
+            h_core_citations += citations
+            h_core_authors += author_count
+        if citation_count >= rank * rank:
+            g = rank
+        effective_rank += 1.0 / author_count
+        if citations >= effective_rank:
+            hm = effective_rank
+        age = max(current_year - year + 1, 1)
+        awcr += float(citations) / age
+        awcr_pa += float(citations) / age / author_count
+        normalized_list.append(float(citations) / author_count)
+        # Contemporary score with the usual parameters gamma = 4, delta = 1
+        contemporary_list.append(4.0 * citations / age)
+
+    paper_count = len(paper_list)
+    return {
+        'Papers': paper_count,
+        'Citations': citation_count,
+        'Papers_Author': round_indicator(author_papers, 2),
+        'Cites_Paper': round_indicator(float(citation_count) / paper_count, 2) if paper_count else 0,
+        'h_index': h,
+        'g_index': g,
+        'hc_index': h_index(contemporary_list),
+        'hI_index': round_indicator(float(h * h) / h_core_authors, 2) if h_core_authors else 0,
+        'hI_norm': h_index(normalized_list),
+        'AWCR': round_indicator(awcr, 2),
+        'AW_index': round_indicator(math.sqrt(awcr), 2),
+        'AWCRpA': round_indicator(awcr_pa, 2),
+        'e_index': round_indicator(math.sqrt(h_core_citations - h * h), 2),
+        'hm_index': round_indicator(hm, 2),
+    }
+
+
+def csv_text(value):
+    """Convert value of a CSV field to text.
+
+    Converts the value exactly as csv.writer does--missing values are empty
+    and floats are formatted by repr().
+
+    Positional arguments:
+    value -- converted value
+
+    Returns string.
 
-        data = []
-        for year in config.year_list:
-            # Since citation_counts_per_year method returns a dictionary, the
-            # publication_count_dict now contains two-dimensional dictionary
-            row = {k: citation_count_dict[k][year] for k in dataset_list}
-            row['Year'] = year
-            data.append(row)
-        self.data = data
+    """
+    if value is None:
+        return ""
+    if type(value) is float:
+        return repr(value)
 
-        fieldnames = config.select_cols if config.select_cols else ["Year"] + dataset_list
-        self.fieldnames = fieldnames
+    return str(value)
 
 
-class JournalsData(OutputData):
+def replace_file(temp_file, data_file):
+    """Replace file by a temporary file unless their contents are equal.
 
-    """Data container for the journals data.
+    The contents are compared by sizes and SHA-1 hashes (see
+    BuildManifest.file_signature()).  If they are equal, the temporary file is
+    removed and the file is left alone, so that its modification time doesn't
+    trigger the rebuilds of the downstream tools.  Otherwise the temporary
+    file atomically replaces the file.
 
-    Generates and stores journals data based on the ScientometryData object,
-    containing the merged source scientometric data, and JournalCatalog object,
-    containing citation indicators for all journals.  The resulting data can be
-    written into a CSV file.
+    Positional arguments:
+    temp_file -- temporary file name
+    data_file -- replaced file name
 
-    Attributes:
-    config -- SectionConfig object containing current section configuration
-    source_data --
-                   ScientometryData object
-    output_file -- name of the output file, a dict of filenames if data are
-                   supposed to be written to multiple output files
-    fieldnames -- list of field names in the output file header or a dict of
-                  such lists
-    data -- list of rows of the output data or a dict of such lists
+    Returns True if the file has been replaced.
 
-    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
-    combination with unicodecsv.DictWriter.
+    """
+    try:
+        current = BuildManifest.file_signature(data_file)
+    except OSError:
+        current = None
+    if current and current['size'] == os.path.getsize(temp_file) and \
+       current['sha1'] == BuildManifest.file_signature(temp_file)['sha1']:
+        os.remove(temp_file)
+        return False
+
+    try:
+        os.replace(temp_file, data_file)
+    except OSError:
+        os.remove(temp_file)
+        raise
+
+    return True
+
+
+def make_directory(directory):
+    """Create directory if it doesn't exist.
+
+    The directory can be safely created by multiple processes at the same time.
+
+    Positional arguments:
+    directory -- directory name (None or empty string is ignored)
 
     """
+    if not directory or os.path.isdir(directory):
+        return
 
-    def __init__(self, config):
-        """Initialize JournalsData object and process given data.
+    try:
+        os.makedirs(directory)
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            raise
+    else:
+        print("Creating directory", directory, "...")
 
-        Processes given 'scientometry_data' object in order to get table of
-        publicaton counts per journal that is inner-joined with the dict in the
-        given 'journal_catalog' object.  Prints warning if ISSN was not found in
-        the journal catalog.  Resulting dict is sorted by combination of
-        'Papers' column (descending) and 'Source title' column (ascending).  The
-        resulting data table and field names are stored into 'data' and
-        'fieldnames' attributes respectively.  The list of field names can be
-        are optionally narrowed and/or reordered based on 'select_cols'
-        attribute of the SectionConfig instance.
 
-        Positional arguments:
-        config -- configuration for the current section
+def build_section(section_config, source_registry, output_writer):
+    """Process a single section and submit its output data for writing.
 
-        """
-        super(JournalsData, self).__init__(config)
+    Positional arguments:
+    section_config -- SectionConfig object of the processed section
+    source_registry -- SourceDataRegistry object
+    output_writer -- OutputWriter object writing the output data file(s)
 
-        journal_catalog = JournalCatalog(config.journal_catalog_file)
-        journal_dict = journal_catalog.journal_dict
-        publication_count_dict = self.source_data.publication_counts_per_journal()
-        source_issn_list = publication_count_dict.keys()
+    Returns concurrent.futures.Future object of the list of written output
+    files (see OutputWriter.submit()).
 
-        data = []
-        for issn in source_issn_list:
-            if issn in journal_dict.keys():
-                row = journal_dict[issn]
-                row['Papers'] = publication_count_dict[issn]
-                data.append(row)
-            else:
-                print "WARNING: ISSN", issn, "not found in", config.journal_catalog_file
+    """
+    with stage_profiler.section(section_config.section_name):
+        make_directory(section_config.output_directory)
+        output_data_class = eval(section_config.output_data_class)
+        output_data = output_data_class(section_config, source_registry)
+        return output_writer.submit(output_data)
 
-        if "Source title" in journal_catalog.fieldnames:
-            data.sort(key=itemgetter("Source title"))
-        data.sort(key=itemgetter("Papers"), reverse=True)
-        self.data = data
 
-        fieldnames = config.select_cols if config.select_cols else journal_catalog.fieldnames + ["Papers"]
-        self.fieldnames = fieldnames
+def build_section_group(task):
+    """Process a group of sections within a worker process.
 
+    The sections share single SourceDataRegistry object and their output
+    files are written by a single OutputWriter object (in the background,
+    unless the stages are profiled).  Output printed while processing each
+    section is captured, so that it can be printed at once by the parent
+    process.  Failure of a section doesn't stop processing of the remaining
+    sections of the group.
 
-class ResultsData(OutputData):
+    Positional arguments:
+    task -- tuple (list of SectionConfig objects, SourceCache object or None,
+            SourceDatabase object, StageProfiler object)
 
-    """Data container for the results data.
+    Returns list of (section name, output text, output files, error text,
+    profile record) tuples, output files are None and error text contains
+    the traceback if the section has failed, profile record is None if the
+    profiler is not enabled.
 
-    Generates and stores results data based on the ScientometryData object,
-    containing the exported result data from the Publish or Perish.  Data for
-    individual source columns are divided according dataset groups and dataset
-    into a dictionary of output data, where each toplevel item contains set of
-    output data similar to those generated by PublicationsData and CitationsData
-    classes.  The resulting data can be written into a set of CSV files.
+    """
+    section_config_list, source_cache, source_database, profiler = task
+    stage_profiler.configure(profiler.enabled, profiler.profile_dir)
+    source_registry = SourceDataRegistry(section_config_list, source_cache=source_cache,
+                                         source_database=source_database)
+
+    output_writer = OutputWriter(not stage_profiler.enabled)
+    pending_list = []
+    try:
+        for section_config in section_config_list:
+            stdout = sys.stdout
+            sys.stdout = output_buffer = io.StringIO()
+            try:
+                future = build_section(section_config, source_registry, output_writer)
+                error_text = None
+            except Exception:
+                future = None
+                error_text = traceback.format_exc()
+            finally:
+                sys.stdout = stdout
+            source_registry.release(section_config)
+            profile_record = stage_profiler.section_list.pop() if stage_profiler.section_list else None
+            pending_list.append((section_config.section_name, output_buffer.getvalue(), future, error_text,
+                                 profile_record))
+    finally:
+        output_writer.close()
+
+    result_list = []
+    for section_name, output_text, future, error_text, profile_record in pending_list:
+        output_files = None
+        if future:
+            try:
+                output_files = future.result()
+            except Exception:
+                error_text = traceback.format_exc()
+        result_list.append((section_name, output_text, output_files, error_text, profile_record))
+
+    return result_list
+
+
+def group_sections(section_config_list):
+    """Divide sections into groups of sections sharing source data files.
+
+    Sections that (directly or transitively) share any source data file end
+    up in the same group, so that the file is parsed only once.
+
+    Positional arguments:
+    section_config_list -- list of SectionConfig objects
+
+    Returns list of lists of SectionConfig objects.
 
-    Attributes:
-    config -- SectionConfig object containing current section configuration
-    source_data -- a dict of ScientometryData objects or a sinlge
-                   ScientometryData object
-    output_file -- name of the output file, a dict of filenames if data are
-                   supposed to be written to multiple output files
-    fieldnames -- list of field names in the output file header or a dict of
-                  such lists
-    data -- list of rows of the output data or a dict of such lists
+    """
+    group_list = []
+    for section_config in section_config_list:
+        file_set = set(os.path.realpath(x) for x in SourceDataRegistry.source_data_files(section_config) if x)
+        group = [section_config]
+        for other_file_set, other_group in group_list[:]:
+            if file_set & other_file_set:
+                file_set |= other_file_set
+                group = other_group + group
+                group_list.remove((other_file_set, other_group))
+        group_list.append((file_set, group))
+
+    group_list = [sorted(group, key=section_config_list.index) for file_set, group in group_list]
+    group_list.sort(key=lambda group: section_config_list.index(group[0]))
+    return group_list
+
+
+def build_sections(section_config_list, args, force=False, source_registry=None, verbose=True):
+    """Rebuild sections that aren't up to date.
+
+    Skips sections that are up to date according to the BuildManifest of
+    their output directory (unless forced).  Only lists the rebuilt sections
+    in the dry-run mode.  The rebuilt sections share the given
+    SourceDataRegistry object; if it is not given, a new one is created for
+    the rebuilt sections or, if more jobs are requested, groups of sections
+    that share source data files are processed by a pool of worker processes
+    (see build_section_group()).  Output files are written by OutputWriter
+    in the background while the following sections are processed (unless the
+    stages are profiled).  Successful builds are recorded into the manifests
+    once their output files are written.
+
+    Positional arguments:
+    section_config_list -- list of SectionConfig objects
+    args -- parsed command line arguments
+
+    Keyword arguments:
+    force -- rebuild sections even if they are up to date (default: False)
+    source_registry -- SourceDataRegistry object (default: None)
+    verbose -- print skipped sections (default: True)
+
+    Returns exit status (non-zero if any of the sections has failed).
 
-    NOTE: The 'fieldnames' and 'data' attributes are supposed to be used in
-    combination with unicodecsv.DictWriter.
+    """
+    manifest_dict = {}
+    rebuilt_section_list = []
+    for section_config in section_config_list:
+        if section_config.output_directory not in manifest_dict:
+            manifest_dict[section_config.output_directory] = BuildManifest(section_config.output_directory)
+        manifest = manifest_dict[section_config.output_directory]
+        if not force and manifest.is_up_to_date(section_config):
+            if verbose:
+                print("Skipping", section_config.section_name, "(up to date) ...")
+        elif args.dry_run:
+            print("Would rebuild", section_config.section_name, "...")
+        else:
+            rebuilt_section_list.append(section_config)
+
+    if source_registry:
+        source_cache = source_registry.source_cache
+        source_database = source_registry.source_database
+    else:
+        source_cache = SourceCache(args.cache_dir, args.cache_size << 20) if args.cache_dir and rebuilt_section_list else None
+        source_database = SourceDatabase(args.database)
+
+    exit_status = 0
+    if not source_registry and args.jobs > 1 and len(rebuilt_section_list) > 1:
+        section_config_dict = {x.section_name: x for x in rebuilt_section_list}
+        pool = multiprocessing.Pool(args.jobs)
+        try:
+            task_list = [(x, source_cache, source_database, stage_profiler)
+                         for x in group_sections(rebuilt_section_list)]
+            for result_list in pool.imap_unordered(build_section_group, task_list):
+                for section_name, output_text, output_files, error_text, profile_record in result_list:
+                    sys.stdout.write(output_text)
+                    if profile_record:
+                        stage_profiler.section_list.append(profile_record)
+                    section_config = section_config_dict[section_name]
+                    if error_text:
+                        sys.stderr.write("ERROR: Section " + section_name + " failed\n" + error_text)
+                        exit_status = 1
+                    else:
+                        manifest_dict[section_config.output_directory].record(section_config, output_files)
+                sys.stdout.flush()
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        if not source_registry:
+            source_registry = SourceDataRegistry(rebuilt_section_list, args.parse_jobs, source_cache, source_database)
+        output_writer = OutputWriter(not stage_profiler.enabled)
+        pending_list = []
+        try:
+            for section_config in rebuilt_section_list:
+                pending_list.append((section_config, build_section(section_config, source_registry, output_writer)))
+                source_registry.release(section_config)
+        finally:
+            # Sections written before a failure are recorded all the same
+            output_writer.close()
+            for section_config, future in pending_list:
+                if not future.exception():
+                    manifest_dict[section_config.output_directory].record(section_config, future.result())
+        for section_config, future in pending_list:
+            future.result()
+
+    if not args.dry_run:
+        for manifest in manifest_dict.values():
+            if manifest.section_dict:
+                manifest.save()
+
+    return exit_status
+
+
+def write_profile_report(args, start_usage):
+    """Write the profile report of the run.
+
+    Positional arguments:
+    args -- parsed command line arguments
+    start_usage -- resource usage at the start of the run (see
+                   StageProfiler.usage())
 
     """
+    start_wall, start_cpu, start_rss = start_usage
+    end_wall, end_cpu, end_rss = stage_profiler.usage()
+    cpu_times = os.times()
+    run_record = {
+        'command': sys.argv,
+        'jobs': args.jobs,
+        'wall': round(end_wall - start_wall, 6),
+        'cpu': round(end_cpu - start_cpu, 6),
+        'children_cpu': round(cpu_times[2] + cpu_times[3], 6),
+        'peak_rss_kb': end_rss,
+        'children_peak_rss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+    report_text = json.dumps(stage_profiler.report(run_record), indent=2, separators=(',', ': '), sort_keys=True)
+    if args.profile == "-":
+        print(report_text)
+    else:
+        make_directory(os.path.dirname(args.profile))
+        with open(args.profile, 'w') as json_file:
+            json_file.write(report_text + "\n")
+
+
+def watched_directories(config_file, section_config_list):
+    """Return list of directories containing input files of given sections.
+
+    The directories of the filename patterns (not only of the files matching
+    them at the moment) are included, as well as the directory of the
+    configuration file.
+
+    Positional arguments:
+    config_file -- configuration file name
+    section_config_list -- list of SectionConfig objects
+
+    Returns sorted list of existing directories.
 
-    def __init__(self, config):
-        """Initialize ResultsData object and process given data.
+    """
+    pattern_list = [config_file]
+    for section_config in section_config_list:
+        source = section_config.config_dict.get('source')
+        section_pattern_list = list(source.values()) if type(source) is dict else [source]
+        section_pattern_list.append(section_config.config_dict.get('journal-catalog'))
+        section_pattern_list.append(section_config.config_dict.get('aliases'))
+        pattern_list.extend(os.path.join(section_config.data_root or "", x) for x in section_pattern_list if x)
 
-        Processes given 'scientometry_data' object in order to extract values
-        into set of data tables, using the 'Query' column to determine name of
-        dataset group and dataset.  Each individual source data column
-        translates into a data matrix [dataset groups x datasets].  Selection of
-        the extracted columns can be narrowed using extract_cols attribute or
-        the SectionConfig object in the same way as the selection of the output
-        columns in all output data matrices can be narrowed/reordered by the
-        select_cols attribute.  Each individual output file is composed from the
-        section name and the name of the name of extracted column (in lowercase;
-        dashes instead of spaces).  The field names, output filenames as well as
-        data are stored as a dict, with the name of extracted column as key.
+    directory_set = set(os.path.dirname(x) or "." for x in pattern_list if x)
+    return sorted(x for x in directory_set if os.path.isdir(x))
 
-        Positional arguments:
-        config -- configuration for the current section
 
-        """
-        super(ResultsData, self).__init__(config)
+def input_state(config_file, section_config_list):
+    """Return state of the input files of given sections.
 
-        results_dict = self.source_data.extract_results()
+    Positional arguments:
+    config_file -- configuration file name
+    section_config_list -- list of SectionConfig objects
 
-        # Since results_dict is a two-dimensional dictionary, extraction of an
-        # arbitrary row requires a single step of two-level nested iteration.
-        all_cols = results_dict.itervalues().next().itervalues().next().keys()
-        all_groups = sorted(results_dict.keys())
+    Returns dict of (size, modification time) tuples associated by file name
+    (None for missing files and unmatched filename patterns).
 
-        extract_col_list = config.extract_cols if config.extract_cols else all_cols
-        dataset_group_list = config.group_list if config.group_list else all_groups
-        dataset_list = results_dict.itervalues().next().keys()
-        file_prefix = os.path.splitext(config.output_data_file)[0] + "-"
+    """
+    state = {}
+    for data_file in [config_file] + [x for y in section_config_list for x in BuildManifest.input_files(y)]:
+        try:
+            stat = os.stat(data_file)
+            state[data_file] = (stat.st_size, stat.st_mtime)
+        except (OSError, TypeError):
+            state[data_file] = None
 
-        output_file_dict = {}
-        fieldnames_dict = {}
-        data_dict = {}
-        for col in extract_col_list:
-            output_file_dict[col] = file_prefix + col.replace(" ", "-").lower() + ".csv"
-            fieldnames_dict[col] = config.select_cols if config.select_cols else ["Group"] + dataset_list
-            data_dict[col] = []
-            for dataset_group in dataset_group_list:
-                row = {k: x[col] for k, x in results_dict[dataset_group].iteritems()}
-                row["Group"] = dataset_group
-                data_dict[col].append(row)
+    return state
 
-        self.output_file = output_file_dict
-        self.fieldnames = fieldnames_dict
-        self.data = data_dict
 
 def main():
     """Run initial code when this module is executed as a script.
 
     1. Parse command line arguments using argparse.ArgumentParser object.
+       In the serve mode, answer HTTP requests using QueryService object
+       (see QueryRequestHandler) instead of the following steps.
     2. Extract configuration from YAML file into the list of SectionConfig
        objects using ConfigFileParser object.
-    3. Iterate over all sections and process data files:
+    3. Skip sections that are up to date according to the BuildManifest of
+       their output directory (unless forced).  Only list the rebuilt
+       sections in the dry-run mode (see build_sections()).
+    4. Create SourceDataRegistry object that shares parsed source data among
+       the rebuilt sections.
+    5. Iterate over all rebuilt sections and process data files:
        a. Create output directory if it doesn't exist.
        b. Instantiate an object of the class defined by 'output_data_class'
           attribute of the SectionConfig object.
-       c. Write output CSV file(s).
+       c. Write output CSV file(s) and record the build into the manifest.
+       d. Release source data that are no longer needed.
+       If more jobs are requested, groups of sections that share source data
+       files are processed by a pool of worker processes instead.  Chunked
+       parallel parsing of the source data files is used only if the sections
+       are processed serially, since worker processes can't start their own
+       pools.
+    6. Write the profile report if requested.
+    7. In the watch mode, keep the configuration and the SourceDataRegistry
+       object (with the parsed data) in memory, wait for changes of the input
+       directories (see FileWatcher) and repeat steps 3-6 (serially, without
+       forcing) whenever the input files of the sections change.
+
+    Returns exit status (non-zero if any of the sections has failed).
 
     """
     description = "Process set of scientometric data defined in " + \
@@ -780,26 +5932,140 @@ def main():
              "CONFIG_FILE.  Actual data processing procedure depends on " + \
              "defined output data class that is defined by 'class' key in " + \
              "the CONFIG_FILE.  The name of the section defines prefix for " + \
-             "the output data files.  See project documentation for more " + \
+             "the output data files.  Sections whose source files, journal " + \
+             "catalog and configuration haven't changed since the last run " + \
+             "(according to the build manifest stored in the output " + \
+             "directory) are skipped.  See project documentation for more " + \
              "details on CONFIG_FILE syntax."
     arg_parser = argparse.ArgumentParser(description=description, epilog=epilog)
     arg_parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + __version__)
     arg_parser.add_argument("-c", metavar="CONFIG_FILE", dest='config_file', default="config.yaml",
                             help="load configuration from CONFIG_FILE")
+    arg_parser.add_argument("-f", "--force", action='store_true',
+                            help="rebuild all selected sections even if they are up to date")
+    arg_parser.add_argument("-n", "--dry-run", action='store_true',
+                            help="only list the sections that would be rebuilt")
+    arg_parser.add_argument("-j", "--jobs", metavar="N", type=int, default=1,
+                            help="process sections in N parallel processes (default: 1)")
+    arg_parser.add_argument("-p", "--parse-jobs", metavar="N", type=int, default=1,
+                            help="parse each streamed source file in N chunks processed in parallel (default: 1)")
+    arg_parser.add_argument("--cache-dir", metavar="CACHE_DIR",
+                            help="cache parsed source files in CACHE_DIR")
+    arg_parser.add_argument("--cache-size", metavar="MB", type=int, default=1024,
+                            help="maximum size of CACHE_DIR in MiB (default: 1024)")
+    arg_parser.add_argument("--database", metavar="DATABASE_FILE",
+                            help="load source files of the 'sqlite' storage engine into DATABASE_FILE "
+                                 "instead of an in-memory database")
+    arg_parser.add_argument("--profile", metavar="REPORT_FILE",
+                            help="write JSON report of time and memory usage of each processing stage into "
+                                 "REPORT_FILE ('-' for standard output)")
+    arg_parser.add_argument("--profile-dir", metavar="PROFILE_DIR",
+                            help="dump cProfile statistics of each section into PROFILE_DIR (implies --profile)")
+    arg_parser.add_argument("-w", "--watch", action='store_true',
+                            help="keep running and rebuild the sections whenever their input files change "
+                                 "(the parsed data are kept in memory, sections are processed serially)")
+    arg_parser.add_argument("--watch-interval", metavar="SECONDS", type=float, default=2.0,
+                            help="polling interval of --watch and the time the input files have to stay "
+                                 "unchanged before the rebuild (default: 2)")
+    arg_parser.add_argument("--serve", metavar="[HOST:]PORT",
+                            help="serve output data of the sections as JSON over HTTP on PORT (of HOST, default: "
+                                 "localhost) instead of writing the output files")
+    arg_parser.add_argument("--serve-cache", metavar="N", type=int, default=128,
+                            help="number of responses kept in the LRU cache of --serve (default: 128)")
     arg_parser.add_argument("sections", metavar="SECTION", nargs='*',
                             help="section defined in CONFIG_FILE")
     args = arg_parser.parse_args()
-
-    config_file_parser = ConfigFileParser(args.config_file)
-    section_config_list = config_file_parser.select_sections(args.sections)
-
-    for section_config in section_config_list:
-        if section_config.output_directory and not os.path.exists(section_config.output_directory):
-            print "Creating directory", section_config.output_directory, "..."
-            os.makedirs(section_config.output_directory)
-        output_data_class = eval(section_config.output_data_class)
-        output_data = output_data_class(section_config)
-        output_data.write()
+    if args.profile_dir and not args.profile:
+        args.profile = os.path.join(args.profile_dir, "profile.json")
+    if args.watch and args.dry_run:
+        arg_parser.error("argument --watch: not allowed with argument -n/--dry-run")
+    if args.serve and (args.watch or args.dry_run):
+        arg_parser.error("argument --serve: not allowed with argument -w/--watch or -n/--dry-run")
+    stage_profiler.configure(bool(args.profile), args.profile_dir)
+    start_usage = stage_profiler.usage()
+
+    if args.serve:
+        host, separator, port = args.serve.rpartition(":")
+        source_cache = SourceCache(args.cache_dir, args.cache_size << 20) if args.cache_dir else None
+        server = http.server.HTTPServer((host or "localhost", int(port)), QueryRequestHandler)
+        server.service = QueryService(args.config_file, args.sections, args.serve_cache, args.parse_jobs,
+                                      source_cache, SourceDatabase(args.database))
+        print("Serving", args.config_file, "on http://%s:%d/ ..." % server.server_address[:2])
+        sys.stdout.flush()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopped serving.")
+        finally:
+            server.server_close()
+        return 0
+
+    with stage_profiler.stage('config', file=args.config_file):
+        config_file_parser = ConfigFileParser(args.config_file)
+        section_config_list = config_file_parser.select_sections(args.sections)
+
+    source_registry = None
+    if args.watch:
+        source_cache = SourceCache(args.cache_dir, args.cache_size << 20) if args.cache_dir else None
+        source_registry = SourceDataRegistry(section_config_list, args.parse_jobs, source_cache,
+                                             SourceDatabase(args.database), keep_data=True)
+
+    exit_status = build_sections(section_config_list, args, args.force, source_registry)
+    if args.profile:
+        write_profile_report(args, start_usage)
+    if not args.watch:
+        return exit_status
+
+    # Watch mode: the configuration and the parsed data stay in memory, the
+    # sections are rebuilt (if they aren't up to date) whenever the input
+    # files change
+    config_stat = os.stat(args.config_file)
+    state = input_state(args.config_file, section_config_list)
+    watcher = FileWatcher(watched_directories(args.config_file, section_config_list), args.watch_interval)
+    print("Watching", ", ".join(watcher.directory_list), "(" + ("inotify" if watcher.inotify_fd is not None else "polling") + ") ...")
+    sys.stdout.flush()
+    try:
+        while True:
+            watcher.wait()
+            stat = os.stat(args.config_file)
+            try:
+                if (stat.st_size, stat.st_mtime) != (config_stat.st_size, config_stat.st_mtime):
+                    config_file_parser = ConfigFileParser(args.config_file)
+                    config_stat = stat
+                else:
+                    config_file_parser.refresh()
+                section_config_list = config_file_parser.select_sections(args.sections)
+            except Exception:
+                sys.stderr.write("ERROR: Configuration " + args.config_file + " failed\n" + traceback.format_exc())
+                continue
+            new_state = input_state(args.config_file, section_config_list)
+            if new_state == state:
+                continue
+            state = new_state
+
+            stage_profiler.configure(bool(args.profile), args.profile_dir)
+            start_usage = stage_profiler.usage()
+            print("[" + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") + "] Input files changed ...")
+            try:
+                source_registry.plan(section_config_list)
+                exit_status = build_sections(section_config_list, args, source_registry=source_registry,
+                                             verbose=False)
+            except Exception:
+                sys.stderr.write("ERROR: Build failed\n" + traceback.format_exc())
+                exit_status = 1
+            if args.profile:
+                write_profile_report(args, start_usage)
+            sys.stdout.flush()
+            new_directory_list = watched_directories(args.config_file, section_config_list)
+            if new_directory_list != watcher.directory_list:
+                watcher.close()
+                watcher = FileWatcher(new_directory_list, args.watch_interval)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        watcher.close()
+
+    return exit_status
 
 
 if __name__ == "__main__":
@@ -807,4 +6073,4 @@ if __name__ == "__main__":
     # directly as a script.  Since local variables are allocated much faster
     # than global variables, it is a good practice to encapsulate whole initial
     # code into the main() function.
-    main()
+    sys.exit(main())